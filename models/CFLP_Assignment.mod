@@ -0,0 +1,30 @@
+param cli;
+param loc;
+param ICap{1 .. loc};
+param FC{1 .. loc};
+param dem{1 .. cli};
+param TC{1 .. cli, 1 .. loc};
+
+# Sub-problema de asignación con los centros abiertos ya decididos por la heurística.
+# Las variables sólo existen sobre OPEN (y opcionalmente sobre las listas de candidatos),
+# de modo que el modelo generado escala con la cantidad de centros abiertos y no con 'loc'.
+set OPEN within 1 .. loc default {};
+
+# Listas de candidatos: si k_cand > 0, cada cliente sólo puede ir a los pares de CAND_ARCS
+param k_cand default 0;
+set CAND_ARCS within {1 .. cli, 1 .. loc} default {};
+
+set ARCS = {i in 1..cli, j in OPEN: k_cand = 0 or (i,j) in CAND_ARCS};
+
+var y {ARCS} binary; # Para MS se usa 'option relax_integrality 1' (0 <= y <= 1)
+
+minimize Total_Cost:
+    sum {j in OPEN} FC[j] +
+    sum {(i,j) in ARCS} y[i,j] * TC[i,j];
+
+subject to
+    allocation {i in 1..cli}:
+        sum {(i,j) in ARCS} y[i,j] = 1;
+
+    capacity_con {j in OPEN}:
+        sum {(i,j) in ARCS} dem[i] * y[i,j] <= ICap[j];
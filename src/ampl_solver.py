@@ -6,8 +6,29 @@ Contiene dos componentes principales:
 """
 
 import os
+import time
+import numpy as np
+import pandas as pd
 from amplpy import AMPL
 
+from instrumentation import new_solver_stats
+from utils import Assignment
+
+def _is_truncated(gurobi_opts):
+    """
+    True si las opciones pueden cortar el solve antes del óptimo: timelimit, o mipgap distinto de 0
+    (sin mipgap, Gurobi usa su brecha por defecto de 1e-4). En ese caso el costo depende del punto de
+    partida, por lo que no se arrastra la solución del vecino anterior.
+    """
+    options = dict(token.partition("=")[::2] for token in (gurobi_opts or "").split())
+    if "timelimit" in options:
+        return True
+    try:
+        return float(options.get("mipgap", "1e-4")) > 0
+    except ValueError:
+        return True
+
+
 def solve_optimal(dat_file_path, mod_file_path, mode, solver="gurobi", timelimit=None, mipgap=None):
     """
     Resuelve el problema CFLP completo (MIP) para encontrar el óptimo matemático verdadero.
@@ -63,30 +84,17 @@ def solve_optimal(dat_file_path, mod_file_path, mode, solver="gurobi", timelimit
         
         print(f"[Solver] Mejor costo encontrado: {total_cost:,.2f}")
         
-        # Extracción de variables de decisión desde AMPL a Python
-        facility_var = ampl.getVariable('x') # Variable binaria de apertura
-        assignment_var = ampl.getVariable('y') # Variable de asignación
-        
-        # 1. Filtrar 'x': Identificar qué centros se abrieron (valor > 0.9 para evitar errores de punto flotante)
-        facility_vals = facility_var.getValues().toDict()
-        open_facilities = [int(j) for j, val in facility_vals.items() if val > 0.9]
+        # Extracción de variables de decisión desde AMPL a Python.
+        # El filtro se evalúa dentro de AMPL: sólo viajan las entradas no nulas (no las cli x loc de 'y').
+        # 1. 'x': centros abiertos (valor > 0.9 para evitar errores de punto flotante)
+        open_facilities = [int(j) for j, _ in ampl.getData("{j in 1..loc: x[j] > 0.9} x[j]").toList()]
         
         print("[Solver] Obteniendo asignaciones...")
-        assign_dict = assignment_var.getValues().toDict()
-
-        # 2. Filtrar 'y': Extraer las conexiones cliente -> centro
-        assignments = []
-        if mode == "SS": # Single Source (Variable binaria)
-            threshold = 0.9
-            for (i, j), val in assign_dict.items():
-                if float(val) > threshold:
-                    assignments.append((int(i), int(j)))
-        
-        elif mode == "MS": # Multi Source (Variable continua 0-1)
-            threshold = 1e-6 # Umbral bajo para detectar flujo fraccional
-            for (i, j), val in assign_dict.items():
-                if float(val) > threshold:
-                    assignments.append((int(i), int(j), float(val)))
+        # 2. 'y': conexiones cliente -> centro, sólo sobre los centros abiertos
+        rows = ampl.getData("{i in 1..cli, j in 1..loc: x[j] > 0.9 and y[i,j] > 1e-6} y[i,j]").toList()
+        # SS: variable binaria (umbral 0.9) | MS: variable continua 0-1 (umbral bajo para detectar flujo fraccional)
+        assignments = Assignment.from_rows(rows, mode, n_clients=int(ampl.getParameter('cli').value()),
+                                           threshold=0.9 if mode == "SS" else 1e-6)
         
         return total_cost, open_facilities, assignments
 
@@ -100,11 +108,21 @@ def solve_optimal(dat_file_path, mod_file_path, mode, solver="gurobi", timelimit
 
 
 class AMPLWrapper:
-    def __init__(self, dat_file_path, mod_file_path, solver="gurobi", gurobi_opts=None):
+    def __init__(self, dat_file_path, mod_file_path, solver="gurobi", gurobi_opts=None, warm_start=True,
+                 reduced=False, mode="SS", candidates=0):
         """
         Clase Wrapper para la Heurística.
         CARGA UNICA: Inicializa AMPL, carga el modelo y los datos UNA SOLA VEZ al instanciarse.
         Esto evita la sobrecarga de lectura/escritura en disco en cada iteración de la búsqueda Tabú.
+        - warm_start: entrega al solver la asignación de la configuración anterior (reparada) como punto inicial.
+          Sólo aplica si las opciones de Gurobi resuelven al óptimo (mipgap=0, sin timelimit): con un solve
+          truncado, cada evaluación parte de y = 0 para que su costo no dependa del orden de evaluación.
+        - reduced: usa CFLP_Assignment.mod (misma carpeta que mod_file_path), donde 'y' sólo existe sobre
+          el conjunto OPEN. En vez de fijar 'x' se actualiza OPEN; 'mode' decide si 'y' es binaria (SS) o continua (MS).
+        - candidates: con reduced, cada cliente sólo considera los centros abiertos de su lista de candidatos
+          (sus 'candidates' centros más baratos, ver candidates.py; 0 = todos). Si así la configuración
+          resulta infactible, se reintenta con listas ampliadas (k -> 2k) sólo para ese solve, hasta usar todos
+          los centros abiertos.
         """
         self.ampl = AMPL()
         self.ampl.setOption('solver', solver)
@@ -117,13 +135,32 @@ class AMPLWrapper:
             # outlev=0 (silencio), 5 seg límite, 5% gap (suficiente para comparar vecinos)
             gurobi_opts = 'outlev=0 timelimit=5.0 mipgap=0.05' 
         self.ampl.setOption('gurobi_options', gurobi_opts)
+        self.truncated = _is_truncated(gurobi_opts)
         
+        self.reduced = reduced
+        self.candidates = candidates if reduced else 0
+        if reduced:
+            mod_file_path = os.path.join(os.path.dirname(mod_file_path), 'CFLP_Assignment.mod')
+            if mode == "MS":
+                self.ampl.setOption('relax_integrality', 1) # y continua en [0, 1]
+
         print("[Wrapper] Leyendo modelo y datos... (esto se hace 1 vez)")
         self.ampl.read(mod_file_path)
         self.ampl.readData(dat_file_path)
         
+        if reduced:
+            self.open_set_ampl = self.ampl.getSet('OPEN')
+            self.cand_arcs = self.ampl.getSet('CAND_ARCS')
+            self.k_cand = self.ampl.getParameter('k_cand')
+            self.facility_var = None
+        else:
+            # Parámetro auxiliar (fuera del .mod, así solve_optimal no cambia) con el patrón abierto/cerrado:
+            # permite fijar todas las 'x' con una sola transferencia de datos y una sola sentencia 'fix'
+            self.ampl.eval("param open_flag {1..loc} default 0;")
+            self.open_flag = self.ampl.getParameter('open_flag')
+            self.facility_var = self.ampl.getVariable('x')
+
         # Guardamos referencias a las variables AMPL para acceso rápido luego
-        self.facility_var = self.ampl.getVariable('x')
         self.assignment_var = self.ampl.getVariable('y')
         self.total_cost_obj = self.ampl.getObjective('Total_Cost')
         
@@ -147,6 +184,24 @@ class AMPLWrapper:
         )
         print(f"[Wrapper] Demanda Total: {self.total_demand:,.0f} | Locs: {self.n_locations}")
 
+        # Estado persistente entre solves:
+        # - fixed_open: conjunto con el que están fijadas las 'x' en AMPL (None = desconocido, fijar todo)
+        # - last_flow: asignación (cliente, centro, valor) de la última solución, base del arranque en caliente
+        self.dat_file_path = dat_file_path
+        self.warm_start = warm_start
+        self.fixed_open = None
+        self.last_flow = None
+        self.instance = None # Arreglos NumPy (TC) cargados sólo si se usan (arranque en caliente, candidatos)
+        self.current_arcs = None # Pares (cliente, centro) permitidos por las listas de candidatos vigentes
+        self.candidate_lists = None # CandidateLists (CSR), construidas al primer uso
+
+        # Métricas para comparar con / sin arranque en caliente
+        self.solve_count = 0
+        self.solve_time = 0.0
+        self.warm_starts = 0
+        self.candidate_fallbacks = 0
+        self.stats = new_solver_stats() # Tiempos por fase y estados del solver (ver instrumentation.py)
+
     def get_n_locations(self):
         return self.n_locations
 
@@ -156,6 +211,120 @@ class AMPLWrapper:
     def get_capacity_list(self):
         return self.capacity_list
 
+    def set_solver_options(self, gurobi_opts):
+        # Permite cambiar la precisión (ej. refinamiento final) sin recargar el modelo.
+        self.ampl.setOption('gurobi_options', gurobi_opts)
+        self.truncated = _is_truncated(gurobi_opts)
+
+    def _reset_start(self):
+        """Punto inicial neutro (y = 0): el solve truncado no hereda la solución del vecino anterior."""
+        if self.reduced:
+            self.ampl.eval("let {(i,j) in ARCS} y[i,j] := 0;")
+        else:
+            self.ampl.eval("let {i in 1..cli, j in 1..loc} y[i,j] := 0;")
+        self.last_flow = None
+
+    def _fix_facilities(self, open_set):
+        """
+        Fija las 'x' en AMPL en bloque (en vez de un .fix() por centro):
+        - Primera vez (o estado desconocido): el patrón completo viaja en un DataFrame y se fija todo.
+        - Después: sólo se envían y fijan los centros que cambiaron (2 en un SWAP).
+        """
+        if self.fixed_open is None:
+            flags = [1 if j in open_set else 0 for j in self.all_locations_indices]
+            self.open_flag.setValues(pd.DataFrame({'open_flag': flags}, index=self.all_locations_indices))
+            self.ampl.eval("fix {j in 1..loc} x[j] := open_flag[j];")
+        else:
+            changed = sorted(open_set.symmetric_difference(self.fixed_open))
+            if changed:
+                self.open_flag.setValues({j: (1 if j in open_set else 0) for j in changed})
+                changed_list = ",".join(str(j) for j in changed)
+                self.ampl.eval(f"fix {{j in {{{changed_list}}}}} x[j] := open_flag[j];")
+        self.fixed_open = set(open_set)
+
+    def _numpy_instance(self):
+        if self.instance is None:
+            import instance
+            self.instance = instance.load_instance(self.dat_file_path)
+        return self.instance
+
+    def _candidate_arcs(self, open_set, lists):
+        """Pares (cliente, centro) 1-based de las listas de candidatos restringidas al conjunto abierto."""
+        cols = np.array(sorted(open_set), dtype=np.int64) - 1
+        rows, pos = lists.restrict(cols, self._numpy_instance().TC)
+        return list(zip((rows + 1).tolist(), (cols[pos] + 1).tolist()))
+
+    def _set_open(self, open_set, lists):
+        """Modelo reducido: actualiza OPEN (y los pares candidatos) con una transferencia cada uno."""
+        self.open_set_ampl.setValues(sorted(open_set))
+        if lists is not None:
+            arcs = self._candidate_arcs(open_set, lists)
+            self.cand_arcs.setValues(arcs)
+            self.current_arcs = set(arcs)
+            self.k_cand.set(lists.k)
+        else:
+            self.current_arcs = None
+            self.k_cand.set(0)
+        self.fixed_open = set(open_set)
+
+    def _read_flow(self, open_set):
+        """Lee sólo las entradas no nulas de 'y' sobre los centros abiertos (una única consulta filtrada)."""
+        if self.reduced:
+            rows = self.ampl.getData("{(i,j) in ARCS: y[i,j] > 1e-6} y[i,j]").toList()
+        else:
+            open_list = ",".join(str(j) for j in sorted(open_set))
+            rows = self.ampl.getData(f"{{i in 1..cli, j in {{{open_list}}}: y[i,j] > 1e-6}} y[i,j]").toList()
+        return [(int(i), int(j), float(v)) for i, j, v in rows]
+
+    def _apply_warm_start(self, open_set, previous_open):
+        """
+        Punto inicial para el nuevo conjunto abierto a partir de la última asignación:
+        los clientes servidos por centros que se cerraron se reasignan (greedy) al centro abierto
+        más barato con capacidad residual. Sólo se envían a AMPL las entradas de 'y' que cambian;
+        el resto conserva el valor de la solución anterior, que AMPL entrega al solver como arranque.
+        """
+        closed = previous_open - open_set
+        if not closed:
+            return
+        TC = self._numpy_instance().TC
+
+        open_cols = np.array(sorted(open_set), dtype=np.int64)
+        residual = {j: self.capacities[j] for j in open_cols.tolist()}
+        displaced = []
+        for i, j, v in self.last_flow:
+            if j in closed:
+                displaced.append((i, j, v))
+            elif j in residual:
+                residual[j] -= self.demands[i] * v
+
+        changes = {}
+        # Primero los montos grandes: son los más difíciles de ubicar
+        for i, j, v in sorted(displaced, key=lambda e: -self.demands[e[0]] * e[2]):
+            amount = self.demands[i] * v
+            if not self.reduced:
+                changes[(i, j)] = 0 # En el modelo reducido y[i,j] ya no existe
+            for c in open_cols[np.argsort(TC[i - 1, open_cols - 1])].tolist():
+                if self.current_arcs is not None and (i, c) not in self.current_arcs:
+                    continue
+                if residual[c] >= amount:
+                    residual[c] -= amount
+                    changes[(i, c)] = v
+                    break
+        self.assignment_var.setValues(changes)
+        self.warm_starts += 1
+
+    def _timed_solve(self):
+        start = time.time()
+        self.ampl.solve()
+        elapsed = time.time() - start
+        self.solve_time += elapsed
+        self.solve_count += 1
+        solve_result = self.ampl.solve_result
+        self.stats['t_solve'] += elapsed
+        self.stats['solves'] += 1
+        self.stats['status'][solve_result] += 1
+        return solve_result
+
     def solve_assignment_persistent(self, open_facilities_indices):
         """
         Resuelve el sub-problema de asignación.
@@ -164,37 +333,72 @@ class AMPLWrapper:
         
         Usa .fix() en las variables 'x'. Esto transforma el problema de un 
         problema de localización complejo -> A un problema de transporte más simple.
+        En modo reducido no hay 'x': se actualiza el conjunto OPEN del modelo de asignación.
         """
         try:
             open_set = set(open_facilities_indices)
-            
+
+            # Descarte rápido: la capacidad abierta no alcanza para cubrir la demanda total
+            if sum(self.capacities[j] for j in open_set) < self.total_demand - 1e-9:
+                return float('inf')
+
             # FIJAR VARIABLES (FIXING):
             # En lugar de cambiar datos, fijamos las variables 'x' a 1 o 0.
             # Esto reduce drásticamente el espacio de búsqueda para Gurobi.
-            for j in self.all_locations_indices:
-                if j in open_set:
-                    self.facility_var[j].fix(1) # Obligatorio abrir
-                else:
-                    self.facility_var[j].fix(0) # Obligatorio cerrar
+            previous_open = self.fixed_open
+            start = time.time()
+            if self.reduced:
+                if self.candidates > 0 and self.candidate_lists is None:
+                    import candidates
+                    self.candidate_lists = candidates.load_candidate_lists(
+                        self._numpy_instance(), self.dat_file_path, self.candidates)
+                self._set_open(open_set, self.candidate_lists)
+            else:
+                self._fix_facilities(open_set)
+
+            # ARRANQUE EN CALIENTE: reparar la asignación anterior para el nuevo conjunto abierto.
+            # Con un solve truncado (gap / tiempo) el costo dependería del vecino anterior: se parte de cero.
+            if self.truncated:
+                self._reset_start()
+            elif self.warm_start and self.last_flow is not None and previous_open is not None:
+                self._apply_warm_start(open_set, previous_open)
+            self.stats['t_fix'] += time.time() - start
             
             # Resolvemos solo la asignación 'y' (y costos fijos de 'x' ya decididos)
-            self.ampl.solve()
-            
-            solve_result = self.ampl.solve_result
+            solve_result = self._timed_solve()
+
+            # Las listas de candidatos pueden volver infactible una configuración que no lo es:
+            # se amplían sólo para este solve (el siguiente parte de las listas base) hasta usar todos los centros abiertos
+            lists = self.candidate_lists
+            while "infeasible" in solve_result and self.current_arcs is not None:
+                self.candidate_fallbacks += 1
+                lists = lists.widen(self._numpy_instance().TC)
+                self._set_open(open_set, lists)
+                solve_result = self._timed_solve()
             
             # Si la combinación de centros no puede satisfacer la demanda:
             if "infeasible" in solve_result:
+                self.last_flow = None
                 return float('inf')
 
+            start = time.time()
+            if self.warm_start and not self.truncated:
+                self.last_flow = self._read_flow(open_set)
+
             try:
                 cost = self.total_cost_obj.value()
                 if cost is None: return float('inf')
                 return float(cost)
             except:
                 return float('inf')
+            finally:
+                self.stats['t_parse'] += time.time() - start
 
         except Exception as e:
             print(f"[Wrapper] Error en solve_assignment_persistent: {e}")
+            # Estado de AMPL incierto: el próximo solve vuelve a fijar todo y parte sin arranque
+            self.fixed_open = None
+            self.last_flow = None
             return float('inf')
 
     def get_final_solution(self, open_facilities_indices, mode):
@@ -206,29 +410,21 @@ class AMPLWrapper:
         final_cost = self.solve_assignment_persistent(open_facilities_indices)
 
         if final_cost == float('inf'):
-            return final_cost, []
+            return final_cost, None
         
         try:
-            assign_dict = self.assignment_var.getValues().toDict()
+            # Sólo las entradas no nulas de 'y', en una única consulta (no se recorre cli x loc en Python)
+            rows = self._read_flow(set(open_facilities_indices))
         except Exception as e:
             print(f"[Wrapper] Error extrayendo asignación: {e}")
-            return final_cost, []
-        
-        assignments = []
-        # Umbral ajustado según el modo
-        threshold = 1e-5 if mode == "MS" else 0.9
-        
-        for (i, j), val in assign_dict.items():
-            try:
-                if float(val) > threshold:
-                    if mode == "SS":
-                        assignments.append((int(i), int(j)))
-                    else: # MS incluye la fracción de flujo
-                        assignments.append((int(i), int(j), float(val)))
-            except: pass
+            return final_cost, None
         
-        return final_cost, assignments
+        # Umbral ajustado según el modo (ver Assignment.from_rows)
+        return final_cost, Assignment.from_rows(rows, mode, n_clients=len(self.demands))
 
     def close(self):
         # Libera los recursos de AMPL al terminar la ejecución.
+        if self.solve_count:
+            print(f"[Wrapper] Solves: {self.solve_count} | Tiempo medio: {1000 * self.solve_time / self.solve_count:.1f}ms | "
+                  f"Arranques en caliente: {self.warm_starts} | Ampliaciones de candidatos: {self.candidate_fallbacks}")
         self.ampl.close()
\ No newline at end of file
@@ -0,0 +1,217 @@
+"""
+Suite de benchmark reproducible de la heurística (acción 'benchmark').
+Corre cada combinación instancia x modo x parámetros x semilla de la suite (benchmarks/suite.json)
+con un evaluador sin licencia (numpy por defecto), cada caso en un proceso nuevo para que la
+memoria pico y el estado del generador aleatorio no dependan de los casos anteriores.
+
+Por caso se registra: costo final, iteraciones, evaluaciones del sub-problema, tiempo de pared,
+evaluaciones por segundo, mejor costo en el tiempo y memoria pico del proceso. El resumen se guarda
+en JSON y puede compararse contra una línea base guardada para detectar regresiones.
+"""
+
+import json
+import multiprocessing as mp
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+import evaluators
+import heuristic
+import instance
+import instrumentation
+import move_bounds
+
+try:
+    import resource
+except ImportError:  # Windows: sin memoria pico por proceso
+    resource = None
+
+# Valores por defecto de cada conjunto de parámetros de la suite
+PARAM_DEFAULTS = {'iterations': 20, 'sample': 20, 'tenure': 20, 'delta': "off", 'prune': False,
+                  'neighborhood': "sampled", 'candidates': 0, 'time_limit': None}
+
+# Casos más cortos que esto (s) no se comparan por tiempo ni eval/s: el ruido domina la medición
+MIN_TIMED_S = 0.5
+
+SUITE_DEFAULTS = {'instances': "all", 'modes': ["SS", "MS"], 'seeds': [1, 2, 3], 'evaluator': "numpy",
+                  'param_sets': [{'name': "base"}]}
+
+
+def load_suite(path):
+    """Lee la suite (JSON); las claves ausentes toman SUITE_DEFAULTS."""
+    suite = dict(SUITE_DEFAULTS)
+    if path and os.path.exists(path):
+        with open(path) as f:
+            suite.update(json.load(f))
+    else:
+        print(f"[Bench] No existe la suite {path}. Se usa la suite por defecto.")
+    return suite
+
+
+def build_cases(suite, dat_dir, model_path, only_instance=None):
+    """Expande la suite en casos (diccionarios serializables para el proceso de cada caso)."""
+    names = suite['instances']
+    if names == "all":
+        names = sorted(f[:-4] for f in os.listdir(dat_dir) if f.endswith(".dat"))
+    if only_instance:
+        names = [n for n in names if n == only_instance]
+
+    cases = []
+    for name in names:
+        dat_file = os.path.join(dat_dir, f"{name}.dat")
+        if not os.path.exists(dat_file):
+            print(f"[Bench] Se omite {name}: no existe {dat_file}")
+            continue
+        for mode in suite['modes']:
+            for param_set in suite['param_sets']:
+                params = {**PARAM_DEFAULTS, **{k: v for k, v in param_set.items() if k != 'name'}}
+                for seed in suite['seeds']:
+                    cases.append({'id': f"{name}|{mode}|{param_set['name']}|{seed}",
+                                  'instance': name, 'mode': mode, 'param_set': param_set['name'],
+                                  'seed': seed, 'params': params, 'evaluator': suite['evaluator'],
+                                  'dat_file': dat_file, 'mod_file': model_path(mode)})
+    return cases
+
+
+def _peak_memory_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB; macOS, bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_case(case):
+    """Un caso en su propio proceso: crea el evaluador, corre la búsqueda y mide."""
+    random.seed(case['seed'])
+    params = case['params']
+    t0 = time.perf_counter()
+    evaluator = evaluators.create_evaluator(
+        backend=case['evaluator'], dat_file=case['dat_file'], mod_file=case['mod_file'], mode=case['mode'],
+        delta=params['delta'], candidates=params['candidates'])
+    try:
+        bounds = None
+        if params['prune'] or params['neighborhood'] == "scored":
+            bounds = move_bounds.SwapBounds(instance.load_instance(case['dat_file']))
+        t_setup = time.perf_counter() - t0
+
+        recorder = instrumentation.TraceRecorder(evaluator)
+        t_search = time.perf_counter()
+        cost, best_set, iterations, history = heuristic.run_tabu_search(
+            evaluator, case['dat_file'], case['mod_file'], evaluator.get_n_locations(),
+            params['iterations'], params['tenure'], params['sample'],
+            delta_eval=(params['delta'] != "off"), move_bounds=bounds, prune=params['prune'],
+            neighborhood=params['neighborhood'], recorder=recorder, time_limit=params['time_limit'])
+        search_s = time.perf_counter() - t_search
+        evaluations = evaluator.stats['solves']
+    finally:
+        evaluator.close()
+
+    # Mejor costo en el tiempo: (segundos desde el inicio de la búsqueda, costo), sólo cuando mejora.
+    # Lo que no cubren las iteraciones es la solución inicial.
+    elapsed = search_s - sum(r['t_total'] for r in recorder.records)
+    best_over_time = [[round(elapsed, 4), history[0] if history else cost]]
+    for record in recorder.records:
+        elapsed += record['t_total']
+        if record['best_cost'] < best_over_time[-1][1]:
+            best_over_time.append([round(elapsed, 4), record['best_cost']])
+
+    return {'id': case['id'], 'instance': case['instance'], 'mode': case['mode'],
+            'param_set': case['param_set'], 'seed': case['seed'], 'params': params,
+            'cost': cost, 'open_facilities': len(best_set), 'iterations': iterations,
+            'evaluations': evaluations, 'setup_s': t_setup, 'wall_s': search_s,
+            'evals_per_s': evaluations / search_s if search_s > 0 else None,
+            'peak_mem_mb': _peak_memory_mb(), 'best_over_time': best_over_time}
+
+
+def run_suite(cases):
+    """Corre los casos en orden, cada uno en un proceso nuevo ('spawn', portable a Windows)."""
+    ctx = mp.get_context("spawn")
+    results = []
+    with ctx.Pool(processes=1, maxtasksperchild=1) as pool:
+        for k, case in enumerate(cases, 1):
+            try:
+                result = pool.apply(_run_case, (case,))
+            except Exception as e:
+                print(f"[Bench] ({k}/{len(cases)}) {case['id']}: ERROR {e}")
+                results.append({'id': case['id'], 'error': str(e)})
+                continue
+            print(f"[Bench] ({k}/{len(cases)}) {case['id']}: costo {result['cost']:,.2f} | "
+                  f"{result['wall_s']:.2f}s | {result['evals_per_s'] or 0:,.1f} eval/s | "
+                  f"{result['peak_mem_mb'] or 0:.0f} MB")
+            results.append(result)
+    return results
+
+
+def aggregate(results):
+    """Resumen por instancia/modo/conjunto de parámetros (sobre las semillas)."""
+    groups = {}
+    for r in results:
+        if 'error' not in r:
+            groups.setdefault(f"{r['instance']}|{r['mode']}|{r['param_set']}", []).append(r)
+    summary = {}
+    for key, rows in groups.items():
+        costs = np.array([r['cost'] for r in rows])
+        summary[key] = {'runs': len(rows), 'best_cost': float(costs.min()), 'mean_cost': float(costs.mean()),
+                        'mean_wall_s': float(np.mean([r['wall_s'] for r in rows])),
+                        'mean_evals_per_s': float(np.mean([r['evals_per_s'] or 0.0 for r in rows])),
+                        'max_peak_mem_mb': max((r['peak_mem_mb'] or 0.0) for r in rows)}
+    return summary
+
+
+def environment():
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(),
+            'cpus': os.cpu_count()}
+
+
+def save_summary(path, suite, results):
+    summary = {'timestamp': datetime.now().isoformat(timespec='seconds'), 'environment': environment(),
+               'suite': suite, 'aggregates': aggregate(results), 'cases': results}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(summary, f, indent=2)
+    print(f"[Bench] Resumen guardado en {path}")
+    return summary
+
+
+def compare(current, baseline, tolerance=0.25):
+    """
+    Compara dos resúmenes caso a caso (mismo id). Con semilla fija la búsqueda es determinista,
+    por lo que cualquier cambio de costo se informa; tiempo, eval/s y memoria se consideran
+    regresión si empeoran más que 'tolerance' (fracción). Retorna la lista de regresiones.
+    """
+    base_cases = {c['id']: c for c in baseline['cases'] if 'error' not in c}
+    if baseline.get('environment') != current.get('environment'):
+        print("[Bench] Aviso: la línea base se generó en otro entorno; los tiempos pueden no ser comparables.")
+
+    regressions = []
+    for case in current['cases']:
+        base = base_cases.get(case['id'])
+        if base is None:
+            continue
+        if 'error' in case:
+            regressions.append(f"{case['id']}: error ({case['error']})")
+            continue
+        if case['cost'] > base['cost'] * (1 + 1e-9):
+            regressions.append(f"{case['id']}: costo {base['cost']:,.2f} -> {case['cost']:,.2f}")
+        elif case['cost'] < base['cost'] * (1 - 1e-9):
+            print(f"[Bench] Mejora {case['id']}: costo {base['cost']:,.2f} -> {case['cost']:,.2f}")
+        timed = base['wall_s'] >= MIN_TIMED_S
+        if timed and case['wall_s'] > base['wall_s'] * (1 + tolerance):
+            regressions.append(f"{case['id']}: tiempo {base['wall_s']:.2f}s -> {case['wall_s']:.2f}s")
+        if timed and base['evals_per_s'] and (case['evals_per_s'] or 0) < base['evals_per_s'] * (1 - tolerance):
+            regressions.append(f"{case['id']}: eval/s {base['evals_per_s']:,.1f} -> {case['evals_per_s'] or 0:,.1f}")
+        if base['peak_mem_mb'] and (case['peak_mem_mb'] or 0) > base['peak_mem_mb'] * (1 + tolerance):
+            regressions.append(f"{case['id']}: memoria {base['peak_mem_mb']:.0f}MB -> {case['peak_mem_mb']:.0f}MB")
+
+    missing = set(base_cases) - {c['id'] for c in current['cases']}
+    print(f"[Bench] Comparación con la línea base: {len(base_cases) - len(missing)} casos comunes, "
+          f"{len(regressions)} regresiones (tolerancia {tolerance:.0%})")
+    for line in regressions:
+        print(f"[Bench]   REGRESIÓN {line}")
+    return regressions
@@ -0,0 +1,154 @@
+"""
+Listas de candidatos (k centros más baratos por cliente) en formato disperso CSR.
+En las instancias grandes casi ningún par cliente-centro caro aparece en una buena solución:
+restringir cada cliente a sus k centros más baratos (más un margen) reduce el sub-problema de
+asignación de n_clients x n_abiertos a ~n_clients x k variables.
+
+Si una configuración resulta infactible con las listas (capacidad fragmentada), los evaluadores
+las amplían (k -> 2k) sólo para ese solve, hasta, en el límite, volver a la matriz densa. Las listas
+base no cambian: el costo de una configuración no depende del orden en que se evaluó.
+"""
+
+import os
+import numpy as np
+
+import instance as instance_io
+
+DEFAULT_MARGIN = 0.25
+
+
+class CandidateLists:
+    def __init__(self, indptr, indices, k, margin, n_locations):
+        """
+        - indptr / indices: estructura CSR; los candidatos del cliente i (0-based) son
+          indices[indptr[i]:indptr[i+1]] (centros 0-based, del más barato al más caro).
+        - k: cantidad garantizada por cliente; margin: holgura relativa sobre el costo del k-ésimo.
+        """
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.k = int(k)
+        self.margin = float(margin)
+        self.n_locations = int(n_locations)
+        self.n_clients = len(self.indptr) - 1
+        # Fila de cada entrada (formato COO), para restringir sin recorrer cliente por cliente
+        self.rows = np.repeat(np.arange(self.n_clients), np.diff(self.indptr))
+        self._wider = None # Listas ampliadas (widen), construidas una sola vez
+        self._keys = None  # Claves ordenadas cliente * n_locations + centro (ver contains)
+
+    def restrict(self, open_idx, TC):
+        """
+        Pares (cliente, posición en open_idx) permitidos para un conjunto abierto (0-based, ordenado).
+        Un cliente sin ningún candidato abierto recibe su centro abierto más barato, para que el
+        sub-problema restringido nunca quede infactible sólo por eso.
+        Retorna (rows, cols) ordenados por cliente.
+        """
+        pos = np.full(self.n_locations, -1, dtype=np.int64)
+        pos[open_idx] = np.arange(len(open_idx))
+        col = pos[self.indices]
+        keep = col >= 0
+        rows, cols = self.rows[keep], col[keep]
+
+        missing = np.nonzero(np.bincount(rows, minlength=self.n_clients) == 0)[0]
+        if missing.size:
+            cheapest = np.argmin(TC[np.ix_(missing, open_idx)], axis=1)
+            rows = np.concatenate([rows, missing])
+            cols = np.concatenate([cols, cheapest])
+            order = np.argsort(rows, kind='stable')
+            rows, cols = rows[order], cols[order]
+        return rows, cols
+
+    def of_client(self, i):
+        """Candidatos (centros 0-based, del más barato al más caro) del cliente i (0-based)."""
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def contains(self, rows, facilities):
+        """Máscara: si cada par (rows[e], facilities[e]) (0-based) está en las listas."""
+        if self._keys is None:
+            self._keys = np.sort(self.rows * self.n_locations + self.indices)
+        keys = np.asarray(rows, dtype=np.int64) * self.n_locations + np.asarray(facilities, dtype=np.int64)
+        found = np.searchsorted(self._keys, keys)
+        return self._keys[np.minimum(found, len(self._keys) - 1)] == keys
+
+    def widen(self, TC):
+        """
+        Listas con el doble de candidatos, o None si ya cubren todos los centros (usar la matriz densa).
+        No modifica estas listas; las ampliadas se construyen una vez y se reutilizan.
+        """
+        if self.k >= self.n_locations:
+            return None
+        if self._wider is None:
+            new_k = min(2 * self.k, self.n_locations)
+            print(f"[Candidates] Configuración infactible con k={self.k}. Construyendo listas con k={new_k}...")
+            self._wider = build_candidate_lists(TC, new_k, self.margin)
+        return self._wider
+
+    def stats(self):
+        sizes = np.diff(self.indptr)
+        return (f"k={self.k} | Margen: {self.margin:.0%} | Candidatos por cliente: "
+                f"prom {sizes.mean():.1f}, máx {sizes.max()} | Densidad: {len(self.indices) / (self.n_clients * self.n_locations):.2%}")
+
+
+def build_candidate_lists(TC, k, margin=DEFAULT_MARGIN, chunk_size=1024):
+    """
+    Construye las listas por bloques de clientes (la matriz TC puede venir de un np.memmap).
+    Cada cliente conserva sus k centros más baratos y, además, los que cuestan a lo más
+    (1 + margin) veces el k-ésimo (hasta 2k en total).
+    """
+    n_clients, n_locations = TC.shape
+    k = max(1, min(k, n_locations))
+    cap = min(n_locations, 2 * k)
+
+    counts, parts = [], []
+    for start in range(0, n_clients, chunk_size):
+        block = np.asarray(TC[start:start + chunk_size])
+        if cap < n_locations:
+            top = np.argpartition(block, cap - 1, axis=1)[:, :cap]
+        else:
+            top = np.tile(np.arange(n_locations), (block.shape[0], 1))
+        vals = np.take_along_axis(block, top, axis=1)
+        order = np.argsort(vals, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        vals = np.take_along_axis(vals, order, axis=1)
+
+        limit = vals[:, k - 1:k] + margin * np.abs(vals[:, k - 1:k])
+        keep = (np.arange(cap)[None, :] < k) | (vals <= limit)
+        counts.append(keep.sum(axis=1))
+        parts.append(top[keep]) # Orden por filas: conserva el orden de costo dentro de cada cliente
+
+    indptr = np.concatenate([[0], np.cumsum(np.concatenate(counts))])
+    return CandidateLists(indptr, np.concatenate(parts), k, margin, n_locations)
+
+
+def candidates_cache_path(dat_file_path, k):
+    """data/instances_dat/X.dat -> data/instances_bin/X.k{k}.npz (junto al caché binario)."""
+    bin_path = instance_io.binary_cache_path(dat_file_path)
+    return f"{os.path.splitext(bin_path)[0]}.k{k}.npz"
+
+
+def save_candidate_lists(lists, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, indptr=lists.indptr, indices=lists.indices,
+             meta=np.array([lists.k, lists.margin, lists.n_locations], dtype=np.float64))
+    os.replace(tmp_path, path)
+
+
+def load_candidate_lists(inst, dat_file_path, k, margin=DEFAULT_MARGIN):
+    """Carga las listas desde el caché en disco si está al día con el .dat; si no, las construye y las guarda."""
+    path = candidates_cache_path(dat_file_path, k)
+    if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(dat_file_path):
+        try:
+            with np.load(path) as data:
+                k_saved, margin_saved, n_loc = data['meta']
+                if int(k_saved) == k and margin_saved == margin and int(n_loc) == inst.n_locations \
+                        and len(data['indptr']) == inst.n_clients + 1:
+                    return CandidateLists(data['indptr'], data['indices'], k, margin, inst.n_locations)
+        except (OSError, KeyError, ValueError) as e:
+            print(f"[Candidates] Caché inválido ({e}). Regenerando...")
+
+    lists = build_candidate_lists(inst.TC, k, margin)
+    try:
+        save_candidate_lists(lists, path)
+    except OSError as e:
+        print(f"[Candidates] No se pudo guardar el caché: {e}")
+    return lists
@@ -0,0 +1,52 @@
+"""
+Puntos de control (checkpoints) de la Búsqueda Tabú.
+Cada cierto número de iteraciones se guarda en disco el estado completo de la búsqueda
+(solución actual y mejor, lista tabú, historial y estado del RNG), de modo que una corrida
+interrumpida (límite de tiempo, kill, corte de luz) pueda retomarse con --resume en vez de
+partir de nuevo desde generate_initial_solution.
+"""
+
+import os
+import pickle
+
+
+class SearchCheckpoint:
+    def __init__(self, path, signature, every=10):
+        """
+        - path: archivo del checkpoint (se sobrescribe de forma atómica).
+        - signature: identifica instancia/modo; un checkpoint de otro contexto no se retoma.
+        - every: guardar cada 'every' iteraciones (además del guardado final).
+        """
+        self.path = path
+        self.signature = signature
+        self.every = max(1, int(every))
+
+    def due(self, iteration):
+        return iteration % self.every == 0
+
+    def save(self, state):
+        """Persiste el diccionario de estado (ver run_tabu_search) con escritura atómica."""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'signature': self.signature, 'state': state}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"[Checkpoint] Error guardando checkpoint: {e}")
+
+    def load(self):
+        """Retorna el estado guardado, o None si no existe, está dañado o es de otra instancia/modo."""
+        if not os.path.exists(self.path):
+            print(f"[Checkpoint] No existe {self.path}. Se parte desde cero.")
+            return None
+        try:
+            with open(self.path, 'rb') as f:
+                data = pickle.load(f)
+        except Exception as e:
+            print(f"[Checkpoint] Error leyendo checkpoint ({e}). Se parte desde cero.")
+            return None
+        if data.get('signature') != self.signature:
+            print("[Checkpoint] El checkpoint corresponde a otra instancia/modo/tenure. Se ignora.")
+            return None
+        return data['state']
@@ -0,0 +1,186 @@
+"""
+Caché de costos por configuración de centros abiertos.
+La Búsqueda Tabú vuelve a visitar las mismas configuraciones (movimientos deshechos al expirar
+el tenure, muestras repetidas en una iteración, etc.). Este módulo evita pagar el solve otra vez.
+- CostCache: diccionario LRU acotado, con clave canónica = bitset empaquetado del conjunto abierto.
+- CachedEvaluator: envoltorio con la misma interfaz que AMPLWrapper que consulta la caché antes de resolver.
+"""
+
+import os
+import pickle
+from collections import OrderedDict
+
+import numpy as np
+
+
+class CostCache:
+    def __init__(self, n_locations, max_entries=50000, signature=None, path=None):
+        """
+        - max_entries: límite de memoria (entradas); al superarlo se descarta la menos usada (LRU).
+        - signature: identifica instancia/modo/evaluador (y candidatos/modelo reducido) para no reutilizar costos de otro contexto al cargar de disco.
+        - path: archivo de persistencia (opcional). Si existe, se carga al crear la caché.
+        """
+        self.n_locations = n_locations
+        self.path = path
+        self.max_entries = max_entries
+        self.signature = signature
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if path is not None:
+            self.load(path)
+
+    def key(self, open_facilities_indices):
+        """Clave canónica: bitset de n_locations bits (índices 1-based), independiente del orden."""
+        mask = np.zeros(self.n_locations, dtype=bool)
+        mask[np.fromiter(open_facilities_indices, dtype=np.int64) - 1] = True
+        return np.packbits(mask).tobytes()
+
+    def get(self, key):
+        cost = self.entries.get(key)
+        if cost is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return cost
+
+    def put(self, key, cost):
+        self.entries[key] = cost
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def report(self):
+        total = self.hits + self.misses
+        rate = (100.0 * self.hits / total) if total else 0.0
+        print(f"[Cache] Hits: {self.hits} | Misses: {self.misses} | Tasa: {rate:.1f}% | "
+              f"Entradas: {len(self.entries)} | Desalojos: {self.evictions}")
+
+    def save(self, path):
+        """Persiste la caché en disco (en orden LRU) para que la próxima corrida parta 'caliente'."""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'signature': self.signature, 'n_locations': self.n_locations,
+                             'entries': list(self.entries.items())}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            print(f"[Cache] Guardada en {path} ({len(self.entries)} entradas)")
+        except Exception as e:
+            print(f"[Cache] Error guardando caché: {e}")
+
+    def load(self, path):
+        """Carga una caché previa si existe y corresponde a la misma firma; si no, se ignora."""
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, 'rb') as f:
+                data = pickle.load(f)
+        except Exception as e:
+            print(f"[Cache] Error leyendo caché ({e}). Se parte en frío.")
+            return
+        if data.get('signature') != self.signature or data.get('n_locations') != self.n_locations:
+            print("[Cache] La caché en disco corresponde a otra instancia/modo/configuración. Se ignora.")
+            return
+        for key, cost in data['entries']:
+            self.put(key, cost)
+        print(f"[Cache] Cargadas {len(self.entries)} entradas desde {path}")
+
+
+class CachedEvaluator:
+    def __init__(self, evaluator, cache, cache_delta=True):
+        """
+        Envuelve un evaluador (AMPLWrapper, TransportEvaluator o ParallelEvaluator).
+        - cache_delta: guardar también los costos de solve_swap_delta. Sólo debe activarse si el delta
+          retorna costos exactos (en modo 'bound' el costo depende del padre y no es canónico).
+        """
+        self.evaluator = evaluator
+        self.cache = cache
+        self.cache_delta = cache_delta
+        self.parent_set = None
+
+    def __getattr__(self, name):
+        # Cualquier otro atributo (ej. .ampl, supports_delta) se delega al evaluador envuelto
+        return getattr(self.evaluator, name)
+
+    def get_n_locations(self):
+        return self.evaluator.get_n_locations()
+
+    def get_total_demand(self):
+        return self.evaluator.get_total_demand()
+
+    def get_capacity_list(self):
+        return self.evaluator.get_capacity_list()
+
+    def set_solver_options(self, options):
+        self.evaluator.set_solver_options(options)
+
+    def solve_assignment_persistent(self, open_facilities_indices):
+        return self.solve_many([open_facilities_indices])[0]
+
+    def _lookup(self, keys, items, solve_batch, keep_inf=True):
+        """
+        Devuelve el costo de cada clave. Sólo se resuelven (en un único lote) las claves que no
+        están en caché; las repetidas dentro del mismo lote se resuelven una sola vez.
+        Con keep_inf=False los costos inf no se guardan (pueden ser descartes, no infactibilidad).
+        """
+        costs = [self.cache.get(k) for k in keys]
+
+        pending = {}
+        for idx, (k, c) in enumerate(zip(keys, costs)):
+            if c is None and k not in pending:
+                pending[k] = idx
+        solved = solve_batch([items[idx] for idx in pending.values()]) if pending else []
+
+        solved_map = dict(zip(pending, solved))
+        for k, c in solved_map.items():
+            if keep_inf or c != float('inf'):
+                self.cache.put(k, c)
+        return [c if c is not None else solved_map[k] for k, c in zip(keys, costs)]
+
+    def _solve_batch(self, open_sets):
+        if hasattr(self.evaluator, 'solve_many'):
+            return self.evaluator.solve_many(open_sets)
+        return [self.evaluator.solve_assignment_persistent(s) for s in open_sets]
+
+    def _delta_batch(self, moves, cutoff=float('inf')):
+        if hasattr(self.evaluator, 'solve_swap_delta_many'):
+            return self.evaluator.solve_swap_delta_many(moves, cutoff)
+        return [self.evaluator.solve_swap_delta(move, cutoff)[0] for move in moves]
+
+    def solve_many(self, open_sets):
+        open_sets = [list(s) for s in open_sets]
+        return self._lookup([self.cache.key(s) for s in open_sets], open_sets, self._solve_batch)
+
+    def set_parent(self, open_facilities_indices):
+        # El padre siempre se resuelve (el delta necesita su flujo y duales), pero su costo es exacto
+        self.parent_set = set(open_facilities_indices)
+        cost = self.evaluator.set_parent(open_facilities_indices)
+        self.cache.put(self.cache.key(self.parent_set), cost)
+        return cost
+
+    def solve_swap_delta_many(self, moves, cutoff=float('inf')):
+        if not self.cache_delta:
+            return self._delta_batch(moves, cutoff)
+
+        keys = []
+        for j_close, j_open in moves:
+            neighbor = self.parent_set - {j_close}
+            neighbor.add(j_open)
+            keys.append(self.cache.key(neighbor))
+        # Un vecino descartado por el cutoff retorna inf sin ser infactible: no se guarda
+        return self._lookup(keys, list(moves), lambda batch: self._delta_batch(batch, cutoff),
+                            keep_inf=(cutoff == float('inf')))
+
+    def get_final_solution(self, open_facilities_indices, mode):
+        # La solución final siempre se resuelve: se necesitan las asignaciones, no sólo el costo
+        return self.evaluator.get_final_solution(open_facilities_indices, mode)
+
+    def close(self):
+        self.cache.report()
+        if self.cache.path is not None:
+            self.cache.save(self.cache.path)
+        self.evaluator.close()
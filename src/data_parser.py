@@ -1,178 +1,536 @@
 import os
+import re
 import sys
+import time
+import json
+import shutil
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 
-def parse_and_convert(txt_file_path, dat_file_path):
+import numpy as np
+
+import instance as instance_io
+
+# Tamaño de lectura por bloque. La memoria máxima del parser depende de este valor,
+# no del tamaño de la instancia (5000x5000 = 25M costos se procesan por partes).
+CHUNK_SIZE = 4 * 1024 * 1024
+
+_TOKEN_RE = re.compile(rb'\S+')
+
+
+def _to_floats(tokens):
+    """Convierte tokens (bytes) a float64. Si hay tokens no numéricos (ej. '*'), los ignora."""
+    try:
+        return np.array(tokens, dtype=np.float64)
+    except ValueError:
+        values = []
+        for tok in tokens:
+            try:
+                values.append(float(tok))
+            except ValueError:
+                pass  # Ignorar cualquier cosa que no sea un número
+        return np.array(values, dtype=np.float64)
+
+
+class _ChunkReader:
     """
-    Lee un archivo de instancia .txt y lo convierte 
-    a un archivo .dat compatible con AMPL.
+    Lector por bloques de un archivo abierto en modo binario.
+    Permite leer línea a línea (cabecera, localizaciones, separadores) o consumir
+    directamente números de un bloque continuo sin cargar el archivo completo.
     """
-    print(f"Iniciando conversión: {txt_file_path} -> {dat_file_path}")
-    
-    try:
-        with open(txt_file_path, 'r') as f:
-            lines = f.readlines()
-    except FileNotFoundError:
-        print(f"Error: No se encontró el archivo de entrada: {txt_file_path}")
-        return
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = b''
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
 
-    # --- Leer Cabecera (loc, cli) ---
-    current_line_index = 0
-    try:
-        parts = lines[current_line_index].strip().split()
-        n_locations = int(parts[0])
-        n_clients = int(parts[1])
-        current_line_index += 1
-    except Exception as e:
-        print(f"Error leyendo cabecera (loc, cli) de {txt_file_path}: {e}")
-        return
-
-    # --- Omitir primer separador (*) ---
-    while '*' not in lines[current_line_index]:
-        current_line_index += 1
-    current_line_index += 1 # Se mueve a la línea siguiente al *
-
-    # Listas para guardar los datos
-    out_lines = []
-    
-    # Añadir cabeceras del .dat
-    out_lines.append(f"param cli := {n_clients};\n")
-    out_lines.append(f"param loc := {n_locations};\n\n")
-
-    # --- Bloque 1: Leer Datos de Localizaciones (ICap y FC) ---
-    print(f"Leyendo {n_locations} localizaciones...")
-    try:
-        fc_str = ["param FC :="]
-        icap_str = ["param ICap :="]
-        
-        for j in range(n_locations):
-            line = lines[current_line_index + j]
-            parts = line.strip().split()
-            
-            capacity = float(parts[0])
-            fixed_cost = float(parts[1])
-            
-            icap_str.append(f"\n\t{j + 1}\t{capacity}")
-            fc_str.append(f"\n\t{j + 1}\t{fixed_cost}")
-        
-        out_lines.append("".join(fc_str) + ";\n\n")
-        out_lines.append("".join(icap_str) + ";\n\n")
-        
-        current_line_index += n_locations
-    except Exception as e:
-        print(f"Error leyendo el bloque de localizaciones: {e}")
-        return
-
-    # Función auxiliar para leer bloques continuos de números
-    def read_continuous_block(start_index, total_count):
-        """Lee un bloque de 'total_count' números que pueden estar en varias líneas."""
-        data_list = []
-        current_count = 0
-        idx = start_index
-        
-        while current_count < total_count:
-            if idx >= len(lines):
+    def _fill(self):
+        data = self.f.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return
+        self.bytes_read += len(data)
+        # Se descarta lo ya consumido para mantener acotado el buffer
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+
+    def tell(self):
+        """Posición absoluta (en bytes) del próximo byte sin consumir."""
+        return self.bytes_read - (len(self.buf) - self.pos)
+
+    def readline(self):
+        """Retorna la siguiente línea (bytes) o b'' al llegar al fin del archivo."""
+        while True:
+            idx = self.buf.find(b'\n', self.pos)
+            if idx >= 0 or self.eof:
+                break
+            self._fill()
+        if idx < 0:
+            line = self.buf[self.pos:]
+            self.pos = len(self.buf)
+        else:
+            line = self.buf[self.pos:idx + 1]
+            self.pos = idx + 1
+        return line
+
+    def skip_past_separator(self):
+        """Avanza hasta la línea siguiente a la que contiene el separador '*'."""
+        while True:
+            line = self.readline()
+            if not line:
+                raise Exception("Error: Fin de archivo inesperado buscando separador '*'.")
+            if b'*' in line:
+                return
+
+    def read_numbers(self, total_count, consume):
+        """
+        Lee un bloque de 'total_count' números que pueden estar en varias líneas.
+        Los valores se entregan por partes a consume(array) a medida que se leen.
+        """
+        remaining = total_count
+        while remaining > 0:
+            if not self.eof and self.buf.find(b'\n', self.pos) < 0:
+                self._fill()
+                continue
+
+            # Sólo se procesan tokens completos: hasta el último salto de línea del buffer
+            end = len(self.buf) if self.eof else self.buf.rfind(b'\n') + 1
+            if end <= self.pos:
                 raise Exception("Error: Fin de archivo inesperado leyendo bloque.")
-            
-            line_parts = lines[idx].strip().split()
-            for part in line_parts:
-                # Ignorar cualquier cosa que no sea un número
-                if part == '*':
-                    continue
+
+            values = _to_floats(self.buf[self.pos:end].split())
+            if len(values) < remaining:
+                consume(values)
+                remaining -= len(values)
+                self.pos = end
+                continue
+
+            # Último tramo del bloque: ubicar el byte exacto donde termina el número 'remaining'
+            count = 0
+            for match in _TOKEN_RE.finditer(self.buf, self.pos, end):
                 try:
-                    data_list.append(float(part))
-                    current_count += 1
+                    float(match.group())
                 except ValueError:
-                    # Si algo más falla, lo ignoramos y seguimos
-                    pass 
-                
-                if current_count == total_count:
+                    continue
+                count += 1
+                if count == remaining:
+                    self.pos = match.end()
                     break
-            idx += 1
-            
-        return data_list, idx # Retorna la lista de datos y el nuevo índice de línea
+            consume(values[:remaining])
+            remaining = 0
+
 
-    # Saltar separador entre Bloque 1 y 2
+def _format_indexed(values, start):
+    """Formato '\\n\\t{idx}\\t{valor}' usado por los parámetros vectoriales del .dat."""
+    return "".join(f"\n\t{start + k}\t{v}" for k, v in enumerate(values.tolist()))
+
+
+def _format_tc_span(values, first_pos, n_locations):
+    """
+    Formatea un tramo de costos TC cuyo primer valor ocupa la posición global 'first_pos'
+    (orden por filas). Agrega el índice de cliente al inicio de cada fila y el salto de línea al final,
+    por lo que tramos consecutivos concatenados producen exactamente la tabla del .dat.
+    """
+    out = []
+    vals = values.tolist()
+    k, pos, n = 0, first_pos, len(vals)
+    while k < n:
+        row, col = divmod(pos, n_locations)
+        take = min(n_locations - col, n - k)
+        prefix = f"\t{row + 1}\t" if col == 0 else ""
+        suffix = "\n" if col + take == n_locations else ""
+        out.append(prefix + "".join(f"{v}\t" for v in vals[k:k + take]) + suffix)
+        k += take
+        pos += take
+    return "".join(out)
+
+
+def _iter_range_numbers(path, start, end, chunk_size=CHUNK_SIZE):
+    """Genera arreglos con los números del rango de bytes [start, end) (que inicia y termina en límite de línea)."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        pending = b''
+        remaining = end - start
+        while remaining > 0:
+            data = f.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            data = pending + data
+            cut = data.rfind(b'\n') + 1 if remaining > 0 else len(data)
+            pending = data[cut:]
+            yield _to_floats(data[:cut].split())
+        if pending:
+            yield _to_floats(pending.split())
+
+
+def _count_range(path, start, end):
+    """Fase 1 del TC paralelo: cuenta los números de un rango de bytes."""
+    return sum(len(v) for v in _iter_range_numbers(path, start, end))
+
+
+def _convert_range(path, start, end, first_pos, total, n_locations, dat_part_path, bin_path, bin_offset):
+    """
+    Fase 2 del TC paralelo: conociendo la posición global del primer número del rango,
+    escribe su fragmento formateado del .dat y sus valores en el binario (rangos disjuntos).
+    """
+    pos = first_pos
+    bin_f = open(bin_path, 'r+b') if bin_path else None
     try:
-        while '*' not in lines[current_line_index]:
-            current_line_index += 1
-        current_line_index += 1 # Moverse a la línea después del *
-    except IndexError:
-        print("Error: Se esperaba un separador '*' después del bloque de localizaciones.")
-        return
-
-    # --- Bloque 2: Leer Demandas (dem) ---
-    print(f"Leyendo {n_clients} demandas...")
+        if bin_f:
+            bin_f.seek(bin_offset + first_pos * instance_io.BIN_DTYPE.itemsize)
+        with open(dat_part_path, 'w') as part:
+            for values in _iter_range_numbers(path, start, end):
+                values = values[:max(total - pos, 0)] # Números sobrantes al final del archivo se ignoran
+                if not len(values):
+                    break
+                part.write(_format_tc_span(values, pos, n_locations))
+                if bin_f:
+                    bin_f.write(values.astype(instance_io.BIN_DTYPE).tobytes())
+                pos += len(values)
+    finally:
+        if bin_f:
+            bin_f.close()
+    return pos - first_pos
+
+
+def _split_ranges(path, start, n_parts):
+    """Divide [start, EOF) en n_parts rangos de bytes ajustados al siguiente salto de línea."""
+    size = os.path.getsize(path)
+    bounds = [start]
+    with open(path, 'rb') as f:
+        for k in range(1, n_parts):
+            target = max(start + (size - start) * k // n_parts, bounds[-1])
+            f.seek(target)
+            f.readline() # Avanzar hasta el final de la línea actual
+            bounds.append(min(f.tell(), size))
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def _convert_tc_parallel(txt_file_path, start, total, n_locations, f_dat, dat_tmp, bin_tmp, tc_offset, workers):
+    """
+    Convierte el bloque TC repartiéndolo en rangos de bytes entre 'workers' procesos:
+    1. Cada proceso cuenta los números de su rango (para conocer su posición global).
+    2. Cada proceso escribe su fragmento del .dat y su parte del binario; el maestro concatena en orden.
+    """
+    ranges = _split_ranges(txt_file_path, start, workers)
+    parts = [f"{dat_tmp}.part{k}" for k in range(len(ranges))]
     try:
-        all_demands, current_line_index_after_dem = read_continuous_block(current_line_index, n_clients)
-        
-        dem_str = ["param dem :="]
-        for i, demand in enumerate(all_demands):
-            dem_str.append(f"\n\t{i + 1}\t{demand}")
-            
-        out_lines.append("".join(dem_str) + ";\n\n")
-        
-        # Saltar separador entre Bloque 2 y 3
-        current_line_index = current_line_index_after_dem
-        while '*' not in lines[current_line_index]:
-            current_line_index += 1
-        current_line_index += 1 # Moverse a la línea *después* del *
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            counts = list(pool.map(_count_range, *zip(*[(txt_file_path, a, b) for a, b in ranges])))
+            if sum(counts) < total:
+                raise Exception("Error: Fin de archivo inesperado leyendo bloque.")
 
-    except Exception as e:
-        print(f"Error leyendo el bloque de demandas: {e}")
-        return
+            first = np.concatenate([[0], np.cumsum(counts)[:-1]]).tolist()
+            jobs = [pool.submit(_convert_range, txt_file_path, a, b, p0, total, n_locations, part, bin_tmp, tc_offset)
+                    for (a, b), p0, part in zip(ranges, first, parts)]
+            for job in jobs:
+                job.result()
+
+        for part in parts:
+            with open(part, 'r') as src:
+                shutil.copyfileobj(src, f_dat)
+    finally:
+        for part in parts:
+            if os.path.exists(part):
+                os.remove(part)
+
+
+def parse_and_convert(txt_file_path, dat_file_path, bin_file_path=None, chunk_size=CHUNK_SIZE, tc_workers=1):
+    """
+    Lee un archivo de instancia .txt y lo convierte
+    a un archivo .dat compatible con AMPL.
+
+    El archivo se procesa en streaming: se tokeniza por bloques de 'chunk_size' bytes y la salida
+    se escribe a medida que se lee, por lo que la memoria usada no depende del tamaño de la instancia.
+    Si se indica 'bin_file_path', en la misma pasada se genera el formato binario (ver instance.py).
+    Con tc_workers > 1 el bloque TC (el 99% del archivo) se convierte en paralelo por rangos de bytes.
+    Retorna True si la conversión terminó correctamente.
+    """
+    print(f"Iniciando conversión: {txt_file_path} -> {dat_file_path}")
+    start_time = time.time()
+
+    try:
+        f_in = open(txt_file_path, 'rb')
+    except FileNotFoundError:
+        print(f"Error: No se encontró el archivo de entrada: {txt_file_path}")
+        return False
+
+    # Las salidas se escriben a temporales y se renombran sólo si la conversión termina bien
+    dat_tmp = dat_file_path + ".tmp"
+    bin_tmp = bin_file_path + ".tmp" if bin_file_path else None
+    f_dat = f_bin = None
+    ok = False
 
-    # --- Bloque 3: Leer Costos de Transporte (TC) ---
-    print(f"Leyendo {n_clients}x{n_locations} costos de transporte...")
     try:
-        total_costs = n_clients * n_locations
-        # El índice 'current_line_index' ya está apuntando al inicio del Bloque 3
-        all_costs, current_line_index = read_continuous_block(current_line_index, total_costs)
-        
-        # Escribir la cabecera de la matriz TC
-        tc_header = ["param TC :\n\t"]
-        tc_header.extend([f"{j+1}\t" for j in range(n_locations)])
-        tc_header.append(":=")
-        out_lines.append("".join(tc_header) + "\n")
-        
-        # Escribir las filas de la matriz
-        cost_idx = 0
-        for i in range(n_clients):
-            row_str = [f"\t{i + 1}\t"] # Índice de la fila (cliente)
+        reader = _ChunkReader(f_in, chunk_size)
+
+        # --- Leer Cabecera (loc, cli) ---
+        try:
+            parts = reader.readline().split()
+            n_locations = int(parts[0])
+            n_clients = int(parts[1])
+        except Exception as e:
+            print(f"Error leyendo cabecera (loc, cli) de {txt_file_path}: {e}")
+            return False
+
+        os.makedirs(os.path.dirname(os.path.abspath(dat_file_path)), exist_ok=True)
+        f_dat = open(dat_tmp, 'w')
+        offsets = None
+        if bin_file_path:
+            os.makedirs(os.path.dirname(os.path.abspath(bin_file_path)), exist_ok=True)
+            f_bin = open(bin_tmp, 'wb')
+            offsets = instance_io.write_binary_header(f_bin, n_clients, n_locations)
+
+        # --- Omitir primer separador (*) ---
+        reader.skip_past_separator()
+
+        # Añadir cabeceras del .dat
+        f_dat.write(f"param cli := {n_clients};\n")
+        f_dat.write(f"param loc := {n_locations};\n\n")
+
+        # --- Bloque 1: Leer Datos de Localizaciones (ICap y FC) ---
+        # Son sólo n_locations pares: se guardan en memoria porque el .dat escribe FC antes que ICap.
+        print(f"Leyendo {n_locations} localizaciones...")
+        try:
+            icap = np.empty(n_locations, dtype=np.float64)
+            fc = np.empty(n_locations, dtype=np.float64)
             for j in range(n_locations):
-                row_str.append(f"{all_costs[cost_idx]}\t")
-                cost_idx += 1
-            out_lines.append("".join(row_str) + "\n")
-        
-        out_lines.append(";\n")
-    except Exception as e:
-        print(f"Error leyendo el bloque de costos de transporte: {e}")
-        return
+                parts = reader.readline().split()
+                icap[j] = float(parts[0])
+                fc[j] = float(parts[1])
+
+            f_dat.write("param FC :=" + _format_indexed(fc, 1) + ";\n\n")
+            f_dat.write("param ICap :=" + _format_indexed(icap, 1) + ";\n\n")
+            if f_bin:
+                for offset, arr in zip(offsets[:2], (icap, fc)):
+                    f_bin.seek(offset)
+                    f_bin.write(arr.astype(instance_io.BIN_DTYPE).tobytes())
+        except Exception as e:
+            print(f"Error leyendo el bloque de localizaciones: {e}")
+            return False
 
-    # --- Escribir el archivo .dat ---
+        # Saltar separador entre Bloque 1 y 2
+        try:
+            reader.skip_past_separator()
+        except Exception:
+            print("Error: Se esperaba un separador '*' después del bloque de localizaciones.")
+            return False
+
+        # --- Bloque 2: Leer Demandas (dem) ---
+        print(f"Leyendo {n_clients} demandas...")
+        try:
+            f_dat.write("param dem :=")
+            if f_bin:
+                f_bin.seek(offsets[2])
+            written = [0]
+
+            def write_demands(values):
+                f_dat.write(_format_indexed(values, written[0] + 1))
+                if f_bin:
+                    f_bin.write(values.astype(instance_io.BIN_DTYPE).tobytes())
+                written[0] += len(values)
+
+            reader.read_numbers(n_clients, write_demands)
+            f_dat.write(";\n\n")
+
+            # Saltar separador entre Bloque 2 y 3 (se descarta el resto de la línea actual)
+            reader.readline()
+            reader.skip_past_separator()
+        except Exception as e:
+            print(f"Error leyendo el bloque de demandas: {e}")
+            return False
+
+        # --- Bloque 3: Leer Costos de Transporte (TC) ---
+        print(f"Leyendo {n_clients}x{n_locations} costos de transporte...")
+        try:
+            # Escribir la cabecera de la matriz TC
+            f_dat.write("param TC :\n\t" + "".join(f"{j+1}\t" for j in range(n_locations)) + ":=\n")
+            if f_bin:
+                f_bin.seek(offsets[3])
+
+            total_costs = n_clients * n_locations
+            if tc_workers > 1:
+                # El maestro libera sus buffers: los procesos escriben directamente en los archivos
+                f_dat.flush()
+                if f_bin:
+                    f_bin.truncate(instance_io.binary_layout(n_clients, n_locations)[1])
+                    f_bin.flush()
+                _convert_tc_parallel(txt_file_path, reader.tell(), total_costs, n_locations,
+                                     f_dat, dat_tmp, bin_tmp, offsets[3] if f_bin else 0, tc_workers)
+            else:
+                # Posición global del próximo costo (los bloques leídos no coinciden con filas)
+                position = [0]
+
+                def write_costs(values):
+                    if f_bin:
+                        f_bin.write(values.astype(instance_io.BIN_DTYPE).tobytes())
+                    f_dat.write(_format_tc_span(values, position[0], n_locations))
+                    position[0] += len(values)
+
+                reader.read_numbers(total_costs, write_costs)
+            f_dat.write(";\n")
+        except Exception as e:
+            print(f"Error leyendo el bloque de costos de transporte: {e}")
+            return False
+
+        ok = True
+
+    finally:
+        f_in.close()
+        for handle in (f_dat, f_bin):
+            if handle:
+                handle.close()
+        if not ok:
+            for tmp in (dat_tmp, bin_tmp):
+                if tmp and os.path.exists(tmp):
+                    os.remove(tmp)
+
+    # --- Publicar los archivos generados ---
     try:
-        os.makedirs(os.path.dirname(dat_file_path), exist_ok=True)
-        
-        with open(dat_file_path, 'w') as f:
-            f.writelines(out_lines)
-            
+        os.replace(dat_tmp, dat_file_path)
+        # El binario se publica después del .dat para que su fecha sea igual o posterior (caché válido)
+        if bin_file_path:
+            os.replace(bin_tmp, bin_file_path)
+
+        elapsed = time.time() - start_time
+        mb = os.path.getsize(txt_file_path) / (1024 * 1024)
         print(f"Archivo guardado en {dat_file_path} con éxito!")
-        
+        print(f"[Parser] {mb:.1f} MB leídos en {elapsed:.2f}s ({mb / max(elapsed, 1e-9):.1f} MB/s)")
+        return True
+
     except Exception as e:
         print(f"Error escribiendo el archivo .dat: {e}")
+        return False
+
+
+# --- Conversión por lotes ---
+# manifest.json (en el directorio de los .dat) registra, por cada .txt convertido, el tamaño y el
+# hash SHA-256 de la fuente. Una salida sólo se omite si ambos coinciden y los archivos existen.
+MANIFEST_NAME = 'manifest.json'
+
+
+def file_sha256(path, chunk_size=CHUNK_SIZE):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(dat_dir):
+    path = os.path.join(dat_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"[Parser] Manifest ilegible ({e}). Se regenerarán todas las salidas.")
+        return {}
+
+
+def save_manifest(dat_dir, manifest):
+    path = os.path.join(dat_dir, MANIFEST_NAME)
+    with open(path + ".tmp", 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def _is_up_to_date(record, txt_path, outputs):
+    """Compara primero el tamaño (barato) y sólo si coincide calcula el hash de la fuente."""
+    if not record or not all(os.path.exists(o) for o in outputs):
+        return False
+    if record.get('source_size') != os.path.getsize(txt_path):
+        return False
+    return record.get('source_sha256') == file_sha256(txt_path)
+
+
+def _convert_job(txt_path, dat_path, bin_path, tc_workers):
+    """Convierte una instancia y retorna sus métricas (ejecutable en un proceso del pool)."""
+    t0 = time.time()
+    ok = parse_and_convert(txt_path, dat_path, bin_path, tc_workers=tc_workers)
+    return {
+        'ok': bool(ok),
+        'seconds': time.time() - t0,
+        'source_size': os.path.getsize(txt_path),
+        'source_sha256': file_sha256(txt_path) if ok else None,
+    }
+
+
+def convert_batch(txt_dir, dat_dir, workers=1, force=False):
+    """
+    Convierte todos los .txt de 'txt_dir' a .dat (y caché binario), omitiendo los que estén al día.
+    - Varias instancias pendientes: se reparten entre 'workers' procesos (una instancia por proceso).
+    - Una sola instancia pendiente: su bloque TC se divide en 'workers' rangos paralelos.
+    Imprime un resumen con el tiempo de cada archivo.
+    """
+    os.makedirs(dat_dir, exist_ok=True)
+    manifest = load_manifest(dat_dir)
+
+    jobs, summary = [], []
+    for f in sorted(os.listdir(txt_dir)):
+        if not f.endswith(".txt"):
+            continue
+        txt = os.path.join(txt_dir, f)
+        dat = os.path.join(dat_dir, f.replace(".txt", ".dat"))
+        bin_path = instance_io.binary_cache_path(dat)
+        if not force and _is_up_to_date(manifest.get(f), txt, [dat, bin_path]):
+            summary.append((f, "omitido (al día)", 0.0, os.path.getsize(txt)))
+            continue
+        jobs.append((f, txt, dat, bin_path))
+
+    results = {}
+    if len(jobs) == 1 or workers <= 1:
+        tc_workers = workers if len(jobs) == 1 else 1
+        for f, txt, dat, bin_path in jobs:
+            results[f] = _convert_job(txt, dat, bin_path, tc_workers)
+    elif jobs:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            futures = {f: pool.submit(_convert_job, txt, dat, bin_path, 1) for f, txt, dat, bin_path in jobs}
+            for f, future in futures.items():
+                try:
+                    results[f] = future.result()
+                except Exception as e:
+                    print(f"[Parser] Error convirtiendo {f}: {e}")
+                    results[f] = {'ok': False, 'seconds': 0.0, 'source_size': 0, 'source_sha256': None}
+
+    for f, txt, dat, bin_path in jobs:
+        r = results[f]
+        if r['ok']:
+            manifest[f] = {
+                'source_size': r['source_size'],
+                'source_sha256': r['source_sha256'],
+                'outputs': [os.path.basename(dat), os.path.basename(bin_path)],
+            }
+        else:
+            manifest.pop(f, None)
+        summary.append((f, "convertido" if r['ok'] else "ERROR", r['seconds'], r['source_size']))
+    save_manifest(dat_dir, manifest)
+
+    print("\n[Parser] Resumen de conversión:")
+    for f, status, seconds, size in sorted(summary):
+        rate = f"{size / (1024 * 1024) / seconds:.1f} MB/s" if status == "convertido" and seconds > 0 else "-"
+        print(f"  {f:<30} {status:<18} {seconds:8.2f}s  {rate}")
+    return summary
 
 
 # --- Bloque para probar este script individualmente ---
 if __name__ == "__main__":
-    
+
     if len(sys.argv) > 1:
         instance_name = sys.argv[1] # Ej: "2000x2000_1"
     else:
         print("Advertencia: No se especificó instancia. Usando '2000x2000_1' por defecto.")
-        instance_name = "2000x2000_1" 
+        instance_name = "2000x2000_1"
 
     base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-    
+
     txt_path = os.path.join(base_dir, 'data', 'instances_txt', f"{instance_name}.txt")
     dat_path = os.path.join(base_dir, 'data', 'instances_dat', f"{instance_name}.dat")
-    
-    parse_and_convert(txt_path, dat_path)
\ No newline at end of file
+    bin_path = os.path.join(base_dir, 'data', 'instances_bin', f"{instance_name}.bin")
+
+    parse_and_convert(txt_path, dat_path, bin_path)
@@ -0,0 +1,693 @@
+"""
+Evaluadores en proceso (sin AMPL) para el sub-problema de asignación.
+Exponen la misma interfaz que ampl_solver.AMPLWrapper, de modo que la Búsqueda Tabú
+puede usarlos indistintamente:
+- get_n_locations / get_total_demand / get_capacity_list
+- solve_assignment_persistent(open_facilities_indices) -> costo total
+- get_final_solution(open_facilities_indices, mode) -> (costo, asignaciones)
+- set_solver_options / close
+
+No requieren licencia de AMPL ni Gurobi: resuelven directamente desde arreglos NumPy.
+"""
+
+import time
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+from instance import load_instance
+import candidates as candidates_io
+from instrumentation import new_solver_stats
+from utils import Assignment
+
+# Códigos de scipy.optimize.linprog -> estado registrado en 'stats'
+LINPROG_STATUS = {0: "optimal", 1: "iteration_limit", 2: "infeasible", 3: "unbounded", 4: "numerical"}
+
+
+class TransportEvaluator:
+    def __init__(self, instance_or_path):
+        """
+        Evaluador Multi-Source.
+        Con el vector 'x' fijo, el modelo CFLP_MultiSource.mod se reduce a un problema de
+        transporte: cada cliente reparte su demanda entre los centros abiertos respetando ICap.
+        Se resuelve como LP con HiGHS (símplex dual) usando sólo las columnas de centros abiertos.
+        """
+        if isinstance(instance_or_path, str):
+            print("[Evaluator] Leyendo instancia en NumPy... (esto se hace 1 vez)")
+            self.instance = load_instance(instance_or_path)
+        else:
+            self.instance = instance_or_path
+
+        inst = self.instance
+        self.n_locations = inst.n_locations
+        self.n_clients = inst.n_clients
+        self.total_demand = inst.total_demand
+        self.capacity_list = inst.get_capacity_list()
+
+        # Resultado de la última resolución (usado por get_final_solution)
+        self.last_open = None
+        self.last_flow = None
+
+        # Estado de la solución "padre" para la evaluación incremental de SWAPs (ver set_parent)
+        self.parent = None
+        # Si la brecha entre cotas del delta supera la tolerancia, resolver el vecino de forma exacta
+        self.delta_exact_fallback = True
+        self.delta_tolerance = 1e-6
+        # Listas de candidatos (candidates.py): si existen, el LP sólo usa los pares cliente-centro listados
+        self.candidates = None
+        self.stats = new_solver_stats() # Tiempos por fase y estados del solver (ver instrumentation.py)
+        print(f"[Evaluator] Demanda Total: {self.total_demand:,.0f} | Locs: {self.n_locations}")
+
+    def get_n_locations(self):
+        return self.n_locations
+
+    def get_total_demand(self):
+        return self.total_demand
+
+    def get_capacity_list(self):
+        return self.capacity_list
+
+    def set_solver_options(self, options):
+        # HiGHS resuelve el LP de transporte a optimalidad; no hay gap ni límite de tiempo que ajustar.
+        pass
+
+    def _build_transport_lp(self, open_idx):
+        """
+        Construye el LP de transporte sobre los centros abiertos (índices 0-based).
+        Variable v = i * k + jj  <->  y[i, open_idx[jj]].
+        """
+        inst = self.instance
+        k = len(open_idx)
+
+        cost = inst.TC[:, open_idx].ravel()
+        # allocation: sum_j y[i,j] = 1 para cada cliente
+        A_eq = sparse.kron(sparse.identity(self.n_clients, format='csr'), np.ones((1, k)), format='csr')
+        b_eq = np.ones(self.n_clients)
+        # capacity_con: sum_i dem[i] * y[i,j] <= ICap[j] para cada centro abierto
+        A_ub = sparse.kron(inst.dem.reshape(1, -1), sparse.identity(k, format='csr'), format='csr')
+        b_ub = inst.ICap[open_idx]
+        return cost, A_ub, b_ub, A_eq, b_eq
+
+    def _build_sparse_transport_lp(self, open_idx, rows, cols):
+        """Igual que _build_transport_lp, pero sólo con los pares (rows[v], open_idx[cols[v]]) de las listas de candidatos."""
+        inst = self.instance
+        k, nnz = len(open_idx), len(rows)
+        cost = inst.TC[rows, open_idx[cols]]
+        A_eq = sparse.csr_matrix((np.ones(nnz), (rows, np.arange(nnz))), shape=(self.n_clients, nnz))
+        b_eq = np.ones(self.n_clients)
+        A_ub = sparse.csr_matrix((inst.dem[rows], (cols, np.arange(nnz))), shape=(k, nnz))
+        b_ub = inst.ICap[open_idx]
+        return cost, A_ub, b_ub, A_eq, b_eq
+
+    def set_candidates(self, lists):
+        self.candidates = lists
+
+    def _solve(self, open_idx):
+        """
+        Devuelve (costo_total, flujo, duales) o (inf, None, None) si la configuración es infactible.
+        duales = (u, w): u[i] de 'allocation' y w[jj] >= 0 de 'capacity_con'.
+        Con listas de candidatos el LP es disperso; si resulta infactible, se reintenta con listas ampliadas
+        (sólo para esta configuración: self.candidates no cambia).
+        """
+        inst = self.instance
+        # Descarte rápido: la capacidad abierta no alcanza para cubrir la demanda total
+        if len(open_idx) == 0 or inst.ICap[open_idx].sum() < self.total_demand - 1e-9:
+            self.stats['status']['capacity'] += 1
+            return float('inf'), None, None
+
+        lists = self.candidates
+        while True:
+            start = time.perf_counter()
+            if lists is None:
+                rows = None
+                cost, A_ub, b_ub, A_eq, b_eq = self._build_transport_lp(open_idx)
+            else:
+                rows, cols = lists.restrict(open_idx, inst.TC)
+                cost, A_ub, b_ub, A_eq, b_eq = self._build_sparse_transport_lp(open_idx, rows, cols)
+
+            built = time.perf_counter()
+            # y <= 1 ya está implicado por 'allocation'; no se declara para que el dual sea sólo (u, w)
+            res = linprog(cost, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq,
+                          bounds=(0, None), method='highs')
+            self.stats['t_fix'] += built - start
+            self.stats['t_solve'] += time.perf_counter() - built
+            self.stats['solves'] += 1
+            self.stats['status'][LINPROG_STATUS.get(res.status, str(res.status))] += 1
+            if res.status == 2 and rows is not None:
+                # Infactible sólo por las listas (la capacidad total alcanza): se amplían sólo para este solve
+                lists = lists.widen(inst.TC)
+                continue
+            break
+
+        if res.status != 0:
+            return float('inf'), None, None
+
+        start = time.perf_counter()
+        total = float(inst.FC[open_idx].sum() + res.fun)
+        duals = (res.eqlin.marginals, np.maximum(-res.ineqlin.marginals, 0.0))
+        if rows is None:
+            flow = res.x.reshape(self.n_clients, len(open_idx))
+        else:
+            flow = np.zeros((self.n_clients, len(open_idx)))
+            flow[rows, cols] = res.x
+        self.stats['t_parse'] += time.perf_counter() - start
+        return total, flow, duals
+
+    def solve_assignment_persistent(self, open_facilities_indices):
+        """
+        Mismo contrato que AMPLWrapper.solve_assignment_persistent:
+        recibe índices 1-based de centros abiertos y retorna el valor de Total_Cost.
+        """
+        try:
+            open_idx = np.array(sorted(open_facilities_indices), dtype=np.int64) - 1
+            total, flow, _ = self._solve(open_idx)
+            self.last_open, self.last_flow = open_idx, flow
+            return total
+        except Exception as e:
+            print(f"[Evaluator] Error en solve_assignment_persistent: {e}")
+            return float('inf')
+
+    def get_final_solution(self, open_facilities_indices, mode):
+        """Recupera la asignación (Assignment: sólo entradas no nulas) de la mejor configuración encontrada."""
+        final_cost = self.solve_assignment_persistent(open_facilities_indices)
+        if final_cost == float('inf'):
+            return final_cost, None
+
+        threshold = 1e-5 if mode == "MS" else 0.9
+        rows, cols = np.nonzero(self.last_flow > threshold)
+        values = None if mode == "SS" else self.last_flow[rows, cols]
+        return final_cost, Assignment(rows + 1, self.last_open[cols] + 1, values, self.n_clients)
+
+    # ------------------------------------------------------------------
+    # Evaluación incremental de movimientos SWAP
+    # ------------------------------------------------------------------
+    def set_parent(self, open_facilities_indices):
+        """
+        Resuelve de forma exacta la configuración actual de la Búsqueda Tabú y guarda
+        su flujo (en unidades de demanda, formato disperso) y sus duales.
+        Los vecinos SWAP se evalúan luego con solve_swap_delta a partir de este estado.
+        Retorna el costo exacto de la configuración.
+        """
+        inst = self.instance
+        open_idx = np.array(sorted(open_facilities_indices), dtype=np.int64) - 1
+        total, flow, duals = self._solve(open_idx)
+        self.last_open, self.last_flow = open_idx, flow
+        if total == float('inf'):
+            self.parent = None
+            return total
+
+        _, w = duals
+        k = len(open_idx)
+        pos = np.full(self.n_locations, -1, dtype=np.int64)
+        pos[open_idx] = np.arange(k)
+
+        # Flujo básico disperso: (cliente, columna, cantidad de demanda)
+        rows, cols = np.nonzero(flow > 1e-12)
+        amounts = flow[rows, cols] * inst.dem[rows]
+        used = np.bincount(cols, weights=amounts, minlength=k)
+
+        # Costo reducido por cliente con los duales de capacidad: min_j TC[i,j] + dem[i] * w[j].
+        # Guardamos el mínimo y el segundo mínimo para excluir en O(1) al centro que se cierra.
+        reduced = inst.TC[:, open_idx] + inst.dem[:, None] * w[None, :]
+        arg1 = np.argmin(reduced, axis=1)
+        m1 = reduced[np.arange(self.n_clients), arg1]
+        if k > 1:
+            reduced[np.arange(self.n_clients), arg1] = np.inf
+            m2 = reduced.min(axis=1)
+        else:
+            m2 = np.full(self.n_clients, np.inf)
+
+        self.parent = {
+            'open_idx': open_idx, 'pos': pos, 'cost': total,
+            'fixed': float(inst.FC[open_idx].sum()),
+            'open_cap': float(inst.ICap[open_idx].sum()),
+            'rows': rows, 'cols': cols, 'amounts': amounts,
+            # Con listas de candidatos: si cada flujo usa un par listado (los demás son de respaldo, ver restrict)
+            'listed': None if self.candidates is None else self.candidates.contains(rows, open_idx[cols]),
+            'residual': inst.ICap[open_idx] - used,
+            'w': w, 'capw': float(inst.ICap[open_idx] @ w),
+            'arg1': arg1, 'm1': m1, 'm2': m2,
+        }
+        return total
+
+    def _swap_lower_bound(self, col_out, j_in):
+        """
+        Cota inferior del vecino mediante la relajación Lagrangeana de 'capacity_con' con los
+        duales del padre: LB(w) = FC' + sum_i min_j (TC[i,j] + dem[i] w[j]) - sum_j ICap[j] w[j].
+        El dual del centro que se abre (w_in) se elige de forma óptima en O(n log n).
+        """
+        inst, p = self.instance, self.parent
+        a = np.where(p['arg1'] == col_out, p['m2'], p['m1'])
+        tc_in = inst.TC[:, j_in]
+
+        # Clientes que prefieren el centro nuevo mientras w_in < breakpoint
+        bp = (a - tc_in) / inst.dem
+        bp_pos = bp[bp > 0]
+        w_in = 0.0
+        if bp_pos.size:
+            order = np.argsort(-bp_pos)
+            dem_pos = inst.dem[bp > 0][order]
+            over = np.nonzero(np.cumsum(dem_pos) > inst.ICap[j_in])[0]
+            if over.size:
+                w_in = float(bp_pos[order][over[0]])
+
+        kept_capw = p['capw'] - inst.ICap[p['open_idx'][col_out]] * p['w'][col_out]
+        return (np.minimum(a, tc_in + inst.dem * w_in).sum()
+                - kept_capw - inst.ICap[j_in] * w_in)
+
+    def _repair_columns(self, i, cols_loc, col_out, j_in):
+        """
+        Columnas del vecino a las que puede ir el cliente i, de la más barata a la más cara. Con listas de
+        candidatos son sólo sus pares listados (o, si no tiene ninguno abierto, su centro abierto más barato):
+        los mismos arcos del LP disperso que resuelve el respaldo exacto.
+        """
+        order = np.argsort(self.instance.TC[i, cols_loc])
+        order = order[order != col_out]
+        if self.candidates is None:
+            return order
+        pos = self.parent['pos']
+        listed = [len(cols_loc) - 1 if j == j_in else int(pos[j]) for j in self.candidates.of_client(i).tolist()]
+        listed = {c for c in listed if c >= 0 and c != col_out}
+        if not listed:
+            return order[:1]
+        return [c for c in order.tolist() if c in listed]
+
+    def _swap_upper_bound(self, col_out, j_in):
+        """
+        Cota superior (costo de una asignación factible) reparando el flujo del padre:
+        1. La demanda del centro cerrado se reasigna al centro abierto más barato con holgura.
+        2. Se trasladan al centro nuevo los flujos con mayor ahorro por unidad de demanda.
+        Con listas de candidatos sólo se usan sus pares: los flujos del padre fuera de ellas también se reparan.
+        """
+        inst, p = self.instance, self.parent
+        TC, dem = inst.TC, inst.dem
+        k = len(p['open_idx'])
+        col_in = k  # el centro nuevo ocupa una columna extra al final
+
+        cols_loc = np.append(p['open_idx'], j_in)
+        residual = np.append(p['residual'], inst.ICap[j_in])
+        residual[col_out] = 0.0
+
+        displaced = p['cols'] == col_out
+        if p['listed'] is not None:
+            displaced |= ~p['listed']
+            residual += np.bincount(p['cols'][~p['listed']], weights=p['amounts'][~p['listed']], minlength=k + 1)
+            residual[col_out] = 0.0
+        rows, cols, amounts = p['rows'][~displaced], p['cols'][~displaced], p['amounts'][~displaced]
+
+        # 1. Reparación de la demanda desplazada (primero los montos grandes)
+        d_rows, d_amounts = p['rows'][displaced], p['amounts'][displaced]
+        new_rows, new_cols, new_amounts = [], [], []
+        for idx in np.argsort(-d_amounts):
+            i, remaining = int(d_rows[idx]), float(d_amounts[idx])
+            for c in self._repair_columns(i, cols_loc, col_out, j_in):
+                if remaining <= 1e-9:
+                    break
+                if residual[c] <= 1e-9:
+                    continue
+                take = min(remaining, residual[c])
+                residual[c] -= take
+                remaining -= take
+                new_rows.append(i); new_cols.append(c); new_amounts.append(take)
+            if remaining > 1e-9:
+                return float('inf')
+
+        rows = np.concatenate([rows, np.array(new_rows, dtype=np.int64)])
+        cols = np.concatenate([cols, np.array(new_cols, dtype=np.int64)])
+        amounts = np.concatenate([amounts, np.array(new_amounts, dtype=np.float64)])
+
+        # 2. Mejora: mover flujo hacia el centro nuevo según ahorro por unidad de demanda
+        cost_now = TC[rows, cols_loc[cols]] / dem[rows]
+        saving = cost_now - TC[rows, j_in] / dem[rows]
+        cand = np.nonzero((saving > 0) & (cols != col_in))[0]
+        if self.candidates is not None and cand.size:
+            cand = cand[self.candidates.contains(rows[cand], np.full(cand.size, j_in))]
+        moved_saving = 0.0
+        if cand.size and residual[col_in] > 1e-9:
+            cand = cand[np.argsort(-saving[cand])]
+            cum = np.cumsum(amounts[cand])
+            room = residual[col_in]
+            moved = np.minimum(amounts[cand], np.maximum(room - (cum - amounts[cand]), 0.0))
+            moved_saving = float(moved @ saving[cand])
+
+        transport = float((cost_now * amounts).sum()) - moved_saving
+        return transport
+
+    def solve_swap_delta(self, move, cutoff=float('inf')):
+        """
+        Evalúa el vecino obtenido al aplicar move = (j_cerrado, j_abierto) (1-based) sobre el padre.
+        Retorna (costo, cota_inferior, exacto):
+        - La cota inferior (duales del padre) y la superior (reparación del flujo) cuestan O(n_clients).
+        - cutoff: mejor costo admisible ya encontrado en la iteración. Si la cota inferior lo alcanza, el
+          vecino no puede ser elegido: se descarta sin resolver su LP y se retorna costo inf (no exacto).
+        - Si no, cuando las cotas coinciden (brecha <= delta_tolerance) el costo es exacto sin LP. En la
+          práctica la brecha suele rondar el 0.1%, por lo que casi todo el ahorro viene del cutoff.
+        - En otro caso, con delta_exact_fallback se resuelve el LP completo del vecino ('exact');
+          sin él se retorna la cota superior ('bound').
+        """
+        if self.parent is None:
+            raise RuntimeError("solve_swap_delta requiere llamar antes a set_parent().")
+
+        inst, p = self.instance, self.parent
+        j_out, j_in = move[0] - 1, move[1] - 1
+        col_out = int(p['pos'][j_out])
+
+        # Descarte rápido por capacidad total insuficiente
+        if p['open_cap'] - inst.ICap[j_out] + inst.ICap[j_in] < self.total_demand - 1e-9:
+            return float('inf'), float('inf'), True
+
+        fixed = p['fixed'] - inst.FC[j_out] + inst.FC[j_in]
+        lower = fixed + self._swap_lower_bound(col_out, j_in)
+        if lower >= cutoff:
+            self.stats['status']['delta_cutoff'] += 1
+            return float('inf'), lower, False
+        upper = fixed + self._swap_upper_bound(col_out, j_in)
+
+        # upper = inf: la reparación no encontró asignación (no prueba infactibilidad), se resuelve el LP
+        if upper != float('inf') and upper - lower <= self.delta_tolerance * max(1.0, abs(upper)):
+            self.stats['status']['delta_bounds'] += 1
+            return upper, lower, True
+        if self.delta_exact_fallback:
+            open_idx = np.sort(np.append(np.delete(p['open_idx'], col_out), j_in))
+            exact, _, _ = self._solve(open_idx)
+            return exact, exact, True
+        return upper, lower, False
+
+    def solve_swap_delta_many(self, moves, cutoff=float('inf')):
+        return [self.solve_swap_delta(move, cutoff)[0] for move in moves]
+
+    def close(self):
+        # No hay sesiones externas que liberar.
+        self.last_open = None
+        self.last_flow = None
+        self.parent = None
+
+
+class GAPEvaluator:
+    def __init__(self, instance_or_path, exact=None, max_rounds=20):
+        """
+        Evaluador Single-Source.
+        Con 'x' fijo, CFLP_SingleSource.mod es un problema de asignación generalizada (GAP): cada cliente
+        va completo a un único centro abierto respetando ICap. Se resuelve heurísticamente en NumPy:
+        1. Construcción greedy por arrepentimiento (regret): primero los clientes que más pierden si no
+           obtienen su mejor centro.
+        2. Reparación por expulsión para los clientes que no caben en ningún centro.
+        3. Búsqueda local con movimientos de reasignación (shift) e intercambio (swap) entre clientes.
+        El costo es el de una asignación factible: una cota superior del costo exacto.
+
+        - exact: evaluador exacto opcional (ej. AMPLWrapper). Se usa para get_final_solution y para las
+          configuraciones cuyo costo heurístico no queda certificado por la cota inferior sin capacidades.
+          El criterio sólo depende de la configuración: el costo retornado no depende de las evaluaciones
+          anteriores (caché de costos y --workers > 1 ven siempre el mismo valor).
+        """
+        if isinstance(instance_or_path, str):
+            print("[Evaluator] Leyendo instancia en NumPy... (esto se hace 1 vez)")
+            self.instance = load_instance(instance_or_path)
+        else:
+            self.instance = instance_or_path
+
+        inst = self.instance
+        self.TC = np.asarray(inst.TC)
+        self.dem = np.asarray(inst.dem)
+        self.n_locations = inst.n_locations
+        self.n_clients = inst.n_clients
+        self.total_demand = inst.total_demand
+        self.capacity_list = inst.get_capacity_list()
+        self.exact = exact
+        self.max_rounds = max_rounds
+        self.candidates = None
+
+        self.exact_calls = 0
+        self.heuristic_calls = 0
+        self.stats = new_solver_stats() # Tiempos y estados (heuristic / exact / infeasible), ver instrumentation.py
+
+        self.last_open = None
+        self.last_assign = None
+        print(f"[Evaluator] Demanda Total: {self.total_demand:,.0f} | Locs: {self.n_locations}")
+
+    def get_n_locations(self):
+        return self.n_locations
+
+    def get_total_demand(self):
+        return self.total_demand
+
+    def get_capacity_list(self):
+        return self.capacity_list
+
+    def set_solver_options(self, options):
+        # Las opciones de Gurobi sólo aplican al evaluador exacto
+        if self.exact is not None:
+            self.exact.set_solver_options(options)
+
+    def set_candidates(self, lists):
+        self.candidates = lists
+
+    def _regret_greedy(self, costs, residual):
+        """
+        Asigna cada cliente a un centro (columna de 'costs') por orden de arrepentimiento.
+        Si el mejor centro de un cliente se llenó mientras tanto, el cliente se re-puntúa en la
+        ronda siguiente junto con los demás en conflicto. Retorna el vector de columnas (-1 = sin centro).
+        """
+        dem = self.dem
+        assign = np.full(self.n_clients, -1, dtype=np.int64)
+        pending = np.arange(self.n_clients)
+
+        while pending.size:
+            fits = residual[None, :] >= dem[pending][:, None]
+            options = np.where(fits, costs[pending], np.inf)
+            best_col = np.argmin(options, axis=1)
+            best = options[np.arange(len(pending)), best_col]
+            if options.shape[1] > 1:
+                second = np.partition(options, 1, axis=1)[:, 1]
+            else:
+                second = np.full(len(pending), np.inf)
+
+            placeable = np.isfinite(best)
+            # Regret infinito (una sola opción) va primero; a igual regret, el cliente de mayor demanda
+            regret = np.full(len(pending), np.inf)
+            has_second = np.isfinite(second)
+            regret[has_second] = second[has_second] - best[has_second]
+            order = np.lexsort((-dem[pending], -regret))
+            order = order[placeable[order]]
+
+            conflicts = []
+            for idx in order:
+                i, c = pending[idx], best_col[idx]
+                if residual[c] >= dem[i]:
+                    assign[i] = c
+                    residual[c] -= dem[i]
+                else:
+                    conflicts.append(i)
+            if not conflicts:
+                break
+            pending = np.array(conflicts, dtype=np.int64)
+
+        return assign
+
+    def _repair(self, costs, residual, assign):
+        """
+        Ubica a los clientes sin centro expulsando de un centro a clientes pequeños que quepan en otro.
+        Retorna False si algún cliente no pudo ubicarse.
+        """
+        dem = self.dem
+        for i in np.nonzero(assign < 0)[0]:
+            placed = False
+            for c in np.argsort(costs[i]):
+                if not np.isfinite(costs[i, c]):
+                    break # Resto de centros fuera de la lista de candidatos del cliente
+                need = dem[i] - residual[c]
+                members = np.nonzero(assign == c)[0]
+                # Candidatos a expulsar: de menor a mayor demanda, si caben en otro centro
+                moves = []
+                for m in members[np.argsort(dem[members])]:
+                    if need <= 0:
+                        break
+                    others = np.nonzero(residual >= dem[m])[0]
+                    others = others[others != c]
+                    if others.size == 0:
+                        continue
+                    target = others[np.argmin(costs[m, others])]
+                    if not np.isfinite(costs[m, target]):
+                        continue
+                    moves.append((m, target))
+                    residual[target] -= dem[m]
+                    need -= dem[m]
+                if need <= 0:
+                    for m, target in moves:
+                        assign[m] = target
+                        residual[c] += dem[m]
+                    assign[i] = c
+                    residual[c] -= dem[i]
+                    placed = True
+                    break
+                # Expulsión insuficiente: se deshacen las reservas y se prueba el siguiente centro
+                for m, target in moves:
+                    residual[target] += dem[m]
+            if not placed:
+                return False
+        return True
+
+    def _local_search(self, costs, residual, assign):
+        """Mejora la asignación con rondas de shift (vectorizado) y swap entre pares de clientes."""
+        dem = self.dem
+        rows = np.arange(self.n_clients)
+        for _ in range(self.max_rounds):
+            improved = False
+
+            # Shift: mover un cliente a otro centro con holgura suficiente
+            current = costs[rows, assign]
+            fits = residual[None, :] >= dem[:, None]
+            delta = np.where(fits, costs - current[:, None], np.inf)
+            target = np.argmin(delta, axis=1)
+            gain = delta[rows, target]
+            for i in np.nonzero(gain < -1e-9)[0][np.argsort(gain[gain < -1e-9])]:
+                c = target[i]
+                if residual[c] >= dem[i] and costs[i, c] < costs[i, assign[i]]:
+                    residual[assign[i]] += dem[i]
+                    residual[c] -= dem[i]
+                    assign[i] = c
+                    improved = True
+
+            # Swap: cliente cuyo centro preferido está lleno se intercambia con uno de ese centro
+            current = costs[rows, assign]
+            preferred = np.argmin(costs, axis=1)
+            for i in np.nonzero(costs[rows, preferred] < current - 1e-9)[0]:
+                a, b = assign[i], preferred[i]
+                if a == b:
+                    continue
+                others = np.nonzero(assign == b)[0]
+                if others.size == 0:
+                    continue
+                ok = ((residual[b] + dem[others] >= dem[i]) & (residual[a] + dem[i] >= dem[others]))
+                gain = costs[i, b] + costs[others, a] - costs[i, a] - costs[others, b]
+                gain = np.where(ok, gain, np.inf)
+                k = int(np.argmin(gain))
+                if gain[k] < -1e-9:
+                    o = others[k]
+                    residual[a] += dem[i] - dem[o]
+                    residual[b] += dem[o] - dem[i]
+                    assign[i], assign[o] = b, a
+                    improved = True
+
+            if not improved:
+                break
+
+    def _heuristic_solve(self, open_idx):
+        """Retorna (costo, asignación por columna) o (inf, None) si no encontró una asignación factible."""
+        inst = self.instance
+        if len(open_idx) == 0 or inst.ICap[open_idx].sum() < self.total_demand - 1e-9:
+            return float('inf'), None
+
+        dense = self.TC[:, open_idx]
+        lists = self.candidates
+        while True:
+            if lists is None:
+                costs = dense
+            else:
+                # Pares fuera de las listas de candidatos: costo infinito (el greedy y la búsqueda local los ignoran)
+                rows, cols = lists.restrict(open_idx, self.TC)
+                costs = np.full(dense.shape, np.inf)
+                costs[rows, cols] = dense[rows, cols]
+
+            residual = inst.ICap[open_idx].astype(np.float64)
+            assign = self._regret_greedy(costs, residual)
+            if (assign < 0).any() and not self._repair(costs, residual, assign):
+                if lists is not None:
+                    lists = lists.widen(self.TC) # Sólo para esta configuración
+                    continue
+                return float('inf'), None
+            break
+        self._local_search(costs, residual, assign)
+
+        total = float(inst.FC[open_idx].sum() + dense[np.arange(self.n_clients), assign].sum())
+        return total, assign
+
+    def _lower_bound(self, open_idx):
+        # Sin capacidades: cada cliente al centro abierto más barato
+        return float(self.instance.FC[open_idx].sum() + self.TC[:, open_idx].min(axis=1).sum())
+
+    def solve_assignment_persistent(self, open_facilities_indices):
+        """
+        Mismo contrato que AMPLWrapper.solve_assignment_persistent (índices 1-based, retorna Total_Cost).
+        Con evaluador exacto, el solve exacto se omite sólo si la heurística alcanza la cota inferior
+        (su asignación es óptima). Si el exacto mejora a la heurística, last_assign queda en None:
+        la asignación vive en el evaluador exacto (ver get_final_solution).
+        """
+        try:
+            open_idx = np.array(sorted(open_facilities_indices), dtype=np.int64) - 1
+            start = time.perf_counter()
+            cost, assign = self._heuristic_solve(open_idx)
+            self.heuristic_calls += 1
+            self.last_open, self.last_assign = open_idx, assign
+            self.stats['status']['heuristic' if assign is not None else 'infeasible'] += 1
+
+            capacity_ok = self.instance.ICap[open_idx].sum() >= self.total_demand - 1e-9
+            certified = cost <= self._lower_bound(open_idx) + 1e-9 * max(1.0, abs(cost))
+            if self.exact is not None and capacity_ok and not certified:
+                self.exact_calls += 1
+                self.stats['status']['exact'] += 1
+                exact_cost = self.exact.solve_assignment_persistent(open_facilities_indices)
+                if exact_cost < cost:
+                    cost, self.last_assign = exact_cost, None
+            self.stats['t_solve'] += time.perf_counter() - start
+            self.stats['solves'] += 1
+            return cost
+        except Exception as e:
+            print(f"[Evaluator] Error en solve_assignment_persistent: {e}")
+            return float('inf')
+
+    def get_final_solution(self, open_facilities_indices, mode):
+        """Con evaluador exacto se delega en él; si no, se devuelve la mejor asignación heurística."""
+        if self.exact is not None:
+            return self.exact.get_final_solution(open_facilities_indices, mode)
+
+        open_idx = np.array(sorted(open_facilities_indices), dtype=np.int64) - 1
+        final_cost, assign = self._heuristic_solve(open_idx)
+        if final_cost == float('inf'):
+            return final_cost, None
+        return final_cost, Assignment(np.arange(1, self.n_clients + 1), open_idx[assign] + 1, None, self.n_clients)
+
+    def close(self):
+        print(f"[Evaluator] Evaluaciones heurísticas: {self.heuristic_calls} | Exactas: {self.exact_calls}")
+        if self.exact is not None:
+            self.exact.close()
+        self.last_open = None
+        self.last_assign = None
+
+
+def create_evaluator(backend, dat_file, mod_file, mode, gurobi_opts=None, delta="off", warm_start=True,
+                     reduced=False, candidates=0):
+    """
+    Fábrica de evaluadores a partir de argumentos simples (serializables), de modo que
+    los procesos trabajadores de parallel.py puedan construir su propia copia.
+    ampl:   AMPLWrapper persistente (AMPL + Gurobi).
+    numpy:  Evaluador en proceso sin licencias (MS: LP de transporte exacto | SS: heurística GAP).
+    hybrid: (sólo SS) heurística GAP + AMPLWrapper exacto para la solución final y las configuraciones
+            que la heurística no certifica como óptimas.
+    """
+    if backend == "numpy":
+        if mode == "SS":
+            evaluator = GAPEvaluator(dat_file)
+        else:
+            evaluator = TransportEvaluator(dat_file)
+            # delta 'bound': acepta la cota superior del delta sin resolver el LP completo del vecino
+            evaluator.delta_exact_fallback = (delta != "bound")
+        if candidates > 0:
+            lists = candidates_io.load_candidate_lists(evaluator.instance, dat_file, candidates)
+            print(f"[Candidates] {lists.stats()}")
+            evaluator.set_candidates(lists)
+        return evaluator
+
+    # Import diferido: el backend NumPy no necesita amplpy
+    import ampl_solver
+    wrapper = ampl_solver.AMPLWrapper(dat_file, mod_file, solver="gurobi", gurobi_opts=gurobi_opts,
+                                      warm_start=warm_start, reduced=reduced, mode=mode, candidates=candidates)
+    if backend == "hybrid":
+        if mode != "SS":
+            wrapper.close()
+            raise ValueError("El evaluador 'hybrid' sólo aplica al modo SS.")
+        evaluator = GAPEvaluator(dat_file, exact=wrapper)
+        if candidates > 0:
+            evaluator.set_candidates(candidates_io.load_candidate_lists(evaluator.instance, dat_file, candidates))
+        return evaluator
+    return wrapper
@@ -0,0 +1,142 @@
+"""
+Generador de instancias sintéticas CFLP para pruebas de escalamiento (acción 'generate').
+Escribe en el mismo formato .txt que las instancias originales (lo lee data_parser.py):
+
+    n_locations n_clients
+    *
+    ICap FC            (una línea por centro)
+    *
+    dem ...            (varios valores por línea)
+    *
+    TC ...             (una línea por cliente, n_locations costos)
+
+y opcionalmente en el formato binario de instance.py. TC se genera y escribe por bloques de clientes:
+en memoria sólo hay un bloque y las coordenadas (O(n_clients + n_locations)), por lo que una
+instancia 10000x10000 (100M costos) no requiere la matriz completa.
+
+Parámetros (esquema de Cornuejols et al.):
+- tightness: capacidad total / demanda total (>1; cerca de 1 = capacidades ajustadas).
+- fixed_costs: 'uniform' (independiente), 'capacity' (crece con sqrt(ICap), economías de escala)
+  o 'lognormal' (cola pesada).
+- costs: 'euclidean' (distancia en el cuadrado unitario x demanda del cliente x costo unitario)
+  o 'random' (uniforme, sin estructura geométrica).
+Con la misma semilla se obtiene exactamente la misma instancia, sin importar el tamaño de bloque.
+"""
+
+import os
+import time
+
+import numpy as np
+
+import instance as instance_io
+
+FIXED_COST_KINDS = ("uniform", "capacity", "lognormal")
+COST_KINDS = ("euclidean", "random")
+
+# Filas de TC (clientes) por bloque de escritura
+BLOCK_ROWS = 256
+
+
+def _quantize(values, decimals):
+    # Valores exactamente representables con 'decimals' decimales: el .txt y el binario coinciden al leerlos
+    scale = 10.0 ** decimals
+    return np.rint(values * scale) / scale
+
+
+def _fixed_costs(rng, kind, capacities):
+    if kind == "uniform":
+        return rng.uniform(500.0, 1500.0, len(capacities))
+    if kind == "capacity":
+        return rng.uniform(0.0, 90.0, len(capacities)) + rng.uniform(100.0, 110.0, len(capacities)) * np.sqrt(capacities)
+    if kind == "lognormal":
+        return rng.lognormal(mean=np.log(1000.0), sigma=0.6, size=len(capacities))
+    raise ValueError(f"Distribución de costos fijos '{kind}' no reconocida ({', '.join(FIXED_COST_KINDS)}).")
+
+
+def _cost_block(rng, kind, rows, client_xy, facility_xy, dem, unit_cost):
+    """Costos TC de los clientes 'rows' (slice) a todos los centros."""
+    if kind == "euclidean":
+        diff = client_xy[rows, None, :] - facility_xy[None, :, :]
+        return np.sqrt((diff ** 2).sum(axis=2)) * dem[rows, None] * unit_cost
+    if kind == "random":
+        return rng.uniform(1.0, 1000.0, (rows.stop - rows.start, len(facility_xy)))
+    raise ValueError(f"Tipo de costos de transporte '{kind}' no reconocido ({', '.join(COST_KINDS)}).")
+
+
+def generate_instance(txt_path, n_locations, n_clients, seed=None, tightness=3.0, fixed_costs="uniform",
+                      costs="euclidean", bin_path=None, unit_cost=100.0, decimals=2, block_rows=BLOCK_ROWS):
+    """
+    Genera la instancia en 'txt_path' (y en 'bin_path' si se indica). Escritura atómica (archivos temporales).
+    Retorna un resumen (dimensiones, demanda y capacidad total, tamaño en MB, tiempo).
+    """
+    if tightness <= 1.0:
+        raise ValueError("tightness debe ser > 1 (capacidad total mayor que la demanda total).")
+    if costs not in COST_KINDS:
+        raise ValueError(f"Tipo de costos de transporte '{costs}' no reconocido ({', '.join(COST_KINDS)}).")
+
+    start_time = time.time()
+    # Un generador independiente por componente: TC no altera ICap/FC/dem, y viceversa
+    rng_loc, rng_dem, rng_xy, rng_tc = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(4)]
+
+    dem = _quantize(rng_dem.uniform(5.0, 35.0, n_clients), decimals)
+    # Capacidades con la forma de Cornuejols (U[10, 160]) escaladas a capacidad total = tightness x demanda total
+    capacities = rng_loc.uniform(10.0, 160.0, n_locations)
+    capacities = _quantize(capacities * (tightness * dem.sum() / capacities.sum()), decimals)
+    fixed = _quantize(_fixed_costs(rng_loc, fixed_costs, capacities), decimals)
+    client_xy = rng_xy.random((n_clients, 2))
+    facility_xy = rng_xy.random((n_locations, 2))
+
+    fmt = f"%.{decimals}f"
+    txt_tmp = txt_path + ".tmp"
+    bin_tmp = bin_path + ".tmp" if bin_path else None
+    os.makedirs(os.path.dirname(os.path.abspath(txt_path)), exist_ok=True)
+    f_bin = None
+    ok = False
+    try:
+        with open(txt_tmp, 'w') as f_txt:
+            f_txt.write(f"{n_locations} {n_clients}\n*\n")
+            np.savetxt(f_txt, np.column_stack([capacities, fixed]), fmt=fmt, delimiter=" ")
+            f_txt.write("*\n")
+            # Demandas en líneas de 20 valores, como un bloque continuo de números
+            for k in range(0, n_clients, 20):
+                f_txt.write(" ".join(fmt % v for v in dem[k:k + 20].tolist()) + "\n")
+            f_txt.write("*\n")
+
+            offsets = None
+            if bin_path:
+                os.makedirs(os.path.dirname(os.path.abspath(bin_path)), exist_ok=True)
+                f_bin = open(bin_tmp, 'wb')
+                offsets = instance_io.write_binary_header(f_bin, n_clients, n_locations)
+                for offset, arr in zip(offsets[:3], (capacities, fixed, dem)):
+                    f_bin.seek(offset)
+                    f_bin.write(arr.astype(instance_io.BIN_DTYPE).tobytes())
+                f_bin.seek(offsets[3])
+
+            print(f"[Generator] Generando {n_clients}x{n_locations} costos de transporte ({costs})...")
+            for first in range(0, n_clients, block_rows):
+                rows = slice(first, min(first + block_rows, n_clients))
+                block = _quantize(_cost_block(rng_tc, costs, rows, client_xy, facility_xy, dem, unit_cost), decimals)
+                np.savetxt(f_txt, block, fmt=fmt, delimiter=" ")
+                if f_bin:
+                    f_bin.write(block.astype(instance_io.BIN_DTYPE).tobytes())
+        ok = True
+    finally:
+        if f_bin:
+            f_bin.close()
+        if not ok:
+            for tmp in (txt_tmp, bin_tmp):
+                if tmp and os.path.exists(tmp):
+                    os.remove(tmp)
+
+    os.replace(txt_tmp, txt_path)
+    if bin_path:
+        os.replace(bin_tmp, bin_path)
+
+    summary = {'n_locations': n_locations, 'n_clients': n_clients, 'total_demand': float(dem.sum()),
+               'total_capacity': float(capacities.sum()), 'mb': os.path.getsize(txt_path) / (1024 * 1024),
+               'seconds': time.time() - start_time}
+    print(f"[Generator] {txt_path}: {summary['mb']:.1f} MB en {summary['seconds']:.1f}s | "
+          f"capacidad/demanda = {summary['total_capacity'] / summary['total_demand']:.2f}")
+    if bin_path:
+        print(f"[Generator] Binario en {bin_path}")
+    return summary
@@ -6,8 +6,12 @@ Esta heurística divide el problema en dos partes:
 """
 
 import random
-from collections import deque
 import time
+import numpy as np
+
+from instrumentation import NULL_RECORDER
+from tabu_memory import TabuMemory
+from open_set import OpenSet
 
 def generate_initial_solution(n_locations, total_demand, capacity_list):
     """
@@ -49,167 +53,372 @@ def generate_initial_solution(n_locations, total_demand, capacity_list):
 
     return open_indices
 
-def get_neighbors_sampled(current_open_set, n_locations, sample_size):
+def get_neighbors_sampled(current_open, sample_size):
     """
     Generador de vecinos utilizando el movimiento 'SWAP' (Intercambio 1-1).
     Estrategia: Cierra un centro abierto y abre uno cerrado.
     
     Para instancias grandes, evaluar todos los vecinos (N * M) es muy lento.
     Usamos sampling para evaluar solo un subconjunto aleatorio.
+    Sobre un OpenSet (open_set.py) cada muestra es O(1) y sin copias: se entregan sólo los movimientos
+    (nodo_cerrado, nodo_abierto); la lista de abiertos del vecino se arma únicamente si el evaluador la pide.
     """
-    all_locs = set(range(1, n_locations + 1))
-    
-    # Identificar candidatos para cerrar (actualmente abiertos) y para abrir (actualmente cerrados)
-    closed_indices = list(all_locs - current_open_set)
-    open_indices = list(current_open_set)
+    n_open, n_closed = len(current_open), current_open.n_closed()
     
     # Si no hay margen de movimiento, no genera nada
-    if not closed_indices or not open_indices:
+    if not n_open or not n_closed:
         return
 
     # Genera 'sample_size' vecinos aleatorios
     for _ in range(sample_size):
-        j_open = random.choice(open_indices)   # Candidato a cerrar
-        j_closed = random.choice(closed_indices) # Candidato a abrir
-        
-        # Construye el nuevo conjunto de instalaciones
-        neighbor_set = current_open_set.copy()
-        neighbor_set.remove(j_open)
-        neighbor_set.add(j_closed)
-        
-        move = (j_open, j_closed) # Tupla que representa el movimiento (cerré, abrí)
-        yield neighbor_set, move
+        j_open = current_open.open_at(random.randrange(n_open))       # Candidato a cerrar
+        j_closed = current_open.closed_at(random.randrange(n_closed)) # Candidato a abrir
+        yield (j_open, j_closed) # Tupla que representa el movimiento (cerré, abrí)
+
+def get_neighbors_scored(move_bounds, top_k, tabu, iteration, best_cost):
+    """
+    Alternativa al muestreo aleatorio: puntúa TODOS los SWAP posibles con la cota de move_bounds
+    (una pasada vectorizada) y entrega sólo los 'top_k' más prometedores para la evaluación exacta.
+    Los movimientos tabú (según la TabuMemory 'tabu' en 'iteration') sólo compiten si su cota permite
+    la aspiración (cota < mejor global);
+    si todos son tabú, se entregan los mejores tabú para que la búsqueda no se detenga.
+    """
+    scores, open_idx, closed_idx = move_bounds.score_all_swaps()
+    if scores.size == 0:
+        return
+
+    allowed = ~tabu.tabu_mask(open_idx[:, None] + 1, closed_idx[None, :] + 1, iteration) | (scores < best_cost)
+    ranked = np.where(allowed, scores, np.inf).ravel()
+    if not np.isfinite(ranked).any():
+        ranked = scores.ravel()
+
+    k = min(top_k, ranked.size)
+    top = np.argpartition(ranked, k - 1)[:k]
+    top = top[np.argsort(ranked[top], kind='stable')]
+
+    n_closed = len(closed_idx)
+    for t in top[np.isfinite(ranked[top])]:
+        j_open = int(open_idx[t // n_closed]) + 1    # Candidato a cerrar
+        j_closed = int(closed_idx[t % n_closed]) + 1 # Candidato a abrir
+        yield (j_open, j_closed)
+
+def supports_delta(evaluator):
+    # ParallelEvaluator declara la capacidad explícitamente; los evaluadores simples por sus métodos
+    return getattr(evaluator, 'supports_delta', hasattr(evaluator, 'solve_swap_delta'))
 
-def run_tabu_search(ampl_wrapper, dat_file, mod_file, n_locations, max_iterations, tabu_tenure, neighborhood_sample_size):
+def evaluate_neighbors(evaluator, current_open, moves, delta_eval, deadline=None, is_admissible=None,
+                       cutoff=float('inf')):
+    """
+    Evalúa una lista de movimientos (j_cerrar, j_abrir) desde current_open (OpenSet) y retorna sus
+    costos en el mismo orden. Sin evaluación incremental, la lista de abiertos de cada vecino se
+    materializa recién aquí.
+    Si el evaluador expone operaciones por lote (ParallelEvaluator), el vecindario completo
+    se reparte entre sus trabajadores; si no, se evalúa secuencialmente.
+    Con 'deadline' (time.time()) se evalúa por lotes del tamaño del pool y se corta al agotarse el
+    tiempo: los vecinos no evaluados quedan con costo inf.
+    Con evaluación incremental, 'cutoff' se entrega al delta: los vecinos cuya cota inferior lo alcanza
+    quedan con costo inf sin resolver su LP. Con 'is_admissible' (move, costo) -> bool, los lotes se
+    evalúan en orden y el cutoff de cada lote es el mejor costo admisible de los anteriores.
+    """
+    if deadline is not None or (delta_eval and is_admissible is not None):
+        chunk = max(1, getattr(evaluator, 'n_workers', 1))
+        costs = [float('inf')] * len(moves)
+        for start in range(0, len(moves), chunk):
+            if deadline is not None and time.time() >= deadline:
+                break
+            batch = moves[start:start + chunk]
+            costs[start:start + chunk] = evaluate_neighbors(evaluator, current_open, batch, delta_eval, cutoff=cutoff)
+            if is_admissible is not None:
+                for move, cost in zip(batch, costs[start:start + chunk]):
+                    if cost < cutoff and is_admissible(move, cost):
+                        cutoff = cost
+        return costs
+
+    if delta_eval:
+        if hasattr(evaluator, 'solve_swap_delta_many'):
+            return evaluator.solve_swap_delta_many(moves, cutoff)
+        return [evaluator.solve_swap_delta(move, cutoff)[0] for move in moves]
+
+    if hasattr(evaluator, 'solve_many'):
+        return evaluator.solve_many([current_open.neighbor(move) for move in moves])
+    return [evaluator.solve_assignment_persistent(current_open.neighbor(move)) for move in moves]
+
+def evaluate_neighbors_pruned(evaluator, current_open, moves, delta_eval, move_bounds, is_admissible, deadline=None):
+    """
+    Igual que evaluate_neighbors, pero antes calcula una cota inferior barata de cada vecino (move_bounds)
+    y los evalúa en orden creciente de cota. Apenas la cota del siguiente vecino alcanza al mejor costo
+    admisible ya encontrado en la iteración, ése y todos los restantes se podan: no pueden ser elegidos.
+    Los vecinos podados o sin capacidad suficiente quedan con costo inf (también los que no alcanzaron
+    a evaluarse antes de 'deadline').
+    Retorna (costos, (evaluados, podados, infactibles)).
+    """
+    bounds = move_bounds.lower_bounds(moves)
+    costs = [float('inf')] * len(moves)
+    order = [k for k in sorted(range(len(moves)), key=lambda k: bounds[k]) if bounds[k] != float('inf')]
+    infeasible = len(moves) - len(order)
+
+    # Se evalúa en lotes del tamaño del pool para no perder el paralelismo entre trabajadores
+    chunk = max(1, getattr(evaluator, 'n_workers', 1))
+    threshold = float('inf')
+    evaluated = 0
+    while evaluated < len(order):
+        if deadline is not None and time.time() >= deadline:
+            break
+        batch = [k for k in order[evaluated:evaluated + chunk] if bounds[k] < threshold]
+        if not batch:
+            break
+        batch_costs = evaluate_neighbors(evaluator, current_open, [moves[k] for k in batch], delta_eval, cutoff=threshold)
+        for k, cost in zip(batch, batch_costs):
+            costs[k] = cost
+            if cost < threshold and is_admissible(moves[k], cost):
+                threshold = cost
+        evaluated += len(batch)
+        if len(batch) < chunk:
+            break # El resto del orden tiene cotas aún mayores
+
+    return costs, (evaluated, len(order) - evaluated, infeasible)
+
+def run_tabu_search(ampl_wrapper, dat_file, mod_file, n_locations, max_iterations, tabu_tenure, neighborhood_sample_size,
+                    delta_eval=False, move_bounds=None, prune=False, neighborhood="sampled", recorder=None,
+                    time_limit=None, checkpoint=None, resume=False, shared_best=None,
+                    tenure_open=None, tenure_close=None):
     """
     Ejecuta el ciclo principal de la Búsqueda Tabú.
     
     Parámetros:
-    - tabu_tenure: Cuántos turnos un movimiento permanece prohibido.
+    - tabu_tenure: Cuántas iteraciones un movimiento permanece prohibido de deshacerse.
+    - tenure_open / tenure_close: tenures separados para "no cerrar un centro recién abierto" y
+      "no reabrir un centro recién cerrado" (por defecto, tabu_tenure).
     - neighborhood_sample_size: Cuántos vecinos evaluar por iteración.
+    - delta_eval: Si el evaluador lo soporta (set_parent / solve_swap_delta), evalúa cada vecino
+      reparando incrementalmente la asignación de la solución actual en vez de resolver desde cero.
+    - move_bounds: objeto SwapBounds (move_bounds.py) con el más cercano / segundo más cercano de cada
+      cliente. Requerido por 'prune' y por neighborhood="scored".
+    - prune: filtra los vecinos por cota inferior antes de evaluarlos y registra cuántos se podaron.
+    - neighborhood: "sampled" (SWAP aleatorios) o "scored" (se puntúan todos los SWAP y se evalúan
+      los neighborhood_sample_size mejores).
+    - recorder: TraceRecorder (instrumentation.py) para registrar tiempos por fase y estados del
+      solver en cada iteración. Por defecto no se registra nada.
+    - time_limit: presupuesto de tiempo (segundos) de esta corrida. Al agotarse se deja de evaluar vecinos
+      (también a mitad de iteración) y se retorna la mejor configuración encontrada hasta ese momento.
+    - checkpoint: SearchCheckpoint (checkpoint.py). Guarda el estado cada checkpoint.every iteraciones y al terminar.
+    - resume: retoma la búsqueda desde el checkpoint (si existe y corresponde a la misma instancia/modo).
+    - shared_best: multiprocessing.Value('d') compartido por un portafolio de búsquedas (portfolio.py).
+      La aspiración y la poda usan el mejor costo encontrado por cualquiera de ellas, y cada mejora
+      propia se publica ahí.
     """
+    if recorder is None:
+        recorder = NULL_RECORDER
     
     start_time = time.time()
-    print(f"\n[Heuristic] Iniciando Tabu Search | Iter: {max_iterations} | Tenure: {tabu_tenure}")
-
-    # Estructura de memoria de corto plazo (Lista Tabú).
-    # Usamos deque con maxlen para que automáticamente olvide los elementos viejos (FIFO).
-    tabu_list = deque(maxlen=(tabu_tenure * 2)) 
+    deadline = start_time + time_limit if time_limit is not None else None
+    # Memoria de corto plazo: iteración hasta la que cada centro no puede cerrarse / reabrirse (consulta O(1))
+    tabu = TabuMemory(n_locations, tenure_open if tenure_open is not None else tabu_tenure,
+                      tenure_close if tenure_close is not None else tabu_tenure)
+    tenure_label = (f"{tabu_tenure}" if tabu.tenure_open == tabu.tenure_close == tabu_tenure
+                    else f"abrir {tabu.tenure_open}, cerrar {tabu.tenure_close}")
+    print(f"\n[Heuristic] Iniciando Tabu Search | Iter: {max_iterations} | Tenure: {tenure_label}"
+          + (f" | Límite: {time_limit:.0f}s" if time_limit is not None else ""))
     
-    # ---------------------------------------------------------
-    # 1. Generación de Solución Inicial
-    # ---------------------------------------------------------
     total_demand = ampl_wrapper.get_total_demand()
     capacity_list = ampl_wrapper.get_capacity_list()
-    
-    current_solution_set = generate_initial_solution(n_locations, total_demand, capacity_list)
-    # Evaluamos el costo llamando al Solver solo para la asignación
-    current_cost = ampl_wrapper.solve_assignment_persistent(list(current_solution_set))
-
-    # Mecanismo de reintentos: Si la solución aleatoria es infactible (costo inf), prueba otra.
-    retries = 0
-    while current_cost == float('inf') and retries < 10:
-        retries += 1
-        print(f"[Heuristic] Solución inicial infactible. Reintentando ({retries})...")
-        current_solution_set = generate_initial_solution(n_locations, total_demand, capacity_list)
-        current_cost = ampl_wrapper.solve_assignment_persistent(list(current_solution_set))
-
-    # Si tras 10 intentos falla, abortamos.
-    if current_cost == float('inf'):
-        print("[Heuristic] ERROR: No se pudo generar una solución inicial factible.")
-        return float('inf'), [], 0, []
-
-    # Inicializamos el "Mejor Global"
-    best_solution_set = current_solution_set
-    best_cost = current_cost
-    
-    print(f"[Heuristic] Costo Inicial: {best_cost:,.2f}")
+
+    state = checkpoint.load() if (checkpoint is not None and resume) else None
+    if state is not None:
+        # Retomar: mismo estado (y mismo RNG) que al momento de guardar el checkpoint
+        current_open = OpenSet(n_locations, state['current_set'], members=state['members'])
+        current_cost = state['current_cost']
+        tabu.restore(state['tabu'])
+        random.setstate(state['rng'])
+        print(f"[Checkpoint] Retomando desde la iteración {state['iteration']} | Mejor: {state['best_cost']:,.2f}")
+    else:
+        # ---------------------------------------------------------
+        # 1. Generación de Solución Inicial
+        # ---------------------------------------------------------
+        initial_set = generate_initial_solution(n_locations, total_demand, capacity_list)
+        # Evaluamos el costo llamando al Solver solo para la asignación
+        current_cost = ampl_wrapper.solve_assignment_persistent(list(initial_set))
+
+        # Mecanismo de reintentos: Si la solución aleatoria es infactible (costo inf), prueba otra.
+        retries = 0
+        while current_cost == float('inf') and retries < 10:
+            retries += 1
+            print(f"[Heuristic] Solución inicial infactible. Reintentando ({retries})...")
+            initial_set = generate_initial_solution(n_locations, total_demand, capacity_list)
+            current_cost = ampl_wrapper.solve_assignment_persistent(list(initial_set))
+
+        # Si tras 10 intentos falla, abortamos.
+        if current_cost == float('inf'):
+            print("[Heuristic] ERROR: No se pudo generar una solución inicial factible.")
+            return float('inf'), [], 0, []
+        # Estado abierto/cerrado con SWAP en O(1) (open_set.py)
+        current_open = OpenSet(n_locations, initial_set)
+
+    # Evaluación incremental: sólo disponible en evaluadores que exponen el estado del padre
+    if delta_eval and not supports_delta(ampl_wrapper):
+        print("[Heuristic] El evaluador no soporta evaluación incremental. Se usa evaluación completa.")
+        delta_eval = False
+    if delta_eval:
+        current_cost = ampl_wrapper.set_parent(current_open.open_list())
+    if (prune or neighborhood == "scored") and move_bounds is None:
+        raise ValueError("La poda y el vecindario 'scored' requieren move_bounds (SwapBounds).")
+    if move_bounds is not None:
+        move_bounds.set_parent(current_open)
+    prune_totals = [0, 0, 0] # evaluados, podados, infactibles
+
+    if state is not None:
+        best_solution = list(state['best_set'])
+        best_cost = state['best_cost']
+        history = list(state['history'])
+        iterations_run = state['iteration']
+    else:
+        # Inicializamos el "Mejor Global"
+        best_solution = current_open.open_list()
+        best_cost = current_cost
+
+        print(f"[Heuristic] Costo Inicial: {best_cost:,.2f}")
+
+        # Inicializamos la lista de historial
+        history = []
+        # Agregamos el punto inicial
+        if best_cost != float('inf'):
+            history.append(best_cost)
+        iterations_run = 0
+
+    def save_checkpoint():
+        checkpoint.save({'iteration': iterations_run, 'current_set': current_open.open_list(),
+                         'members': current_open.members, 'current_cost': current_cost,
+                         'best_set': sorted(best_solution),
+                         'best_cost': best_cost, 'tabu': tabu.state(), 'history': history,
+                         'rng': random.getstate()})
 
     # ---------------------------------------------------------
     # 2. Bucle Principal de Búsqueda
     # ---------------------------------------------------------
     
-    # Inicializamos la lista de historial
-    history = []
-    # Agregamos el punto inicial
-    if best_cost != float('inf'):
-        history.append(best_cost)
-
-    iterations_run = 0
-    for i in range(max_iterations):
+    for i in range(iterations_run, max_iterations):
+        # Presupuesto de tiempo agotado: se detiene entre iteraciones con la mejor solución hasta ahora
+        if deadline is not None and time.time() >= deadline:
+            print(f"[Heuristic] Límite de tiempo alcanzado ({time_limit:.0f}s) tras {iterations_run} iteraciones.")
+            break
         iterations_run += 1
+        recorder.start_iteration(i + 1)
         
         # Variables para rastrear el mejor vecino de esta iteración
-        best_neighbor_set = None
         best_neighbor_cost = float('inf')
         best_neighbor_move = None
         
         # Variables de respaldo ("Pánico"): 
         # Si todos los vecinos válidos son Tabú, guardamos el mejor Tabú para movernos hacia él si es necesario.
-        best_tabu_neighbor_set = None
         best_tabu_neighbor_cost = float('inf')
         best_tabu_move = None
 
+        # Referencia de aspiración y poda: el mejor costo propio o, en un portafolio, el de cualquier búsqueda
+        aspiration_cost = min(best_cost, shared_best.value) if shared_best is not None else best_cost
+
         # --- Exploración del Vecindario ---
-        for neighbor_set, move in get_neighbors_sampled(current_solution_set, n_locations, neighborhood_sample_size):
-            
-            # Verificamos si el movimiento está prohibido (está en la lista tabú)
-            # El movimiento es (nodo_cerrado, nodo_abierto). Chequeamos si alguno está en la lista.
-            is_tabu = (move[0] in tabu_list or move[1] in tabu_list)
+        # Primero se muestrea todo el vecindario (el RNG sólo se usa en el maestro) y luego se evalúa
+        # en bloque: secuencialmente, o repartido entre trabajadores si el evaluador es paralelo.
+        # La llamada costosa es resolver el subproblema de transporte (o su delta incremental).
+        t = recorder.clock()
+        if neighborhood == "scored":
+            neighbors = list(get_neighbors_scored(move_bounds, neighborhood_sample_size, tabu, i, aspiration_cost))
+        else:
+            neighbors = list(get_neighbors_sampled(current_open, neighborhood_sample_size))
+        recorder.add_time("generate", t)
+
+        # Admisible = no tabú o cumple aspiración (mismo criterio que la selección de abajo)
+        def is_admissible(move, cost):
+            return not tabu.is_tabu(move, i) or cost < aspiration_cost
+
+        t = recorder.clock()
+        if prune:
+            neighbor_costs, counts = evaluate_neighbors_pruned(
+                ampl_wrapper, current_open, neighbors, delta_eval, move_bounds, is_admissible, deadline)
+            prune_totals = [total + c for total, c in zip(prune_totals, counts)]
+            recorder.count("pruned", counts[1])
+            if i % 10 == 0: # Mismo ritmo que el logging de [Heuristic]; el total se imprime al final
+                print(f"[Prune] Iter {i+1}. Evaluados: {counts[0]} | Podados: {counts[1]} | Sin capacidad: {counts[2]}")
+        else:
+            # Con delta, los vecinos que no pueden mejorar al mejor admisible de la iteración no se resuelven
+            neighbor_costs = evaluate_neighbors(ampl_wrapper, current_open, neighbors, delta_eval, deadline,
+                                                is_admissible if delta_eval else None)
+        recorder.add_time("evaluate", t)
+        if recorder.enabled:
+            recorder.count("neighbors", len(neighbors))
+            recorder.count("infeasible", sum(1 for c in neighbor_costs if c == float('inf')))
+
+        t = recorder.clock()
+        for move, neighbor_cost in zip(neighbors, neighbor_costs):
             
-            # Llamada costosa: Resolver subproblema de transporte con Gurobi
-            neighbor_cost = ampl_wrapper.solve_assignment_persistent(list(neighbor_set))
+            # Verificamos si el movimiento está prohibido:
+            # El movimiento es (nodo_cerrado, nodo_abierto). Es tabú si cierra un centro recién abierto
+            # o reabre uno recién cerrado.
+            is_tabu = tabu.is_tabu(move, i)
             
             if neighbor_cost == float('inf'): continue # Descartamos configuraciones infactibles
 
             # Criterio de Aspiración:
             # Si una solución es Tabú, pero su costo es mejor que el mejor global conocido,
             # ignoramos la prohibición y la aceptamos.
-            aspiration = (neighbor_cost < best_cost)
+            aspiration = (neighbor_cost < aspiration_cost)
             
             if (not is_tabu) or aspiration:
                 # Es un candidato válido (no tabú o cumple aspiración)
                 if neighbor_cost < best_neighbor_cost:
                     best_neighbor_cost = neighbor_cost
-                    best_neighbor_set = neighbor_set
                     best_neighbor_move = move
             else:
                 # Es un candidato Tabú (y no cumple aspiración). 
                 # Lo guardamos solo por si no encontramos nada más.
                 if neighbor_cost < best_tabu_neighbor_cost:
                     best_tabu_neighbor_cost = neighbor_cost
-                    best_tabu_neighbor_set = neighbor_set
                     best_tabu_move = move
 
         # --- Selección del Movimiento ---
-        if best_neighbor_set is not None:
+        if best_neighbor_move is not None:
             # Encontramos un vecino válido regular (o uno aspirado)
-            current_solution_set = best_neighbor_set
             current_cost = best_neighbor_cost
             move_to_add = best_neighbor_move
-        elif best_tabu_neighbor_set is not None:
+        elif best_tabu_move is not None:
             # Situación de "Estancamiento Parcial":
             # Todos los no-tabú eran malos o infactibles. Forzamos un movimiento Tabú para no detenernos.
             # print(f"[Heuristic] Alerta: Movimiento Tabú forzado en iter {i}")
-            current_solution_set = best_tabu_neighbor_set
             current_cost = best_tabu_neighbor_cost
             move_to_add = best_tabu_move
         else:
             # Estancamiento Total: No se halló ningún vecino factible en el muestreo.
-            print(f"[Heuristic] Estancamiento total en iter {i}. (Todos infactibles). Reiniciando vecindario...")
+            # (o el tiempo se agotó antes de evaluar alguno: el bucle se detiene en la próxima vuelta)
+            if deadline is None or time.time() < deadline:
+                print(f"[Heuristic] Estancamiento total en iter {i}. (Todos infactibles). Reiniciando vecindario...")
             # Aún así guardamos el historial para que no quede hueco
             history.append(best_cost)
+            recorder.add_time("select", t)
+            recorder.end_iteration(current_cost=current_cost, best_cost=best_cost, moved=False)
             continue
+        recorder.add_time("select", t)
+        current_open.swap(move_to_add) # O(1): el vecino elegido pasa a ser la solución actual
 
-        # Actualizar la memoria a corto plazo (Lista Tabú)
-        tabu_list.append(move_to_add[0])
-        tabu_list.append(move_to_add[1])
+        # El nuevo padre se resuelve exacto una vez por iteración (su costo puede mejorar la cota del delta)
+        t = recorder.clock()
+        if delta_eval:
+            current_cost = ampl_wrapper.set_parent(current_open.open_list())
+        if move_bounds is not None:
+            move_bounds.apply_move(move_to_add) # Actualización incremental del más cercano / segundo
+
+        # Actualizar la memoria a corto plazo
+        tabu.record(move_to_add, i)
+        recorder.add_time("update", t)
 
         # Actualizar el Mejor Global encontrado hasta el momento
         if current_cost < best_cost:
             best_cost = current_cost
-            best_solution_set = current_solution_set
+            best_solution = current_open.open_list()
             print(f"*** [Heuristic] Nuevo Óptimo: {best_cost:,.2f} (Iter {i+1}) ***")
+            if shared_best is not None:
+                with shared_best.get_lock():
+                    if best_cost < shared_best.value:
+                        shared_best.value = best_cost
         else:
             # Logging reducido para no saturar la consola
             if i % 10 == 0: 
@@ -217,8 +426,19 @@ def run_tabu_search(ampl_wrapper, dat_file, mod_file, n_locations, max_iteration
         
         # Guardamos el mejor costo de esta iteración en el historial
         history.append(best_cost)
+        recorder.end_iteration(current_cost=current_cost, best_cost=best_cost, moved=True)
+        if checkpoint is not None and checkpoint.due(iterations_run):
+            save_checkpoint()
+
+    if checkpoint is not None:
+        save_checkpoint()
+        print(f"[Checkpoint] Estado guardado en {checkpoint.path} (iteración {iterations_run})")
 
     total_time = time.time() - start_time
     print(f"\n[Heuristic] Fin. Mejor Costo: {best_cost:,.2f}. Tiempo: {total_time:.2f}s")
+    if prune:
+        print(f"[Prune] Total. Evaluados: {prune_totals[0]} | Podados: {prune_totals[1]} | Sin capacidad: {prune_totals[2]}")
+    if recorder.enabled:
+        recorder.print_summary()
     
-    return best_cost, list(best_solution_set), iterations_run, history
\ No newline at end of file
+    return best_cost, sorted(best_solution), iterations_run, history
\ No newline at end of file
@@ -0,0 +1,227 @@
+"""
+Carga de instancias CFLP como arreglos NumPy.
+Permite que los componentes del lado de Python (evaluadores, cotas, verificadores)
+lean los parámetros ICap, FC, dem y TC sin pasar por AMPL.
+"""
+
+import os
+import struct
+import numpy as np
+
+# --- Formato binario columnar (.bin) ---
+# Cabecera fija de 128 bytes seguida de los arreglos float64 (little-endian) alineados a 64 bytes:
+#   magic(8) | versión(u4) | reservado(u4) | n_clients(u8) | n_locations(u8) | offsets ICap, FC, dem, TC (u8 x 4)
+# TC se guarda por filas (cliente mayor), igual que la matriz en memoria, para poder mapearla sin copiar.
+BIN_MAGIC = b'CFLPBIN1'
+BIN_VERSION = 1
+BIN_HEADER_FMT = '<8sIIQQQQQQ'
+BIN_HEADER_SIZE = 128
+BIN_ALIGN = 64
+BIN_DTYPE = np.dtype('<f8')
+
+
+class Instance:
+    """
+    Contenedor de una instancia CFLP en memoria.
+    Los índices son 0-based internamente; la localización j del modelo AMPL es la columna j-1.
+    - ICap, FC: vectores de largo n_locations.
+    - dem: vector de largo n_clients.
+    - TC: matriz (n_clients x n_locations) con el costo de asignar todo el cliente i al centro j.
+    """
+    def __init__(self, ICap, FC, dem, TC, name=None):
+        self.ICap = np.asarray(ICap, dtype=np.float64)
+        self.FC = np.asarray(FC, dtype=np.float64)
+        self.dem = np.asarray(dem, dtype=np.float64)
+        self.TC = np.asarray(TC, dtype=np.float64)
+        self.name = name
+
+        self.n_locations = self.ICap.shape[0]
+        self.n_clients = self.dem.shape[0]
+
+        if self.FC.shape[0] != self.n_locations or self.TC.shape != (self.n_clients, self.n_locations):
+            raise ValueError(
+                f"Dimensiones inconsistentes: ICap={self.ICap.shape}, FC={self.FC.shape}, "
+                f"dem={self.dem.shape}, TC={self.TC.shape}"
+            )
+
+        self.total_demand = float(self.dem.sum())
+
+    def get_capacity_list(self):
+        # Misma convención que AMPLWrapper: [(capacidad, j_1based), ...] ordenado de mayor a menor
+        return sorted(
+            [(float(cap), j + 1) for j, cap in enumerate(self.ICap) if cap > 0],
+            reverse=True
+        )
+
+
+def _parse_indexed_vector(tokens, size):
+    """Convierte una secuencia 'idx val idx val ...' en un vector ordenado por índice (1-based)."""
+    pairs = np.array(tokens, dtype=np.float64).reshape(-1, 2)
+    vec = np.zeros(size, dtype=np.float64)
+    vec[pairs[:, 0].astype(np.int64) - 1] = pairs[:, 1]
+    return vec
+
+
+def _parse_table(header_tokens, body_tokens, n_rows):
+    """Convierte una tabla AMPL 'param TC : c1 c2 ... := r1 v v ... r2 v v ...' en matriz densa."""
+    cols = np.array(header_tokens, dtype=np.int64) - 1
+    body = np.array(body_tokens, dtype=np.float64).reshape(n_rows, len(cols) + 1)
+    rows = body[:, 0].astype(np.int64) - 1
+
+    matrix = np.empty((n_rows, len(cols)), dtype=np.float64)
+    # Reordenamos filas y columnas según los índices declarados en el .dat
+    matrix[np.ix_(rows, cols)] = body[:, 1:]
+    return matrix
+
+
+def read_dat_instance(dat_file_path):
+    """
+    Lee un archivo .dat (formato generado por data_parser o los ejemplos provistos)
+    y devuelve un objeto Instance. Soporta parámetros escalares, vectores indexados
+    'idx val' y la tabla 'param TC : ... :='.
+    """
+    with open(dat_file_path, 'r') as f:
+        text = f.read()
+
+    params = {}
+    for statement in text.split(';'):
+        tokens = statement.split()
+        if len(tokens) < 2 or tokens[0] != 'param':
+            continue
+        name = tokens[1]
+
+        if tokens[2] == ':=':
+            params[name] = tokens[3:]
+        elif tokens[2] == ':':
+            # Tabla: los tokens entre ':' y ':=' son los índices de columna
+            sep = tokens.index(':=')
+            params[name] = (tokens[3:sep], tokens[sep + 1:])
+        else:
+            raise ValueError(f"Sentencia no soportada en {dat_file_path}: param {name} {tokens[2]}")
+
+    n_clients = int(params['cli'][0])
+    n_locations = int(params['loc'][0])
+
+    ICap = _parse_indexed_vector(params['ICap'], n_locations)
+    FC = _parse_indexed_vector(params['FC'], n_locations)
+    dem = _parse_indexed_vector(params['dem'], n_clients)
+    TC = _parse_table(params['TC'][0], params['TC'][1], n_clients)
+
+    name = os.path.splitext(os.path.basename(dat_file_path))[0]
+    return Instance(ICap, FC, dem, TC, name=name)
+
+
+def _aligned(offset):
+    return (offset + BIN_ALIGN - 1) // BIN_ALIGN * BIN_ALIGN
+
+
+def binary_layout(n_clients, n_locations):
+    """Calcula los offsets (en bytes) de ICap, FC, dem y TC y el tamaño total del archivo."""
+    item = BIN_DTYPE.itemsize
+    off_icap = BIN_HEADER_SIZE
+    off_fc = _aligned(off_icap + n_locations * item)
+    off_dem = _aligned(off_fc + n_locations * item)
+    off_tc = _aligned(off_dem + n_clients * item)
+    total = off_tc + n_clients * n_locations * item
+    return (off_icap, off_fc, off_dem, off_tc), total
+
+
+def write_binary_header(f, n_clients, n_locations):
+    """Escribe la cabecera al inicio de 'f' y retorna los offsets de cada arreglo."""
+    offsets, _ = binary_layout(n_clients, n_locations)
+    header = struct.pack(BIN_HEADER_FMT, BIN_MAGIC, BIN_VERSION, 0, n_clients, n_locations, *offsets)
+    f.seek(0)
+    f.write(header.ljust(BIN_HEADER_SIZE, b'\0'))
+    return offsets
+
+
+def write_binary_instance(instance, bin_file_path):
+    """Guarda una Instance en formato binario (escritura atómica vía archivo temporal)."""
+    os.makedirs(os.path.dirname(os.path.abspath(bin_file_path)), exist_ok=True)
+    tmp_path = bin_file_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        offsets = write_binary_header(f, instance.n_clients, instance.n_locations)
+        arrays = (instance.ICap, instance.FC, instance.dem, instance.TC)
+        for offset, arr in zip(offsets, arrays):
+            f.seek(offset)
+            f.write(np.ascontiguousarray(arr, dtype=BIN_DTYPE).tobytes())
+    os.replace(tmp_path, bin_file_path)
+
+
+def read_binary_header(bin_file_path):
+    """Lee y valida la cabecera. Retorna (n_clients, n_locations, offsets)."""
+    with open(bin_file_path, 'rb') as f:
+        raw = f.read(struct.calcsize(BIN_HEADER_FMT))
+    magic, version, _, n_clients, n_locations, *offsets = struct.unpack(BIN_HEADER_FMT, raw)
+    if magic != BIN_MAGIC:
+        raise ValueError(f"{bin_file_path} no es una instancia binaria CFLP.")
+    if version != BIN_VERSION:
+        raise ValueError(f"Versión binaria {version} no soportada (se esperaba {BIN_VERSION}).")
+    _, expected_size = binary_layout(n_clients, n_locations)
+    if os.path.getsize(bin_file_path) < expected_size:
+        raise ValueError(f"{bin_file_path} está truncado.")
+    return n_clients, n_locations, offsets
+
+
+def read_binary_instance(bin_file_path):
+    """
+    Carga una instancia binaria mapeando los arreglos en memoria (np.memmap, sin copia).
+    El sistema operativo sólo lee de disco las páginas de TC que realmente se usan.
+    """
+    n_clients, n_locations, offsets = read_binary_header(bin_file_path)
+    shapes = ((n_locations,), (n_locations,), (n_clients,), (n_clients, n_locations))
+    arrays = [np.memmap(bin_file_path, dtype=BIN_DTYPE, mode='r', offset=off, shape=shape)
+              for off, shape in zip(offsets, shapes)]
+    name = os.path.splitext(os.path.basename(bin_file_path))[0]
+    return Instance(*arrays, name=name)
+
+
+def binary_cache_path(dat_file_path):
+    """Ruta del caché binario de un .dat: data/instances_dat/X.dat -> data/instances_bin/X.bin"""
+    dat_dir = os.path.dirname(os.path.abspath(dat_file_path))
+    name = os.path.splitext(os.path.basename(dat_file_path))[0]
+    return os.path.join(os.path.dirname(dat_dir), 'instances_bin', f"{name}.bin")
+
+
+def validate_binary_instance(bin_file_path, dat_file_path):
+    """Compara arreglo por arreglo el binario contra el .dat de origen. Retorna True si coinciden."""
+    ref = read_dat_instance(dat_file_path)
+    inst = read_binary_instance(bin_file_path)
+    ok = True
+    for field in ('ICap', 'FC', 'dem', 'TC'):
+        a, b = getattr(ref, field), getattr(inst, field)
+        if a.shape != b.shape or not np.array_equal(a, b):
+            print(f"[Instance] Diferencia en '{field}' entre {dat_file_path} y {bin_file_path}")
+            ok = False
+    return ok
+
+
+def load_instance(path, use_cache=True):
+    """
+    Punto de entrada único para cargar una instancia según su extensión.
+    Para un .dat se usa (o se regenera) el caché binario en data/instances_bin, de modo que sólo
+    la primera carga paga el parseo del texto; las siguientes mapean el binario directamente.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.bin':
+        return read_binary_instance(path)
+    if ext != '.dat':
+        raise ValueError(f"Formato de instancia no soportado: {path}")
+
+    if not use_cache:
+        return read_dat_instance(path)
+
+    bin_path = binary_cache_path(path)
+    if os.path.exists(bin_path) and os.path.getmtime(bin_path) >= os.path.getmtime(path):
+        try:
+            return read_binary_instance(bin_path)
+        except ValueError as e:
+            print(f"[Instance] Caché binario inválido ({e}). Regenerando...")
+
+    instance = read_dat_instance(path)
+    try:
+        write_binary_instance(instance, bin_path)
+        print(f"[Instance] Caché binario generado en {bin_path}")
+    except OSError as e:
+        print(f"[Instance] No se pudo escribir el caché binario: {e}")
+    return instance
@@ -0,0 +1,131 @@
+"""
+Instrumentación por iteración de la Búsqueda Tabú.
+Registra, para cada iteración, la duración de cada fase (generación de vecinos, cotas, evaluación,
+selección tabú, actualización del padre), contadores (vecinos, infactibles, ...) y lo que el evaluador
+acumuló en su diccionario 'stats' (tiempo de fijación de variables, de solver, de lectura de
+resultados y distribución de estados del solver).
+
+Desactivada (NULL_RECORDER) cada llamada es un método vacío: el costo es despreciable frente a un solve.
+"""
+
+import csv
+import json
+import os
+import time
+from collections import Counter
+
+
+def new_solver_stats():
+    """Diccionario acumulado que exponen los evaluadores como atributo 'stats'."""
+    return {'t_fix': 0.0, 't_solve': 0.0, 't_parse': 0.0, 'solves': 0, 'status': Counter()}
+
+
+class NullRecorder:
+    """Recolector desactivado: misma interfaz que TraceRecorder, sin trabajo."""
+    enabled = False
+
+    def clock(self):
+        return 0.0
+
+    def start_iteration(self, iteration):
+        pass
+
+    def add_time(self, phase, started):
+        pass
+
+    def count(self, key, n=1):
+        pass
+
+    def end_iteration(self, **fields):
+        pass
+
+
+NULL_RECORDER = NullRecorder()
+
+
+class TraceRecorder:
+    enabled = True
+
+    def __init__(self, evaluator=None):
+        """
+        - evaluator: si expone 'stats' (ver new_solver_stats), cada registro incluye lo que acumuló
+          durante la iteración. Con --workers > 1, ParallelEvaluator entrega la suma de los trabajadores.
+        """
+        self.evaluator = evaluator
+        self.records = []
+        self.current = None
+        self.last_stats = None
+
+    def _snapshot(self):
+        stats = getattr(self.evaluator, 'stats', None) if self.evaluator is not None else None
+        if not isinstance(stats, dict):
+            return None
+        return {k: (Counter(v) if isinstance(v, Counter) else v) for k, v in stats.items()}
+
+    def clock(self):
+        return time.perf_counter()
+
+    def start_iteration(self, iteration):
+        self.current = {'iteration': iteration, 'start': time.perf_counter()}
+        # Lo acumulado antes (p. ej. la solución inicial) no se atribuye a la iteración
+        self.last_stats = self._snapshot()
+
+    def add_time(self, phase, started):
+        key = f"t_{phase}"
+        self.current[key] = self.current.get(key, 0.0) + (time.perf_counter() - started)
+
+    def count(self, key, n=1):
+        self.current[key] = self.current.get(key, 0) + n
+
+    def end_iteration(self, **fields):
+        record = self.current
+        record['t_total'] = time.perf_counter() - record.pop('start')
+        record.update(fields)
+
+        # Diferencia de las estadísticas del evaluador durante esta iteración
+        now = self._snapshot()
+        if now is not None and self.last_stats is not None:
+            for key, value in now.items():
+                if isinstance(value, Counter):
+                    for status, n in (value - self.last_stats[key]).items():
+                        record[f"status_{status}"] = n
+                else:
+                    record[f"solver_{key}"] = value - self.last_stats[key]
+        self.records.append(record)
+        self.current = None
+
+    def summary(self):
+        """Totales por fase (segundos) y por estado del solver."""
+        totals = Counter()
+        for record in self.records:
+            for key, value in record.items():
+                if key.startswith(('t_', 'solver_t_', 'status_')) or key in ('neighbors', 'infeasible', 'pruned'):
+                    totals[key] += value
+        return dict(totals)
+
+    def print_summary(self):
+        totals = self.summary()
+        phases = " | ".join(f"{k[2:]}: {v:.2f}s" for k, v in totals.items() if k.startswith('t_') and k != 't_total')
+        print(f"[Trace] {len(self.records)} iteraciones | Total: {totals.get('t_total', 0.0):.2f}s | {phases}")
+        solver = " | ".join(f"{k[9:]}: {v:.2f}s" for k, v in totals.items() if k.startswith('solver_t_'))
+        if solver:
+            print(f"[Trace] Evaluador: {solver}")
+        statuses = ", ".join(f"{k[7:]}={v}" for k, v in totals.items() if k.startswith('status_'))
+        if statuses:
+            print(f"[Trace] Estados del solver: {statuses}")
+
+    def export(self, path):
+        """Exporta los registros como JSON lines (.jsonl) o CSV (.csv), según la extensión."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if path.endswith('.csv'):
+            # Columnas en orden de primera aparición (los estados del solver pueden variar entre iteraciones)
+            fields = list(dict.fromkeys(k for record in self.records for k in record))
+            with open(path, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+                writer.writerows(self.records)
+        else:
+            with open(path, 'w') as f:
+                for record in self.records:
+                    f.write(json.dumps(record) + "\n")
+        print(f"[Trace] Registro exportado en {path}")
@@ -1,9 +1,27 @@
 import os
+import sys
+import json
+import time
+import random
 import argparse
-from data_parser import parse_and_convert
+from data_parser import parse_and_convert, convert_batch
 import ampl_solver
 import utils
 import heuristic
+import evaluators
+import parallel
+import cost_cache
+import instance
+import lower_bound
+import move_bounds
+import candidates
+import instrumentation
+import checkpoint
+import portfolio
+import results_store
+import verifier
+import benchmark
+import generator
 
 # --- Configuración de Rutas y Directorios ---
 # Define la estructura de carpetas relativa a la ubicación de este script.
@@ -11,9 +29,43 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 DATA_DIR = os.path.join(BASE_DIR, 'data')
 TXT_DIR = os.path.join(DATA_DIR, 'instances_txt')   # Instancias originales en texto plano
 DAT_DIR = os.path.join(DATA_DIR, 'instances_dat')   # Instancias convertidas para AMPL
+BIN_DIR = os.path.join(DATA_DIR, 'instances_bin')   # Caché binario (memmap) para los componentes en Python
 MODELS_DIR = os.path.join(BASE_DIR, 'models')       # Archivos .mod de AMPL
 SOLUTIONS_DIR = os.path.join(BASE_DIR, 'solutions') # Salida de resultados
-REPORT_PATH = os.path.join(BASE_DIR, 'report.xlsx') # Reporte general en Excel
+REPORT_PATH = os.path.join(BASE_DIR, 'report.xlsx') # Reporte general en Excel (se exporta con -a report)
+RESULTS_DB = os.path.join(BASE_DIR, 'results.db')   # Registro de corridas (SQLite, sólo agrega filas)
+BENCH_DIR = os.path.join(BASE_DIR, 'benchmarks')    # Suite de benchmark, línea base y último resumen
+
+# Parámetros de la corrida que se guardan junto a sus resultados
+RUN_PARAMS = ('iterations', 'tenure', 'tenure_open', 'tenure_close', 'sample', 'evaluator', 'delta', 'prune',
+              'neighborhood', 'workers', 'portfolio', 'candidates', 'reduced', 'no_warm_start', 'time_limit',
+              'bound_iters')
+
+def record_result(args, action, **metrics):
+    """Agrega la corrida al registro de resultados (results_store.py) con su semilla y parámetros."""
+    results_store.record_run(RESULTS_DB, args.instance, args.mode, action, seed=args.seed,
+                             params={k: getattr(args, k) for k in RUN_PARAMS}, **metrics)
+
+def evaluation_count(evaluator):
+    """Solves del sub-problema que reporta el evaluador (ver instrumentation.py); None si no los expone."""
+    stats = getattr(evaluator, 'stats', None)
+    return stats['solves'] if isinstance(stats, dict) else None
+
+def verify_saved(dat_file, solution_name, mode):
+    """Verifica la solución recién guardada contra la instancia (verifier.py). Retorna True si es válida."""
+    _, npz_path = utils.solution_paths(SOLUTIONS_DIR, solution_name, mode)
+    if not os.path.exists(npz_path):
+        print(f"[Verify] No existe la solución {npz_path}")
+        return False
+    try:
+        t0 = time.time()
+        report = verifier.verify_file(dat_file, npz_path)
+        verifier.print_report(report)
+        print(f"[Verify] {os.path.basename(npz_path)} verificada en {(time.time() - t0) * 1000:.1f}ms")
+        return report['ok']
+    except Exception as e:
+        print(f"[Verify] Error verificando {npz_path}: {e}")
+        return False
 
 def get_model_path(mode):
     """
@@ -37,27 +89,164 @@ def get_model_path(mode):
         raise FileNotFoundError(f"No se encuentra el modelo: {mod_file}")
     return mod_file
 
+def evaluator_spec(args, dat_file, mod_file, gurobi_opts):
+    """Argumentos de evaluators.create_evaluator (también los usan los procesos trabajadores)."""
+    return dict(backend=args.evaluator, dat_file=dat_file, mod_file=mod_file,
+                mode=args.mode, gurobi_opts=gurobi_opts, delta=args.delta,
+                warm_start=not args.no_warm_start, reduced=args.reduced, candidates=args.candidates)
+
+def cache_signature(args, dat_file):
+    # --candidates / --reduced cambian la función de costo (LP restringido): no se mezclan en un mismo archivo
+    return (f"{os.path.basename(dat_file)}|{args.mode}|{args.evaluator}"
+            f"|k{args.candidates}|{'reduced' if args.reduced else 'full'}")
+
+def build_evaluator(args, dat_file, mod_file, gurobi_opts, use_cache=True):
+    """
+    Crea el evaluador del sub-problema de asignación que usará la heurística.
+    Con --workers > 1 se levanta un pool de procesos, cada uno con su propio evaluador.
+    use_cache=False: sin caché de costos (evaluador del maestro que sólo refina el resultado de un portafolio).
+    """
+    spec = evaluator_spec(args, dat_file, mod_file, gurobi_opts)
+    if args.workers > 1:
+        evaluator = parallel.ParallelEvaluator(spec, args.workers)
+    else:
+        evaluator = evaluators.create_evaluator(**spec)
+
+    # Caché de costos por configuración (--cache-size 0 la desactiva)
+    if use_cache and args.cache_size > 0:
+        cache = cost_cache.CostCache(evaluator.get_n_locations(), args.cache_size,
+                                     signature=cache_signature(args, dat_file), path=args.cache_file)
+        evaluator = cost_cache.CachedEvaluator(evaluator, cache, cache_delta=(args.delta != "bound"))
+    return evaluator
+
+def build_move_bounds(args, dat_file):
+    """Cotas por vecino para podar (--prune) o puntuar (--neighborhood scored) el vecindario, en el maestro con NumPy."""
+    if not args.prune and args.neighborhood != "scored":
+        return None
+    return move_bounds.SwapBounds(instance.load_instance(dat_file))
+
+def build_recorder(args, evaluator):
+    """Registro por iteración de tiempos por fase y estados del solver (--trace); None si está desactivado."""
+    if args.trace == "off":
+        return None
+    return instrumentation.TraceRecorder(evaluator)
+
+def build_checkpoint(args, dat_file):
+    """Checkpoint periódico del estado de la búsqueda (--checkpoint-every N) para retomarla con --resume."""
+    if args.checkpoint_every <= 0 and not args.resume:
+        return None
+    path = os.path.join(SOLUTIONS_DIR, f"checkpoint_{args.instance}_{args.mode}.pkl")
+    signature = f"{os.path.basename(dat_file)}|{args.mode}|{args.tenure}|{args.tenure_open}|{args.tenure_close}"
+    return checkpoint.SearchCheckpoint(path, signature, every=args.checkpoint_every or 10)
+
+def run_search(args, evaluator, dat_file, mod_file, gurobi_opts):
+    """
+    Ejecuta la Búsqueda Tabú: una sola trayectoria con 'evaluator', o con --portfolio K, K búsquedas
+    en procesos separados (cada una con su propio evaluador) cuyo resultado se consolida; en ese caso
+    'evaluator' no se usa (puede ser None) y las evaluaciones son la suma de las K búsquedas.
+    Retorna (costo, centros_abiertos, iteraciones, historial, evaluaciones).
+    """
+    if args.portfolio > 1:
+        configs = portfolio.build_configs(args.portfolio, args.seed, args.tenure, args.sample,
+                                          args.tenure_open, args.tenure_close)
+        cost, best_set, iters, history, results, evaluations = portfolio.run_portfolio(
+            evaluator_spec(args, dat_file, mod_file, gurobi_opts), configs, args.iterations,
+            prune=args.prune, neighborhood=args.neighborhood, time_limit=args.time_limit,
+            cache_size=args.cache_size, cache_signature=cache_signature(args, dat_file),
+            cache_file=args.cache_file, trace_path=trace_path(args))
+        if results:
+            portfolio.save_histories(os.path.join(SOLUTIONS_DIR, f"history_{args.instance}_{args.mode}.csv"),
+                                     results, history)
+        return cost, best_set, iters, history, evaluations
+
+    recorder = build_recorder(args, evaluator)
+    cost, best_set, iters, history = heuristic.run_tabu_search(
+        evaluator, dat_file, mod_file, evaluator.get_n_locations(),
+        args.iterations, args.tenure, args.sample,
+        delta_eval=(args.delta != "off"), move_bounds=build_move_bounds(args, dat_file),
+        prune=args.prune, neighborhood=args.neighborhood, recorder=recorder,
+        time_limit=args.time_limit, checkpoint=build_checkpoint(args, dat_file), resume=args.resume,
+        tenure_open=args.tenure_open, tenure_close=args.tenure_close
+    )
+    if recorder is not None:
+        recorder.export(trace_path(args))
+    return cost, best_set, iters, history, evaluation_count(evaluator)
+
+def trace_path(args):
+    """Archivo de la traza (--trace); con --portfolio cada búsqueda agrega su id (portfolio.search_path)."""
+    if args.trace == "off":
+        return None
+    return os.path.join(SOLUTIONS_DIR, f"trace_{args.instance}_{args.mode}.{args.trace}")
+
 def main(args):
+
+    # Semilla fija: la búsqueda es reproducible, también con --workers > 1 (ver parallel.py);
+    # no lo es con --time-limit, --portfolio ni solves de Gurobi que agotan su timelimit
+    if args.seed is not None:
+        random.seed(args.seed)
     
     # --- ACCIÓN 1: Parseo (Preparación de datos) ---
     # Si se selecciona 'parse', convierte todas las instancias .txt a formato .dat de AMPL y termina.
+    # Sólo se regeneran las salidas cuyo .txt cambió (tamaño/hash en manifest.json) o con --force.
     if args.action == 'parse':
         print("--- ACCIÓN: Parsear todos los .txt a .dat ---")
         os.makedirs(DAT_DIR, exist_ok=True)
         if not os.path.exists(TXT_DIR):
             print(f"Error: No existe {TXT_DIR}")
             return
-        for f in os.listdir(TXT_DIR):
-            if f.endswith(".txt"):
-                txt = os.path.join(TXT_DIR, f)
-                dat = os.path.join(DAT_DIR, f.replace(".txt", ".dat"))
-                # Solo genera el archivo si no existe previamente
-                if not os.path.exists(dat):
-                    print(f"Generando {dat}...")
-                    parse_and_convert(txt, dat)
+        convert_batch(TXT_DIR, DAT_DIR, workers=args.workers, force=args.force)
         print("--- Parseo Completado ---")
         return
 
+    # --- ACCIÓN: Caché binario ---
+    # Genera (o regenera) el binario de cada .dat y lo valida arreglo por arreglo contra el texto.
+    if args.action == 'binary':
+        print("--- ACCIÓN: Generar y validar caché binario de todos los .dat ---")
+        os.makedirs(BIN_DIR, exist_ok=True)
+        for f in sorted(os.listdir(DAT_DIR)):
+            if f.endswith(".dat"):
+                dat = os.path.join(DAT_DIR, f)
+                bin_path = os.path.join(BIN_DIR, f.replace(".dat", ".bin"))
+                t0 = time.time()
+                instance.write_binary_instance(instance.read_dat_instance(dat), bin_path)
+                t_dat = time.time() - t0
+                t0 = time.time()
+                instance.read_binary_instance(bin_path)
+                t_bin = time.time() - t0
+                status = "OK" if instance.validate_binary_instance(bin_path, dat) else "DIFERENTE"
+                print(f"{f}: {status} | .dat {t_dat:.2f}s -> .bin {t_bin * 1000:.1f}ms")
+        print("--- Caché binario Completado ---")
+        return
+
+    # --- ACCIÓN: Reporte Excel ---
+    # Exporta report.xlsx desde el registro de corridas (results.db); no ejecuta nada.
+    if args.action == 'report':
+        results_store.export_excel(RESULTS_DB, REPORT_PATH)
+        return
+
+    # --- ACCIÓN: Benchmark ---
+    # Corre la suite (instancias x modos x parámetros x semillas) con un evaluador sin licencia y compara
+    # el resumen contra la línea base guardada. Termina con código 1 si hay regresiones.
+    if args.action == 'benchmark':
+        suite = benchmark.load_suite(args.suite)
+        cases = benchmark.build_cases(suite, DAT_DIR, get_model_path, only_instance=args.instance)
+        print(f"--- ACCIÓN: BENCHMARK | {len(cases)} casos | Evaluador: {suite['evaluator']} ---")
+        summary = benchmark.save_summary(os.path.join(BENCH_DIR, 'latest.json'), suite, benchmark.run_suite(cases))
+        for key, agg in summary['aggregates'].items():
+            print(f"[Bench] {key}: mejor {agg['best_cost']:,.2f} | media {agg['mean_cost']:,.2f} | "
+                  f"{agg['mean_wall_s']:.2f}s | {agg['mean_evals_per_s']:,.1f} eval/s | {agg['max_peak_mem_mb']:.0f} MB")
+
+        baseline_path = args.baseline or os.path.join(BENCH_DIR, 'baseline.json')
+        if args.save_baseline:
+            benchmark.save_summary(baseline_path, suite, summary['cases'])
+        elif os.path.exists(baseline_path):
+            with open(baseline_path) as f:
+                if benchmark.compare(summary, json.load(f), tolerance=args.bench_tolerance):
+                    sys.exit(1)
+        else:
+            print(f"[Bench] Sin línea base en {baseline_path} (guardarla con --save-baseline)")
+        return
+
     # Validación: Para 'optimal' o 'heuristic', se requiere especificar una instancia.
     if not args.instance:
         print("Error: Requiere -i / --instance")
@@ -65,6 +254,27 @@ def main(args):
 
     print(f"--- ACCIÓN: {args.action.upper()} | INSTANCIA: {args.instance} | MODO: {args.mode} ---")
 
+    # --- ACCIÓN: Generar instancia sintética ---
+    # Escribe data/instances_txt/<instancia>.txt. Las demás acciones la convierten a .dat al primer uso,
+    # como cualquier instancia; con --gen-binary se convierte de inmediato a .dat + caché binario (.bin).
+    if args.action == 'generate':
+        txt_file = os.path.join(TXT_DIR, f"{args.instance}.txt")
+        if os.path.exists(txt_file) and not args.force:
+            print(f"Error: {txt_file} ya existe (usar --force para reemplazarla)")
+            return
+        try:
+            generator.generate_instance(
+                txt_file, args.gen_locations, args.gen_clients, seed=args.seed, tightness=args.tightness,
+                fixed_costs=args.fixed_costs, costs=args.costs)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        if args.gen_binary:
+            # Una sola pasada escribe ambos y el .bin queda más nuevo que el .dat: load_instance lo usa tal cual
+            dat_file = os.path.join(DAT_DIR, f"{args.instance}.dat")
+            parse_and_convert(txt_file, dat_file, instance.binary_cache_path(dat_file), tc_workers=max(1, args.workers))
+        return
+
     # Asegurar que el archivo .dat específico de la instancia exista
     os.makedirs(DAT_DIR, exist_ok=True)
     dat_file = os.path.join(DAT_DIR, f"{args.instance}.dat")
@@ -74,7 +284,7 @@ def main(args):
         print(f"[Main] Creando {dat_file}...")
         txt_file = os.path.join(TXT_DIR, f"{args.instance}.txt")
         if os.path.exists(txt_file):
-            parse_and_convert(txt_file, dat_file)
+            parse_and_convert(txt_file, dat_file, instance.binary_cache_path(dat_file))
         else:
             print(f"Error Fatal: No existe la instancia fuente {txt_file}")
             return
@@ -91,45 +301,67 @@ def main(args):
         if not args.skip_optimal:
             print("\n=== FASE 1: Calculando Óptimo Real (AMPL Puro) ===")
             # 1. Resolver Óptimo
+            t0 = time.time()
             opt_cost, _, _ = ampl_solver.solve_optimal(
                 dat_file, mod_file, args.mode, solver="gurobi", timelimit=None, mipgap=0.0
             )
             print(f"--> Costo Óptimo obtenido: {opt_cost}")
             
-            # Guardar en reporte
-            utils.update_report_excel(REPORT_PATH, args.instance, args.mode, optimal_cost=opt_cost)
+            # Guardar en el registro de resultados
+            record_result(args, 'optimal', optimal_cost=opt_cost, time_s=time.time() - t0)
         else:
-            print("\n=== FASE 1: Óptimo Real OMITIDO por el usuario ===")
+            print("\n=== FASE 1: Óptimo Real OMITIDO por el usuario (se usará la cota Lagrangeana) ===")
 
         print("\n=== FASE 2: Ejecutando Heurística (AMPL + Python) ===")
         # 2. Ejecutar Heurística
         gurobi_opts = 'outlev=0 timelimit=5.0 mipgap=0.05' 
+        wrapper = None
+        t0 = time.time()
         try:
-            wrapper = ampl_solver.AMPLWrapper(dat_file, mod_file, solver="gurobi", gurobi_opts=gurobi_opts)
-            heu_cost, best_facilities, iters_done, history = heuristic.run_tabu_search(
-                wrapper, dat_file, mod_file, wrapper.get_n_locations(),
-                args.iterations, args.tenure, args.sample
-            )
+            # Con --portfolio el evaluador del maestro se crea recién para el refinamiento final
+            if args.portfolio <= 1:
+                wrapper = build_evaluator(args, dat_file, mod_file, gurobi_opts)
+            heu_cost, best_facilities, iters_done, history, evaluations = run_search(
+                args, wrapper, dat_file, mod_file, gurobi_opts)
             
             # Refinamiento final (para guardar el dato correcto en excel)
             if heu_cost != float('inf'):
+                if wrapper is None:
+                    wrapper = build_evaluator(args, dat_file, mod_file, gurobi_opts, use_cache=False)
                 print("[Main] Refinando asignación final...")
-                wrapper.ampl.setOption('gurobi_options', 'outlev=0 timelimit=10.0 mipgap=0.0')
+                wrapper.set_solver_options('outlev=0 timelimit=10.0 mipgap=0.0')
                 final_c, final_assigns = wrapper.get_final_solution(best_facilities, args.mode)
                 if final_c != float('inf'): heu_cost = final_c
             else:
-                final_assigns = []
-            
-            wrapper.close()
+                final_assigns = None
 
             # Guardar Solución y Reporte
             os.makedirs(SOLUTIONS_DIR, exist_ok=True)
             utils.save_solution_to_file(SOLUTIONS_DIR, args.instance, args.mode, heu_cost, best_facilities, final_assigns)
-            utils.update_report_excel(REPORT_PATH, args.instance, args.mode, heuristic_cost=heu_cost, iterations=iters_done)
+            if final_assigns is not None:
+                verify_saved(dat_file, args.instance, args.mode)
+            record_result(args, 'heuristic', heuristic_cost=heu_cost, iterations=iters_done,
+                          evaluations=evaluations, time_s=time.time() - t0)
 
         except Exception as e:
             print(f"[Main] Error en la fase heurística: {e}")
             return
+        finally:
+            # Cierre garantizado de las sesiones de solver (también ante Ctrl-C)
+            if wrapper is not None:
+                wrapper.close()
+
+        # Sin óptimo exacto, la referencia del gráfico es una cota inferior válida (GAP real, no estimado)
+        lb_cost = None
+        if opt_cost is None:
+            print("\n=== FASE 2b: Cota Inferior (Relajación Lagrangeana) ===")
+            t0 = time.time()
+            lb_cost, _ = lower_bound.lagrangian_bound(
+                instance.load_instance(dat_file),
+                upper_bound=heu_cost if heu_cost != float('inf') else None,
+                max_iterations=args.bound_iters
+            )
+            record_result(args, 'bound', lower_bound=lb_cost, time_s=time.time() - t0)
 
         print("\n=== FASE 3: Generando Gráfico Comparativo ===")
         try:
@@ -150,6 +382,15 @@ def main(args):
                     title_extra = f" | GAP Final: {gap:.2f}%"
                 else:
                     title_extra = ""
+            elif lb_cost is not None:
+                plt.axhline(y=lb_cost, color='g', linestyle='--', linewidth=2, label=f'Cota Inferior Lagrangeana ({lb_cost:,.0f})')
+
+                # GAP contra la cota: es una cota superior del GAP real contra el óptimo
+                if heu_cost != float('inf') and lb_cost > 0:
+                    gap = ((heu_cost - lb_cost) / lb_cost) * 100
+                    title_extra = f" | GAP vs Cota: {gap:.2f}%"
+                else:
+                    title_extra = ""
             else:
                 title_extra = " (Sin referencia de Óptimo)"
 
@@ -177,18 +418,51 @@ def main(args):
     if args.action == 'optimal':
         print("\n[Main] Resolviendo Óptimo con Gurobi...")
         # mipgap=0.0 fuerza a buscar el óptimo exacto sin margen de error.
+        t0 = time.time()
         optimal_cost, opt_facilities, opt_assignments = ampl_solver.solve_optimal(
             dat_file, mod_file, args.mode, solver="gurobi", timelimit=None, mipgap=0.0
         )
         
-        # Guardar en Excel y archivo de texto
-        utils.update_report_excel(REPORT_PATH, args.instance, args.mode, optimal_cost=optimal_cost)
+        # Guardar en el registro de resultados y archivo de texto
+        record_result(args, 'optimal', optimal_cost=optimal_cost, time_s=time.time() - t0)
         
         if optimal_cost is not None:
             os.makedirs(SOLUTIONS_DIR, exist_ok=True)
             utils.save_solution_to_file(SOLUTIONS_DIR, f"{args.instance}_OPTIMAL", args.mode, optimal_cost, opt_facilities, opt_assignments)
+            verify_saved(dat_file, f"{args.instance}_OPTIMAL", args.mode)
         print("--- Fin Optimal ---")
 
+    # --- ACCIÓN: Verificación de soluciones guardadas ---
+    # Recalcula costos, asignación de cada cliente y capacidad de cada centro de las soluciones
+    # guardadas de la instancia (heurística y óptimo, si existen). No requiere AMPL.
+    elif args.action == 'verify':
+        found = False
+        for name in (args.instance, f"{args.instance}_OPTIMAL"):
+            if os.path.exists(utils.solution_paths(SOLUTIONS_DIR, name, args.mode)[1]):
+                found = True
+                verify_saved(dat_file, name, args.mode)
+        if not found:
+            print(f"[Verify] No hay soluciones guardadas de {args.instance} ({args.mode}) en {SOLUTIONS_DIR}")
+
+    # --- ACCIÓN: Listas de candidatos (preprocesamiento opcional) ---
+    # Construye y guarda (data/instances_bin/X.k{K}.npz) los K centros más baratos de cada cliente.
+    # Los evaluadores las usan con --candidates K; si no existen, se construyen al primer uso.
+    elif args.action == 'candidates':
+        k = args.candidates if args.candidates > 0 else 20
+        t0 = time.time()
+        lists = candidates.load_candidate_lists(instance.load_instance(dat_file), dat_file, k)
+        print(f"[Main] {lists.stats()} | {time.time() - t0:.2f}s")
+        print(f"[Main] Guardadas en {candidates.candidates_cache_path(dat_file, k)}")
+
+    # --- ACCIÓN: Cota Inferior (Relajación Lagrangeana) ---
+    # Alternativa rápida a 'optimal' para instancias grandes: no requiere Gurobi ni licencia de AMPL.
+    elif args.action == 'bound':
+        print("\n[Main] Calculando cota inferior Lagrangeana...")
+        t0 = time.time()
+        lb_cost, _ = lower_bound.lagrangian_bound(instance.load_instance(dat_file), max_iterations=args.bound_iters)
+        record_result(args, 'bound', lower_bound=lb_cost, time_s=time.time() - t0)
+        print("--- Fin Cota ---")
+
     # --- ACCIÓN 3: Metaheurística (Tabu Search) ---
     elif args.action == 'heuristic':
         print("\n[Main] Ejecutando Heurística Tabu Search...")
@@ -199,59 +473,141 @@ def main(args):
         # mipgap=0.05: Acepta soluciones al 5% del óptimo durante la búsqueda para ganar velocidad.
         gurobi_opts_heuristic = 'outlev=0 timelimit=5.0 mipgap=0.05' 
 
-        try:
-            # Inicializa el wrapper de AMPL con la configuración rápida
-            ampl_wrapper = ampl_solver.AMPLWrapper(dat_file, mod_file, solver="gurobi", gurobi_opts=gurobi_opts_heuristic)
-        except Exception as e:
-            print(f"[Main] Error iniciando AMPL: {e}")
-            return
-        
-        print(f"[Main] Instancia cargada. Locs: {ampl_wrapper.get_n_locations()}")
+        t0 = time.time()
+        ampl_wrapper = None
+        # Con --portfolio cada búsqueda crea su propio evaluador: el del maestro se crea al final, sólo para refinar
+        if args.portfolio <= 1:
+            try:
+                # Inicializa el wrapper de AMPL con la configuración rápida
+                ampl_wrapper = build_evaluator(args, dat_file, mod_file, gurobi_opts_heuristic)
+            except Exception as e:
+                print(f"[Main] Error iniciando el evaluador: {e}")
+                return
+            
+            print(f"[Main] Instancia cargada. Locs: {ampl_wrapper.get_n_locations()}")
 
-        # Ejecuta el algoritmo Tabu Search
-        # Desempaquetamos la nueva variable 'history'
-        heuristic_cost, best_facilities, iters_done, history = heuristic.run_tabu_search(
-            ampl_wrapper, dat_file, mod_file, ampl_wrapper.get_n_locations(),
-            args.iterations, args.tenure, args.sample
-        )
-        
-        print(f"[Main] Heurística fin. Mejor costo est.: {heuristic_cost}")
-
-        # --- Fase de Refinamiento (Explotación final) ---
-        # Una vez que la heurística decidió QUÉ instalaciones abrir, resolvemos la asignación exacta
-        # con mayor precisión (mipgap=0.0) y más tiempo, para asegurar el costo real mínimo.
-        if heuristic_cost != float('inf'):
-            print("[Main] Refinando asignación final...")
-            ampl_wrapper.ampl.setOption('gurobi_options', 'outlev=0 timelimit=20.0 mipgap=0.0')
-            final_cost, best_assignments = ampl_wrapper.get_final_solution(best_facilities, args.mode)
-            if final_cost != float('inf'): heuristic_cost = final_cost 
-        else:
-            best_assignments = []
+        try:
+            # Ejecuta el algoritmo Tabu Search
+            # Desempaquetamos la nueva variable 'history'
+            heuristic_cost, best_facilities, iters_done, history, evaluations = run_search(
+                args, ampl_wrapper, dat_file, mod_file, gurobi_opts_heuristic)
+            
+            print(f"[Main] Heurística fin. Mejor costo est.: {heuristic_cost}")
 
-        ampl_wrapper.close()
+            # --- Fase de Refinamiento (Explotación final) ---
+            # Una vez que la heurística decidió QUÉ instalaciones abrir, resolvemos la asignación exacta
+            # con mayor precisión (mipgap=0.0) y más tiempo, para asegurar el costo real mínimo.
+            if heuristic_cost != float('inf'):
+                if ampl_wrapper is None:
+                    ampl_wrapper = build_evaluator(args, dat_file, mod_file, gurobi_opts_heuristic, use_cache=False)
+                print("[Main] Refinando asignación final...")
+                ampl_wrapper.set_solver_options('outlev=0 timelimit=20.0 mipgap=0.0')
+                final_cost, best_assignments = ampl_wrapper.get_final_solution(best_facilities, args.mode)
+                if final_cost != float('inf'): heuristic_cost = final_cost 
+            else:
+                best_assignments = None
+        finally:
+            # Cierre garantizado de las sesiones de solver (también ante errores o Ctrl-C)
+            if ampl_wrapper is not None:
+                ampl_wrapper.close()
         
         # Guardado de resultados
         os.makedirs(SOLUTIONS_DIR, exist_ok=True)
         utils.save_solution_to_file(SOLUTIONS_DIR, args.instance, args.mode, heuristic_cost, best_facilities, best_assignments)
+        if best_assignments is not None:
+            verify_saved(dat_file, args.instance, args.mode)
         
-        utils.update_report_excel(REPORT_PATH, args.instance, args.mode, heuristic_cost=heuristic_cost, iterations=iters_done)
+        record_result(args, 'heuristic', heuristic_cost=heuristic_cost, iterations=iters_done,
+                      evaluations=evaluations, time_s=time.time() - t0)
         print("--- Fin Heurística ---")
 
 if __name__ == "__main__":
     # Configuración de argumentos de línea de comandos
     parser = argparse.ArgumentParser()
     # -a: Acción a realizar (parsear datos, resolver óptimo o correr heurística)
-    parser.add_argument("-a", "--action", required=True, choices=["parse", "optimal", "heuristic", "plot"])
+    parser.add_argument("-a", "--action", required=True, choices=["parse", "binary", "optimal", "bound", "candidates", "heuristic", "plot", "report", "verify", "benchmark", "generate"])
     # -i: Nombre de la instancia (ej: p1, cap41, etc.)
     parser.add_argument("-i", "--instance", type=str)
     # -m: Modo del problema (SS: Single Source, MS: Multi Source)
     parser.add_argument("-m", "--mode", type=str, default="SS", choices=["SS", "MS"])
     # Parámetros de la heurística Tabu Search
     parser.add_argument("-n", "--iterations", type=int, default=100) # Número máximo de iteraciones
-    parser.add_argument("-t", "--tenure", type=int, default=20)      # Tamaño de la lista tabú
+    parser.add_argument("-t", "--tenure", type=int, default=20)      # Iteraciones que un movimiento queda prohibido de deshacerse
+    # Tenures separados (por defecto -t): no cerrar un centro recién abierto / no reabrir uno recién cerrado
+    parser.add_argument("--tenure-open", type=int, default=None)
+    parser.add_argument("--tenure-close", type=int, default=None)
     parser.add_argument("-s", "--sample", type=int, default=100)     # % de vecindario a explorar
     
+    # Evaluador del sub-problema de asignación (AMPL/Gurobi o NumPy/HiGHS sin licencia)
+    # hybrid (SS): heurística GAP en NumPy y AMPL exacto sólo para la solución final y lo que la heurística no certifica
+    parser.add_argument("-e", "--evaluator", type=str, default="ampl", choices=["ampl", "numpy", "hybrid"])
+
+    # Desactiva el arranque en caliente de AMPLWrapper (para comparar tiempos por solve). El arranque sólo
+    # actúa con solves al óptimo: con mipgap > 0 o timelimit cada evaluación parte de cero (costo reproducible)
+    parser.add_argument("--no-warm-start", action="store_true")
+
+    # Modelo de asignación reducido (y sólo sobre centros abiertos) y listas de k candidatos por cliente
+    # (--candidates aplica al evaluador numpy/hybrid y, con --reduced, al evaluador AMPL)
+    parser.add_argument("--reduced", action="store_true")
+    parser.add_argument("--candidates", type=int, default=0)
+
+    # Evaluación incremental de vecinos SWAP (off: desde cero | exact: delta con respaldo exacto | bound: sólo cotas)
+    parser.add_argument("--delta", type=str, default="off", choices=["off", "exact", "bound"])
+
+    # Poda de vecinos por cota inferior (costo fijo + asignación al centro abierto más barato) antes de evaluarlos
+    parser.add_argument("--prune", action="store_true")
+    # Vecindario: SWAP aleatorios (sampled) o todos los SWAP puntuados por cota, evaluando los -s mejores (scored)
+    parser.add_argument("--neighborhood", type=str, default="sampled", choices=["sampled", "scored"])
+
+    # Evaluación paralela del vecindario y semilla para reproducibilidad
+    parser.add_argument("-w", "--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+
+    # Caché de costos por conjunto de centros abiertos (LRU) y archivo opcional para persistirla
+    parser.add_argument("--cache-size", type=int, default=50000)
+    parser.add_argument("--cache-file", type=str, default=None)
+
+    # En modo parse, regenera todas las salidas aunque el manifest indique que están al día (en generate, reemplaza la instancia)
+    parser.add_argument("--force", action="store_true")
+
     parser.add_argument("--skip-optimal", action="store_true", help="En modo plot, salta el cálculo del óptimo real.")
+    # Iteraciones del subgradiente para la cota Lagrangeana (acción bound y plot con --skip-optimal)
+    parser.add_argument("--bound-iters", type=int, default=300)
+    # Registro por iteración de tiempos por fase y estados del solver, exportado a solutions/trace_<inst>_<modo>.<formato>
+    parser.add_argument("--trace", type=str, default="off", choices=["off", "jsonl", "csv"])
+
+    # Presupuesto de tiempo (segundos) de la búsqueda: al agotarse retorna la mejor solución encontrada
+    parser.add_argument("--time-limit", type=float, default=None)
+    # Checkpoint del estado de la búsqueda cada N iteraciones (solutions/checkpoint_<inst>_<modo>.pkl) y reanudación
+    parser.add_argument("--checkpoint-every", type=int, default=0)
+    parser.add_argument("--resume", action="store_true")
+
+    # Portafolio: K búsquedas independientes en procesos separados (semillas y tenures distintos, mejor costo compartido)
+    parser.add_argument("--portfolio", type=int, default=1)
+
+    # Benchmark: suite a correr (-i la restringe a una instancia), línea base a comparar o a guardar,
+    # y tolerancia (fracción) de tiempo, eval/s y memoria antes de considerar una regresión
+    parser.add_argument("--suite", type=str, default=os.path.join(BENCH_DIR, 'suite.json'))
+    parser.add_argument("--baseline", type=str, default=None)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--bench-tolerance", type=float, default=0.25)
+    
+    # Generador de instancias sintéticas (acción generate; la semilla es --seed)
+    parser.add_argument("--gen-locations", type=int, default=1000)
+    parser.add_argument("--gen-clients", type=int, default=1000)
+    parser.add_argument("--tightness", type=float, default=3.0)   # Capacidad total / demanda total
+    parser.add_argument("--fixed-costs", type=str, default="uniform", choices=list(generator.FIXED_COST_KINDS))
+    parser.add_argument("--costs", type=str, default="euclidean", choices=list(generator.COST_KINDS))
+    parser.add_argument("--gen-binary", action="store_true")
     
     args = parser.parse_args()
-    main(args)
\ No newline at end of file
+    if args.portfolio > 1 and args.workers > 1:
+        parser.error("--portfolio y --workers son excluyentes: cada búsqueda del portafolio ya usa su propio proceso.")
+    if args.portfolio > 1 and (args.checkpoint_every > 0 or args.resume):
+        parser.error("--checkpoint-every / --resume no están disponibles con --portfolio: las búsquedas comparten "
+                     "el mejor costo global y no se pueden retomar por separado.")
+    try:
+        main(args)
+    except KeyboardInterrupt:
+        # Los evaluadores ya fueron cerrados en los bloques finally de main()
+        print("\n[Main] Ejecución interrumpida por el usuario.")
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""
+Cotas inferiores baratas para movimientos SWAP de la Búsqueda Tabú.
+Para un conjunto abierto S, ningún costo de asignación puede ser menor que asignar cada cliente
+completo a su centro abierto más barato (se ignoran las capacidades):
+    LB(S) = sum_{j en S} FC[j] + sum_i min_{j en S} TC[i,j]
+Además, si sum_{j en S} ICap[j] < demanda total, S es infactible (LB = inf) en SS y en MS.
+
+Para un SWAP (cerrar a, abrir b) desde el padre, el mínimo por cliente se obtiene sin recorrer S:
+    min( TC[i, b], c1[i] si nearest[i] != a, si no c2[i] )
+con c1/c2 el costo al centro abierto más cercano y al segundo más cercano del padre.
+
+La misma descomposición permite puntuar TODOS los SWAP posibles en una pasada O(n_clients x n_locations):
+    sum_i min(base_a[i], TC[i,b]) = sum_i min(c1[i], TC[i,b])                      (ganancia de abrir b)
+                                  + sum_{i: nearest[i]=a} [min(c2[i], TC[i,b]) - min(c1[i], TC[i,b])]
+"""
+
+import numpy as np
+from scipy import sparse
+
+
+class SwapBounds:
+    def __init__(self, instance, chunk_size=256):
+        """
+        - instance: objeto Instance (ver instance.py), índices 0-based internamente.
+        - chunk_size: movimientos procesados por bloque; acota la memoria a n_clients x chunk_size floats.
+        """
+        self.TC = np.asarray(instance.TC)
+        self.FC = np.asarray(instance.FC)
+        self.ICap = np.asarray(instance.ICap)
+        self.total_demand = instance.total_demand
+        self.chunk_size = chunk_size
+
+        n_clients = self.TC.shape[0]
+        self.open_mask = np.zeros(self.TC.shape[1], dtype=bool)
+        self.nearest = np.zeros(n_clients, dtype=np.int64)
+        self.second = np.full(n_clients, -1, dtype=np.int64)
+        self.c1 = np.full(n_clients, np.inf)
+        self.c2 = np.full(n_clients, np.inf)
+        self.fixed = 0.0
+        self.capacity = 0.0
+
+    def _recompute(self, rows):
+        """Recalcula el más cercano y el segundo más cercano de los clientes 'rows' sobre el conjunto abierto."""
+        open_idx = np.nonzero(self.open_mask)[0]
+        sub = self.TC[np.ix_(rows, open_idx)] if len(rows) < self.TC.shape[0] else self.TC[:, open_idx]
+        local = np.arange(len(rows))
+
+        if len(open_idx) >= 2:
+            # argpartition deja en la columna 0 el mínimo y en la 1 el segundo menor (sin ordenar todo)
+            two = np.argpartition(sub, 1, axis=1)[:, :2]
+            first = sub[local, two[:, 0]]
+            second = sub[local, two[:, 1]]
+            swap = second < first
+            k1 = np.where(swap, two[:, 1], two[:, 0])
+            k2 = np.where(swap, two[:, 0], two[:, 1])
+            self.nearest[rows] = open_idx[k1]
+            self.second[rows] = open_idx[k2]
+            self.c1[rows] = np.minimum(first, second)
+            self.c2[rows] = np.maximum(first, second)
+        else:
+            self.nearest[rows] = open_idx[0]
+            self.second[rows] = -1
+            self.c1[rows] = sub[:, 0]
+            self.c2[rows] = np.inf
+
+    def set_parent(self, open_facilities_indices):
+        """Calcula el centro más cercano y los costos c1/c2 de cada cliente sobre el conjunto abierto (1-based)."""
+        open_idx = np.fromiter(sorted(open_facilities_indices), dtype=np.int64) - 1
+        self.open_mask[:] = False
+        self.open_mask[open_idx] = True
+        self._recompute(np.arange(self.TC.shape[0]))
+        self.fixed = float(self.FC[open_idx].sum())
+        self.capacity = float(self.ICap[open_idx].sum())
+
+    def apply_move(self, move):
+        """
+        Actualiza incrementalmente el estado tras el SWAP (j_cerrar, j_abrir) (1-based).
+        Sólo los clientes cuyo más cercano o segundo era el centro cerrado se recalculan contra todo
+        el conjunto abierto; para el resto basta comparar contra la columna del centro abierto.
+        """
+        a, b = move[0] - 1, move[1] - 1
+        self.open_mask[a] = False
+        self.open_mask[b] = True
+        self.fixed += self.FC[b] - self.FC[a]
+        self.capacity += self.ICap[b] - self.ICap[a]
+
+        col = self.TC[:, b]
+        affected = (self.nearest == a) | (self.second == a)
+        better1 = ~affected & (col < self.c1)
+        better2 = ~affected & ~better1 & (col < self.c2)
+
+        self.second[better1] = self.nearest[better1]
+        self.c2[better1] = self.c1[better1]
+        self.nearest[better1] = b
+        self.c1[better1] = col[better1]
+        self.second[better2] = b
+        self.c2[better2] = col[better2]
+
+        rows = np.nonzero(affected)[0]
+        if rows.size:
+            self._recompute(rows)
+
+    def lower_bounds(self, moves):
+        """
+        Cota inferior del costo de cada vecino (j_cerrar, j_abrir) (1-based) respecto del padre actual.
+        Retorna un arreglo NumPy; inf si el vecino no tiene capacidad suficiente.
+        """
+        moves = np.asarray(moves, dtype=np.int64).reshape(-1, 2)
+        close, open_ = moves[:, 0] - 1, moves[:, 1] - 1
+        bounds = self.fixed - self.FC[close] + self.FC[open_]
+
+        for start in range(0, len(moves), self.chunk_size):
+            c = close[start:start + self.chunk_size]
+            o = open_[start:start + self.chunk_size]
+            # Costo por cliente sin el centro cerrado: si era su más cercano, pasa al segundo
+            base = np.where(self.nearest[:, None] == c[None, :], self.c2[:, None], self.c1[:, None])
+            bounds[start:start + len(c)] += np.minimum(base, self.TC[:, o]).sum(axis=0)
+
+        capacity = self.capacity - self.ICap[close] + self.ICap[open_]
+        bounds[capacity < self.total_demand - 1e-9] = np.inf
+        return bounds
+
+    def score_all_swaps(self):
+        """
+        Cota inferior de TODOS los SWAP desde el padre, sin muestrear.
+        Retorna (scores, open_idx, closed_idx): scores[p, q] corresponde a cerrar open_idx[p] y abrir
+        closed_idx[q] (índices 0-based); inf si el vecino no tiene capacidad suficiente.
+        """
+        open_idx = np.nonzero(self.open_mask)[0]
+        closed_idx = np.nonzero(~self.open_mask)[0]
+        n_clients = self.TC.shape[0]
+
+        # Matriz indicadora (abierto x cliente) de a qué centro abierto está asignado cada cliente
+        pos = np.full(self.TC.shape[1], -1, dtype=np.int64)
+        pos[open_idx] = np.arange(len(open_idx))
+        owner = sparse.csr_matrix((np.ones(n_clients), (pos[self.nearest], np.arange(n_clients))),
+                                  shape=(len(open_idx), n_clients))
+
+        gain = np.empty(len(closed_idx))
+        loss = np.empty((len(open_idx), len(closed_idx)))
+        for start in range(0, len(closed_idx), self.chunk_size):
+            cols = closed_idx[start:start + self.chunk_size]
+            block = self.TC[:, cols]
+            with_c1 = np.minimum(block, self.c1[:, None])
+            gain[start:start + len(cols)] = with_c1.sum(axis=0)
+            loss[:, start:start + len(cols)] = owner @ (np.minimum(block, self.c2[:, None]) - with_c1)
+
+        scores = (self.fixed - self.FC[open_idx])[:, None] + (self.FC[closed_idx] + gain)[None, :] + loss
+        capacity = (self.capacity - self.ICap[open_idx])[:, None] + self.ICap[closed_idx][None, :]
+        scores[capacity < self.total_demand - 1e-9] = np.inf
+        return scores, open_idx, closed_idx
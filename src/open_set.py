@@ -0,0 +1,64 @@
+"""
+Representación del conjunto de centros abiertos para la Búsqueda Tabú sin asignaciones por iteración.
+Un único arreglo 'members' particionado (primero los abiertos, luego los cerrados) y un mapa de
+posiciones 'pos' permiten:
+- muestrear un centro abierto o cerrado en O(1) (un índice aleatorio en su tramo),
+- aplicar un SWAP en O(1) (se intercambian dos posiciones),
+- materializar la lista de abiertos de un vecino sólo cuando el evaluador la necesita.
+Índices 1-based, igual que el resto de la heurística.
+"""
+
+
+class OpenSet:
+    def __init__(self, n_locations, open_facilities, members=None):
+        """
+        - open_facilities: centros abiertos iniciales (iterable 1-based).
+        - members: orden completo ya guardado (checkpoint); si no se entrega, abiertos y cerrados van ordenados.
+        """
+        self.n_locations = n_locations
+        open_sorted = sorted(open_facilities)
+        self.n_open = len(open_sorted)
+        if members is None:
+            is_open = bytearray(n_locations + 1)
+            for j in open_sorted:
+                is_open[j] = 1
+            members = open_sorted + [j for j in range(1, n_locations + 1) if not is_open[j]]
+        self.members = list(members)
+        self.pos = [0] * (n_locations + 1)
+        for k, j in enumerate(self.members):
+            self.pos[j] = k
+
+    def __len__(self):
+        return self.n_open
+
+    def __iter__(self):
+        return iter(self.members[:self.n_open])
+
+    def is_open(self, j):
+        return self.pos[j] < self.n_open
+
+    def open_list(self):
+        """Copia de los centros abiertos (lista de int), en el orden interno."""
+        return self.members[:self.n_open]
+
+    def n_closed(self):
+        return self.n_locations - self.n_open
+
+    def open_at(self, k):
+        return self.members[k]
+
+    def closed_at(self, k):
+        return self.members[self.n_open + k]
+
+    def neighbor(self, move):
+        """Lista de abiertos del vecino (j_cerrar, j_abrir), sin modificar el estado."""
+        neighbor = self.members[:self.n_open]
+        neighbor[self.pos[move[0]]] = move[1]
+        return neighbor
+
+    def swap(self, move):
+        """Aplica el SWAP (j_cerrar, j_abrir) en O(1): ambos centros intercambian posiciones."""
+        a, b = move
+        pa, pb = self.pos[a], self.pos[b]
+        self.members[pa], self.members[pb] = b, a
+        self.pos[a], self.pos[b] = pb, pa
@@ -0,0 +1,241 @@
+"""
+Evaluación paralela del vecindario de la Búsqueda Tabú.
+Cada proceso trabajador crea su propio evaluador UNA SOLA VEZ (igual que AMPLWrapper en __init__)
+y luego recibe lotes de configuraciones por su cola. La lógica Tabú queda en el proceso maestro.
+
+Los resultados se devuelven en el mismo orden en que se enviaron, y el costo de una configuración no
+depende del trabajador ni de lo que éste evaluó antes (listas de candidatos ampliadas sólo por solve,
+criterio exacto de 'hybrid' sin estado, AMPL sin arranque en caliente en solves truncados). Así, con
+semilla fija, la búsqueda da el mismo resultado con cualquier cantidad de trabajadores, salvo con
+límites de tiempo (--time-limit o un timelimit de Gurobi que se agota), que dependen del reloj.
+"""
+
+import multiprocessing as mp
+from collections import Counter
+import signal
+import traceback
+import queue
+
+import evaluators
+
+
+def _worker_loop(worker_id, spec, task_queue, result_queue):
+    """Bucle del proceso trabajador: carga la instancia una vez y atiende comandos hasta 'stop'."""
+    # Ctrl-C lo maneja el maestro, que luego ordena un cierre limpio de cada trabajador
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    evaluator = None
+    try:
+        evaluator = evaluators.create_evaluator(**spec)
+        result_queue.put(('ready', worker_id, (
+            evaluator.get_n_locations(),
+            evaluator.get_total_demand(),
+            evaluator.get_capacity_list(),
+            hasattr(evaluator, 'solve_swap_delta'),
+        )))
+
+        while True:
+            command, batch_id, payload = task_queue.get()
+            if command == 'stop':
+                break
+            elif command == 'solve':
+                result = [evaluator.solve_assignment_persistent(open_set) for open_set in payload]
+            elif command == 'delta':
+                result = [evaluator.solve_swap_delta(move, cutoff)[0] for move, cutoff in payload]
+            elif command == 'set_parent':
+                result = evaluator.set_parent(payload)
+            elif command == 'options':
+                result = evaluator.set_solver_options(payload)
+            elif command == 'final':
+                result = evaluator.get_final_solution(*payload)
+            elif command == 'stats':
+                result = getattr(evaluator, 'stats', None)
+            else:
+                raise ValueError(f"Comando desconocido: {command}")
+            result_queue.put(('ok', worker_id, (batch_id, result)))
+
+    except Exception:
+        result_queue.put(('error', worker_id, traceback.format_exc()))
+    finally:
+        if evaluator is not None:
+            try:
+                evaluator.close()
+            except Exception:
+                pass
+
+
+class ParallelEvaluator:
+    def __init__(self, spec, n_workers, batch_size=None):
+        """
+        Levanta 'n_workers' procesos, cada uno con un evaluador creado a partir de 'spec'
+        (argumentos de evaluators.create_evaluator). Expone la misma interfaz que AMPLWrapper
+        más solve_many / solve_swap_delta_many para evaluar un vecindario completo.
+        """
+        self.n_workers = n_workers
+        self.batch_size = batch_size
+        self.last_stats = None
+        # 'spawn' es portable (Windows) y evita heredar sesiones AMPL abiertas del maestro
+        ctx = mp.get_context('spawn')
+        self.result_queue = ctx.Queue()
+        self.task_queues = [ctx.Queue() for _ in range(n_workers)]
+        self.processes = []
+        self.closed = False
+
+        print(f"[Parallel] Iniciando {n_workers} trabajadores...")
+        try:
+            for w in range(n_workers):
+                p = ctx.Process(target=_worker_loop, args=(w, spec, self.task_queues[w], self.result_queue),
+                                daemon=True)
+                p.start()
+                self.processes.append(p)
+
+            # Esperamos a que todos carguen la instancia; tomamos los metadatos del primero
+            info = None
+            for _ in range(n_workers):
+                _, _, info = self._receive()
+        except BaseException:
+            self.close()
+            raise
+
+        self.n_locations, self.total_demand, self.capacity_list, self.supports_delta = info
+        print(f"[Parallel] {n_workers} trabajadores listos.")
+
+    def _receive(self):
+        """Recibe un mensaje de algún trabajador; si uno falló o murió, lanza excepción."""
+        while True:
+            try:
+                status, worker_id, payload = self.result_queue.get(timeout=1.0)
+            except queue.Empty:
+                dead = [w for w, p in enumerate(self.processes) if not p.is_alive()]
+                if dead:
+                    raise RuntimeError(f"[Parallel] Trabajador(es) {dead} terminaron inesperadamente.")
+                continue
+            if status == 'error':
+                raise RuntimeError(f"[Parallel] Error en trabajador {worker_id}:\n{payload}")
+            return status, worker_id, payload
+
+    def _map(self, command, items):
+        """
+        Reparte 'items' en lotes entre los trabajadores (cada uno toma un lote nuevo al terminar
+        el anterior) y devuelve los resultados en el orden original.
+        """
+        if not items:
+            return []
+        size = self.batch_size or max(1, -(-len(items) // (self.n_workers * 4)))
+        batches = [items[k:k + size] for k in range(0, len(items), size)]
+        results = [None] * len(batches)
+
+        try:
+            next_batch = 0
+            pending = 0
+            for w in range(min(self.n_workers, len(batches))):
+                self.task_queues[w].put((command, next_batch, batches[next_batch]))
+                next_batch += 1
+                pending += 1
+
+            while pending:
+                _, worker_id, (batch_id, result) = self._receive()
+                results[batch_id] = result
+                pending -= 1
+                if next_batch < len(batches):
+                    self.task_queues[worker_id].put((command, next_batch, batches[next_batch]))
+                    next_batch += 1
+                    pending += 1
+        except BaseException:
+            # Error o Ctrl-C a mitad de lote: no se puede reutilizar el pool en estado inconsistente
+            self.close()
+            raise
+
+        return [r for batch in results for r in batch]
+
+    def _gather(self, command, payload):
+        """Envía el mismo comando a todos los trabajadores y devuelve sus respuestas (orden por trabajador)."""
+        try:
+            for q in self.task_queues:
+                q.put((command, 0, payload))
+            answers = {}
+            for _ in range(self.n_workers):
+                _, worker_id, (_, result) = self._receive()
+                answers[worker_id] = result
+        except BaseException:
+            self.close()
+            raise
+        return [answers[w] for w in range(self.n_workers)]
+
+    def _broadcast(self, command, payload):
+        """Envía el mismo comando a todos los trabajadores y devuelve la respuesta del trabajador 0."""
+        return self._gather(command, payload)[0]
+
+    @property
+    def stats(self):
+        """
+        Suma de las estadísticas ('stats', ver instrumentation.new_solver_stats) de todos los trabajadores;
+        None si sus evaluadores no las exponen. Cerrado el pool, retorna la última suma obtenida.
+        """
+        if self.closed:
+            return self.last_stats
+        per_worker = [s for s in self._gather('stats', None) if isinstance(s, dict)]
+        if not per_worker:
+            return None
+        total = {}
+        for worker_stats in per_worker:
+            for key, value in worker_stats.items():
+                if isinstance(value, Counter):
+                    total[key] = total.get(key, Counter()) + value
+                else:
+                    total[key] = total.get(key, 0) + value
+        self.last_stats = total
+        return total
+
+    def get_n_locations(self):
+        return self.n_locations
+
+    def get_total_demand(self):
+        return self.total_demand
+
+    def get_capacity_list(self):
+        return self.capacity_list
+
+    def set_solver_options(self, options):
+        self._broadcast('options', options)
+
+    def solve_many(self, open_sets):
+        return self._map('solve', [list(s) for s in open_sets])
+
+    def solve_assignment_persistent(self, open_facilities_indices):
+        return self.solve_many([open_facilities_indices])[0]
+
+    def set_parent(self, open_facilities_indices):
+        # Cada trabajador necesita el estado del padre para evaluar deltas de forma independiente
+        return self._broadcast('set_parent', list(open_facilities_indices))
+
+    def solve_swap_delta_many(self, moves, cutoff=float('inf')):
+        return self._map('delta', [(move, cutoff) for move in moves])
+
+    def get_final_solution(self, open_facilities_indices, mode):
+        try:
+            self.task_queues[0].put(('final', 0, (list(open_facilities_indices), mode)))
+            _, _, (_, result) = self._receive()
+        except BaseException:
+            self.close()
+            raise
+        return result
+
+    def close(self):
+        """Detiene todos los trabajadores (cada uno cierra su sesión de solver) y libera las colas."""
+        if self.closed:
+            return
+        self.closed = True
+        for q, p in zip(self.task_queues, self.processes):
+            if p.is_alive():
+                try:
+                    q.put(('stop', 0, None))
+                except Exception:
+                    pass
+        for p in self.processes:
+            p.join(timeout=10)
+            if p.is_alive():
+                print(f"[Parallel] Forzando término del trabajador PID {p.pid}")
+                p.terminate()
+                p.join()
+        print("[Parallel] Trabajadores detenidos.")
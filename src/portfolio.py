@@ -0,0 +1,192 @@
+"""
+Portafolio multi-arranque de la Búsqueda Tabú.
+Lanza varias búsquedas independientes en procesos separados, cada una con su propia semilla
+(y por lo tanto su propia solución inicial) y su propio tenure. Las búsquedas comparten el mejor
+costo global en memoria compartida (multiprocessing.Value): la aspiración y la poda de cada una
+usan la cota más ajustada que haya encontrado cualquiera.
+
+Al final el maestro consolida los resultados: mejor configuración e historial conjunto.
+"""
+
+import csv
+import multiprocessing as mp
+import os
+import queue
+import random
+import signal
+import traceback
+
+import cost_cache
+import evaluators
+import heuristic
+import instance
+import instrumentation
+import move_bounds
+
+# Factores de tenure para diversificar las búsquedas (se recorren en ciclo)
+TENURE_FACTORS = (1.0, 0.5, 1.5, 0.75, 1.25)
+
+
+def _scaled(tenure, factor):
+    return None if tenure is None else max(1, round(tenure * factor))
+
+
+def build_configs(n_searches, seed, tenure, sample, tenure_open=None, tenure_close=None):
+    """
+    Una configuración por búsqueda: semillas consecutivas y tenure escalado por TENURE_FACTORS.
+    tenure_open / tenure_close (si se indican) se escalan con el mismo factor que el tenure.
+    """
+    base_seed = seed if seed is not None else random.randrange(2**31)
+    configs = []
+    for k in range(n_searches):
+        factor = TENURE_FACTORS[k % len(TENURE_FACTORS)]
+        configs.append({'id': k, 'seed': base_seed + k, 'tenure': _scaled(tenure, factor), 'sample': sample,
+                        'tenure_open': _scaled(tenure_open, factor), 'tenure_close': _scaled(tenure_close, factor)})
+    return configs
+
+
+def _tenure_label(config):
+    if config['tenure_open'] is None and config['tenure_close'] is None:
+        return str(config['tenure'])
+    # Como en run_tabu_search: el que no se indica toma el tenure de la búsqueda
+    return (f"abrir {config['tenure_open'] or config['tenure']}, "
+            f"cerrar {config['tenure_close'] or config['tenure']}")
+
+
+def search_path(path, search_id):
+    """Archivo propio de una búsqueda (traza, caché): se agrega el id antes de la extensión."""
+    if path is None:
+        return None
+    base, ext = os.path.splitext(path)
+    return f"{base}_s{search_id}{ext}"
+
+
+def _search_worker(config, spec, run_kwargs, cache_options, shared_best, result_queue):
+    """
+    Proceso de una búsqueda: crea su evaluador, corre la Búsqueda Tabú y devuelve el resultado
+    junto con las evaluaciones del sub-problema que hizo su evaluador.
+    """
+    # Ctrl-C lo maneja el maestro, que termina los procesos
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    random.seed(config['seed'])
+
+    evaluator = None
+    try:
+        evaluator = evaluators.create_evaluator(**spec)
+        if cache_options['size'] > 0:
+            cache = cost_cache.CostCache(evaluator.get_n_locations(), cache_options['size'],
+                                         signature=cache_options['signature'],
+                                         path=search_path(cache_options['path'], config['id']))
+            evaluator = cost_cache.CachedEvaluator(evaluator, cache, cache_delta=(spec['delta'] != "bound"))
+        bounds = None
+        if run_kwargs['prune'] or run_kwargs['neighborhood'] == "scored":
+            bounds = move_bounds.SwapBounds(instance.load_instance(spec['dat_file']))
+        trace_path = search_path(run_kwargs['trace_path'], config['id'])
+        recorder = instrumentation.TraceRecorder(evaluator) if trace_path else None
+
+        cost, best_set, iterations, history = heuristic.run_tabu_search(
+            evaluator, spec['dat_file'], spec['mod_file'], evaluator.get_n_locations(),
+            run_kwargs['max_iterations'], config['tenure'], config['sample'],
+            delta_eval=(spec['delta'] != "off"), move_bounds=bounds,
+            prune=run_kwargs['prune'], neighborhood=run_kwargs['neighborhood'], recorder=recorder,
+            time_limit=run_kwargs['time_limit'], shared_best=shared_best,
+            tenure_open=config['tenure_open'], tenure_close=config['tenure_close'])
+        if recorder is not None:
+            recorder.export(trace_path)
+        stats = getattr(evaluator, 'stats', None)
+        evaluations = stats['solves'] if isinstance(stats, dict) else None
+        result_queue.put(('ok', config['id'], (cost, best_set, iterations, history, evaluations)))
+    except Exception:
+        result_queue.put(('error', config['id'], traceback.format_exc()))
+    finally:
+        if evaluator is not None:
+            try:
+                evaluator.close()
+            except Exception:
+                pass
+
+
+def run_portfolio(spec, configs, max_iterations, prune=False, neighborhood="sampled", time_limit=None,
+                  cache_size=0, cache_signature=None, cache_file=None, trace_path=None):
+    """
+    Corre una búsqueda por configuración (ver build_configs) en procesos separados.
+    - spec: argumentos de evaluators.create_evaluator (cada proceso crea su propio evaluador).
+    - cache_file / trace_path: cada búsqueda usa su propio archivo (sufijo _s<id>, ver search_path).
+    Retorna (mejor_costo, mejor_conjunto, iteraciones_de_la_mejor, historial_consolidado, resultados,
+    evaluaciones) con resultados = {id: (costo, conjunto, iteraciones, historial, evaluaciones)} de las
+    búsquedas que terminaron bien y evaluaciones = total del sub-problema sumado sobre todas ellas.
+    """
+    # 'spawn' es portable (Windows) y evita heredar sesiones AMPL abiertas del maestro
+    ctx = mp.get_context('spawn')
+    shared_best = ctx.Value('d', float('inf'))
+    result_queue = ctx.Queue()
+    run_kwargs = dict(max_iterations=max_iterations, prune=prune, neighborhood=neighborhood, time_limit=time_limit,
+                      trace_path=trace_path)
+    cache_options = dict(size=cache_size, signature=cache_signature, path=cache_file)
+
+    print(f"[Portfolio] Lanzando {len(configs)} búsquedas: "
+          + ", ".join(f"#{c['id']} (semilla {c['seed']}, tenure {_tenure_label(c)})" for c in configs))
+    processes = []
+    results = {}
+    try:
+        for config in configs:
+            p = ctx.Process(target=_search_worker,
+                            args=(config, spec, run_kwargs, cache_options, shared_best, result_queue), daemon=True)
+            p.start()
+            processes.append(p)
+
+        pending = len(configs)
+        while pending:
+            try:
+                status, search_id, payload = result_queue.get(timeout=1.0)
+            except queue.Empty:
+                if not any(p.is_alive() for p in processes):
+                    print("[Portfolio] Todas las búsquedas terminaron; faltan resultados.")
+                    break
+                continue
+            pending -= 1
+            if status == 'error':
+                print(f"[Portfolio] Error en la búsqueda #{search_id}:\n{payload}")
+                continue
+            results[search_id] = payload
+            print(f"[Portfolio] Búsqueda #{search_id} terminada. Costo: {payload[0]:,.2f} | "
+                  f"Global: {shared_best.value:,.2f}")
+    finally:
+        for p in processes:
+            p.join(timeout=5.0)
+            if p.is_alive():
+                p.terminate()
+
+    counts = [r[4] for r in results.values() if r[4] is not None]
+    evaluations = sum(counts) if counts else None
+    if not results:
+        return float('inf'), [], 0, [], results, evaluations
+
+    winner = min(results, key=lambda k: results[k][0])
+    best_cost, best_set, iterations = results[winner][:3]
+    print(f"[Portfolio] Mejor búsqueda: #{winner} | Costo: {best_cost:,.2f} | Evaluaciones totales: {evaluations}")
+    return best_cost, best_set, iterations, consolidate_histories(results), results, evaluations
+
+
+def consolidate_histories(results):
+    """Historial conjunto: en cada iteración, el mejor costo alcanzado por cualquiera de las búsquedas."""
+    histories = [r[3] for r in results.values() if r[3]]
+    length = max((len(h) for h in histories), default=0)
+    # Una búsqueda que terminó antes (límite de tiempo) conserva su último valor
+    return [min(h[min(k, len(h) - 1)] for h in histories) for k in range(length)]
+
+
+def save_histories(path, results, consolidated):
+    """CSV con una columna por búsqueda más la consolidada (mejor costo por iteración)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    ids = sorted(results)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Iteracion', 'Consolidado'] + [f"Busqueda_{k}" for k in ids])
+        for it, best in enumerate(consolidated):
+            row = [it, best]
+            for k in ids:
+                h = results[k][3]
+                row.append(h[it] if it < len(h) else "")
+            writer.writerow(row)
+    print(f"[Portfolio] Historial guardado en {path}")
@@ -0,0 +1,105 @@
+"""
+Registro de resultados de las corridas en SQLite (sólo se agregan filas).
+Reemplaza la lectura-modificación-escritura completa de report.xlsx en cada corrida:
+- record_run: inserta una fila por corrida (óptimo, cota o heurística) con sus métricas y parámetros.
+  SQLite serializa las escrituras, por lo que varias corridas simultáneas no se pisan.
+- export_excel: genera report.xlsx bajo demanda (acción 'report') a partir del registro.
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    instance TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    action TEXT NOT NULL,
+    seed INTEGER,
+    params TEXT,
+    optimal_cost REAL,
+    lower_bound REAL,
+    heuristic_cost REAL,
+    iterations INTEGER,
+    evaluations INTEGER,
+    time_s REAL
+)
+"""
+
+# Columnas del reporte Excel (hoja resumen), en el mismo formato que el reporte original
+REPORT_COLUMNS = {'instance': 'Instancia', 'mode': 'Modo', 'optimal_cost': 'Costo_Optimo',
+                  'lower_bound': 'Cota_Inferior', 'heuristic_cost': 'Costo_Heuristica',
+                  'iterations': 'Iteraciones_Heuristica'}
+
+
+def _connect(db_path):
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    # timeout: si otra corrida está escribiendo, se espera el bloqueo en vez de fallar
+    conn = sqlite3.connect(db_path, timeout=30.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(SCHEMA)
+    return conn
+
+
+def _clean(value):
+    # inf / None no son valores útiles en el reporte: se guardan como NULL
+    if value is None or value == float('inf'):
+        return None
+    return value
+
+
+def record_run(db_path, instance, mode, action, seed=None, params=None, optimal_cost=None, lower_bound=None,
+               heuristic_cost=None, iterations=None, evaluations=None, time_s=None):
+    """Agrega una fila al registro. Nunca modifica filas anteriores."""
+    row = (datetime.now().isoformat(timespec='seconds'), instance, mode, action, seed,
+           json.dumps(params, sort_keys=True) if params is not None else None,
+           _clean(optimal_cost), _clean(lower_bound), _clean(heuristic_cost), iterations, evaluations, time_s)
+    try:
+        conn = _connect(db_path)
+        try:
+            with conn:
+                conn.execute("INSERT INTO runs (timestamp, instance, mode, action, seed, params, optimal_cost, "
+                             "lower_bound, heuristic_cost, iterations, evaluations, time_s) "
+                             "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+        finally:
+            conn.close()
+        print(f"[Results] Corrida registrada en {db_path}")
+    except sqlite3.Error as e:
+        print(f"[Results] Error registrando la corrida: {e}")
+
+
+def load_runs(db_path):
+    conn = _connect(db_path)
+    try:
+        return pd.read_sql_query("SELECT * FROM runs ORDER BY id", conn)
+    finally:
+        conn.close()
+
+
+def export_excel(db_path, report_path):
+    """
+    Genera el reporte Excel desde el registro:
+    - 'Resultados': una fila por Instancia/Modo con el último valor registrado de cada métrica.
+    - 'Corridas': todas las corridas con sus parámetros, tiempos y evaluaciones.
+    """
+    if not os.path.exists(db_path):
+        print(f"[Results] No existe el registro {db_path}. Nada que exportar.")
+        return
+    runs = load_runs(db_path)
+    # GroupBy.last ignora los NULL: cada métrica toma el último valor que alguna corrida registró
+    summary = (runs.groupby(['instance', 'mode'], sort=False)[['optimal_cost', 'lower_bound', 'heuristic_cost', 'iterations']]
+               .last().reset_index())
+    summary = summary[list(REPORT_COLUMNS)].rename(columns=REPORT_COLUMNS)
+    try:
+        with pd.ExcelWriter(report_path) as writer:
+            summary.to_excel(writer, index=False, sheet_name="Resultados")
+            runs.to_excel(writer, index=False, sheet_name="Corridas")
+        print(f"[Results] Reporte exportado en {report_path} ({len(summary)} filas, {len(runs)} corridas)")
+    except Exception as e:
+        # Error común: El archivo Excel está abierto por el usuario y Windows bloquea la escritura
+        print(f"[Results] ERROR: No se pudo guardar el Excel. ¿Está abierto? Error: {e}")
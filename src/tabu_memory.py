@@ -0,0 +1,48 @@
+"""
+Memoria de corto plazo de la Búsqueda Tabú basada en atributos.
+En lugar de buscar los centros en una lista (deque) de los últimos movimientos, se guarda por
+centro la iteración hasta la que su atributo es tabú:
+- opened_until[j]: j se abrió hace poco -> cerrarlo es tabú hasta esa iteración (inclusive).
+- closed_until[j]: j se cerró hace poco -> reabrirlo es tabú hasta esa iteración (inclusive).
+Un movimiento aplicado en la iteración i queda prohibido de deshacerse durante las 'tenure' siguientes.
+Cada consulta es O(1) sin importar el tenure, y un lote completo de movimientos se filtra con NumPy.
+"""
+
+import numpy as np
+
+
+class TabuMemory:
+    def __init__(self, n_locations, tenure_open, tenure_close=None):
+        """
+        - tenure_open: iteraciones que un centro recién abierto no puede cerrarse.
+        - tenure_close: iteraciones que un centro recién cerrado no puede reabrirse (por defecto tenure_open).
+        Índices 1-based (la posición 0 no se usa).
+        """
+        self.tenure_open = int(tenure_open)
+        self.tenure_close = int(tenure_open if tenure_close is None else tenure_close)
+        self.opened_until = np.full(n_locations + 1, -1, dtype=np.int64)
+        self.closed_until = np.full(n_locations + 1, -1, dtype=np.int64)
+
+    def record(self, move, iteration):
+        """Registra el SWAP (j_cerrar, j_abrir) aplicado en 'iteration'."""
+        self.closed_until[move[0]] = iteration + self.tenure_close
+        self.opened_until[move[1]] = iteration + self.tenure_open
+
+    def is_tabu(self, move, iteration):
+        # Tabú si cierra un centro recién abierto o reabre uno recién cerrado
+        return self.opened_until[move[0]] >= iteration or self.closed_until[move[1]] >= iteration
+
+    def tabu_mask(self, close, open_, iteration):
+        """
+        Versión vectorizada: close / open_ son arreglos de índices 1-based (se combinan por broadcasting,
+        p. ej. close[:, None] y open_[None, :] para una matriz de movimientos).
+        """
+        return (self.opened_until[close] >= iteration) | (self.closed_until[open_] >= iteration)
+
+    def state(self):
+        """Estado serializable (checkpoints)."""
+        return {'opened_until': self.opened_until.copy(), 'closed_until': self.closed_until.copy()}
+
+    def restore(self, state):
+        self.opened_until[:] = state['opened_until']
+        self.closed_until[:] = state['closed_until']
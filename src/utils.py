@@ -1,18 +1,88 @@
 import os
-import pandas as pd
+import numpy as np
 
-def save_solution_to_file(sol_dir, instance_name, mode, cost, open_facilities, assignments):
+# Pares cliente-centro hasta los que el .txt de la solución lista cada asignación (como antes del .npz).
+# Sobre ese tamaño el .txt sólo resume y la asignación completa queda en el .npz.
+TXT_ASSIGNMENT_LIMIT = 100_000
+
+
+class Assignment:
+    """
+    Asignación cliente -> centro en formato compacto (tripletas dispersas, índices 1-based):
+    sólo las entradas no nulas, como arreglos NumPy en vez de una lista de tuplas.
+    - SS: values = 1 para cada par (cliente, centro).
+    - MS: values = fracción de la demanda del cliente atendida por el centro.
+    """
+    def __init__(self, clients, facilities, values=None, n_clients=None):
+        self.clients = np.asarray(clients, dtype=np.int32)
+        self.facilities = np.asarray(facilities, dtype=np.int32)
+        self.values = np.ones(len(self.clients)) if values is None else np.asarray(values, dtype=np.float64)
+        self.n_clients = int(n_clients) if n_clients is not None else int(self.clients.max(initial=0))
+
+    @classmethod
+    def from_rows(cls, rows, mode, n_clients=None, threshold=None):
+        """
+        Construye la asignación desde filas (cliente, centro, valor) leídas del solver en bloque.
+        Se descartan los valores bajo el umbral (0.9 en SS, variables binarias; 1e-5 en MS).
+        """
+        if threshold is None:
+            threshold = 0.9 if mode == "SS" else 1e-5
+        data = np.asarray(rows, dtype=np.float64).reshape(-1, 3)
+        data = data[data[:, 2] > threshold]
+        values = None if mode == "SS" else data[:, 2]
+        return cls(data[:, 0], data[:, 1], values, n_clients)
+
+    def __len__(self):
+        return len(self.clients)
+
+    def is_single_source(self):
+        """Cada cliente aparece exactamente una vez (representable como un arreglo por cliente)."""
+        if len(self) != self.n_clients:
+            return False
+        return bool(np.all(np.bincount(self.clients, minlength=self.n_clients + 1)[1:] == 1))
+
+    def per_client(self):
+        """Arreglo de largo n_clients con el centro de cada cliente (0 = sin asignar). Sólo para single source."""
+        facility_of = np.zeros(self.n_clients, dtype=np.int32)
+        facility_of[self.clients - 1] = self.facilities
+        return facility_of
+
+
+def solution_paths(sol_dir, instance_name, mode):
+    """Resumen legible (.txt) y datos de la asignación (.npz) de una solución."""
+    base = os.path.join(sol_dir, f"sol_{instance_name}_{mode}")
+    return base + ".txt", base + ".npz"
+
+
+def save_solution_to_file(sol_dir, instance_name, mode, cost, open_facilities, assignment):
     """
-    Guarda la mejor solución encontrada en un archivo de texto.
-    Genera un reporte con el costo, centros abiertos y detalles de asignación.
+    Guarda la mejor solución encontrada.
+    - sol_<instancia>_<modo>.txt: costo, centros abiertos y la asignación (legible): una línea
+      'Cliente i -> Centro j' por par, o sólo un resumen si hay más de TXT_ASSIGNMENT_LIMIT pares.
+    - sol_<instancia>_<modo>.npz: la asignación completa en formato compacto: un arreglo con el centro
+      de cada cliente si cada cliente tiene un único centro, o tripletas (cliente, centro, fracción) si no.
+    'assignment' es un objeto Assignment (ver get_final_solution de los evaluadores).
     """
-    # Construye la ruta completa del archivo de salida usando el directorio, nombre de instancia y modo (SS/MS)
-    filename = os.path.join(sol_dir, f"sol_{instance_name}_{mode}.txt")
-    print(f"[Utils] Guardando solución en: {filename}")
+    txt_path, npz_path = solution_paths(sol_dir, instance_name, mode)
+    print(f"[Utils] Guardando solución en: {txt_path}")
+    if assignment is None:
+        assignment = Assignment([], [], [], n_clients=0)
+    open_facilities = np.asarray(sorted(open_facilities), dtype=np.int32)
 
     try:
-        # Abre el archivo en modo escritura
-        with open(filename, 'w') as f:
+        data = {'instance': np.array(instance_name), 'mode': np.array(mode), 'cost': np.array(cost),
+                'open_facilities': open_facilities, 'n_clients': np.array(assignment.n_clients)}
+        if mode == "SS" and assignment.is_single_source():
+            layout = "por cliente"
+            data['facility_of'] = assignment.per_client()
+        else:
+            layout = "tripletas"
+            data.update(clients=assignment.clients, facilities=assignment.facilities, values=assignment.values)
+        tmp_path = npz_path + ".tmp.npz"
+        np.savez_compressed(tmp_path, **data)
+        os.replace(tmp_path, npz_path)
+
+        with open(txt_path, 'w') as f:
             # Escribe los metadatos generales de la solución
             f.write(f"Instancia: {instance_name}\n")
             f.write(f"Modo: {mode}\n")
@@ -20,99 +90,37 @@ def save_solution_to_file(sol_dir, instance_name, mode, cost, open_facilities, a
 
             # Escribe la lista de instalaciones/centros que se decidieron abrir
             f.write("Centros_Abiertos (x):\n")
-            f.write(str(open_facilities))
+            f.write(str(open_facilities.tolist()))
             f.write("\n\n")
             f.write("Asignaciones (y):\n")
-            
-            # Lógica para detectar el formato de asignación según el problema (Single Source vs Multi Source)
-            # Caso 1: Single Source (SS). Las tuplas son de tamaño 2: (cliente, centro)
-            if all(isinstance(a, tuple) and len(a) == 2 for a in assignments):
-                # Itera sobre cada asignación y la escribe en formato legible
-                for cli, loc in assignments:
-                    f.write(f"Cliente {cli} -> Centro {loc}\n")
-            
-            # Caso 2: Multi Source (MS). Las tuplas son de tamaño 3: (cliente, centro, fracción/cantidad)
-            elif all(isinstance(a, tuple) and len(a) == 3 for a in assignments):
-                # Itera incluyendo el valor de flujo o fracción asignada
-                for cli, loc, val in assignments:
-                    f.write(f"Cliente {cli} -> Centro {loc} (Valor: {val})\n")
-            
-            # Caso por defecto: Si el formato no coincide con los anteriores, escribe la estructura tal cual
+            if len(assignment) <= TXT_ASSIGNMENT_LIMIT:
+                pairs = zip(assignment.clients.tolist(), assignment.facilities.tolist(), assignment.values.tolist())
+                if mode == "SS":
+                    f.writelines(f"Cliente {cli} -> Centro {loc}\n" for cli, loc, _ in pairs)
+                else:
+                    f.writelines(f"Cliente {cli} -> Centro {loc} (Valor: {val})\n" for cli, loc, val in pairs)
             else:
-                f.write(str(assignments))
+                f.write(f"{len(assignment)} pares cliente-centro ({layout}) en {os.path.basename(npz_path)}\n")
+                f.write("Leer con utils.load_solution()\n")
 
     except Exception as e:
         # Captura cualquier error de I/O (ej. permisos, ruta inválida) para no detener la ejecución
         print(f"[utils] Error guardando solución: {e}")
 
-def update_report_excel(report_path, instance_name, mode, optimal_cost=None, heuristic_cost=None, iterations=None):
+
+def load_solution(path):
     """
-    Gestiona un archivo Excel para llevar el registro de resultados.
-    Si el archivo no existe, lo crea. Si la instancia ya existe, actualiza sus datos; si no, agrega una fila nueva.
+    Lee una solución guardada por save_solution_to_file (acepta la ruta del .npz o del .txt).
+    Retorna un diccionario con instance, mode, cost, open_facilities (arreglo 1-based) y assignment (Assignment).
     """
-    print(f"[Utils] Actualizando reporte: {report_path}")
-    
-    # Definición de las columnas estándar que tendrá el reporte Excel
-    cols = ['Instancia', 'Modo', 'Costo_Optimo', 'Costo_Heuristica', 'Iteraciones_Heuristica']
-    
-    # 1. Carga del archivo existente o creación de uno nuevo
-    if os.path.exists(report_path):
-        try:
-            # Intenta leer el Excel existente usando openpyxl como motor
-            df = pd.read_excel(report_path, engine='openpyxl')
-        except Exception as e:
-            # Si el archivo está corrupto o no se puede leer, inicia un DataFrame vacío
-            print(f"[Utils] Error leyendo Excel. Creando uno nuevo. Error: {e}")
-            df = pd.DataFrame(columns=cols)
-    else:
-        # Si el archivo no existe en disco, crea un DataFrame vacío con las columnas definidas
-        df = pd.DataFrame(columns=cols)
-        
-    # 2. Búsqueda de la fila correspondiente a la Instancia y Modo actuales
-    # Crea una máscara booleana para filtrar por nombre de instancia y modo de ejecución
-    mask = (df['Instancia'] == instance_name) & (df['Modo'] == mode)
-    # Obtiene los índices de las filas que coinciden (debería ser 0 o 1 fila)
-    idx_list = df.index[mask].tolist()
-    
-    if not idx_list:
-        # 3a. Si la combinación Instancia/Modo no existe en el Excel
-        # Se prepara un diccionario con todos los datos disponibles
-        new_row_data = {
-            'Instancia': instance_name,
-            'Modo': mode,
-            'Costo_Optimo': optimal_cost,
-            'Costo_Heuristica': heuristic_cost,
-            'Iteraciones_Heuristica': iterations
-        }
-        # Se convierte el diccionario a DataFrame y se concatena al final del DataFrame principal
-        new_row_df = pd.DataFrame([new_row_data])
-        df = pd.concat([df, new_row_df], ignore_index=True)
-        print("[Utils] Fila nueva creada en el reporte.")
-        
-    else:
-        # 3b. Si la fila ya existe, procedemos a actualizarla
-        row_index = idx_list[0] # Tomamos el índice de la fila encontrada
-        
-        # Actualiza selectivamente solo los parámetros que no sean None.
-        # Esto permite llamar a la función varias veces para actualizar diferentes métricas sin borrar las anteriores.
-        
-        if optimal_cost is not None:
-            df.loc[row_index, 'Costo_Optimo'] = optimal_cost
-            print(f"[Utils] Actualizado 'Costo_Optimo' a: {optimal_cost}")
-            
-        if heuristic_cost is not None:
-            df.loc[row_index, 'Costo_Heuristica'] = heuristic_cost
-            print(f"[Utils] Actualizado 'Costo_Heuristica' a: {heuristic_cost}")
-
-        if iterations is not None:
-            df.loc[row_index, 'Iteraciones_Heuristica'] = iterations
-            print(f"[Utils] Actualizado 'Iteraciones_Heuristica' a: {iterations}")
-
-    # 4. Guardado final del archivo Excel
-    try:
-        # Sobreescribe el archivo Excel con el DataFrame actualizado, sin incluir el índice numérico
-        df.to_excel(report_path, index=False, sheet_name="Resultados")
-        print("[Utils] Reporte guardado con éxito.")
-    except Exception as e:
-        # Error común: El archivo Excel está abierto por el usuario y Windows bloquea la escritura
-        print(f"[Utils] ERROR: No se pudo guardar el Excel. ¿Está abierto? Error: {e}")
\ No newline at end of file
+    npz_path = os.path.splitext(path)[0] + ".npz"
+    with np.load(npz_path) as data:
+        n_clients = int(data['n_clients'])
+        if 'facility_of' in data:
+            facility_of = data['facility_of']
+            clients = np.nonzero(facility_of)[0] + 1
+            assignment = Assignment(clients, facility_of[clients - 1], None, n_clients)
+        else:
+            assignment = Assignment(data['clients'], data['facilities'], data['values'], n_clients)
+        return {'instance': str(data['instance']), 'mode': str(data['mode']), 'cost': float(data['cost']),
+                'open_facilities': data['open_facilities'], 'assignment': assignment}
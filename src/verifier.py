@@ -0,0 +1,94 @@
+"""
+Verificación independiente de una solución guardada contra la instancia.
+No confía en el objetivo reportado por el solver: recalcula con NumPy, a partir de la asignación
+(utils.Assignment), el costo fijo, el costo de asignación, la suma asignada de cada cliente y el
+uso de capacidad de cada centro. Sólo toca las entradas no nulas de la asignación (TC se consulta
+por índice), por lo que en 5000x5000 toma milisegundos incluso con la instancia en memmap.
+"""
+
+import numpy as np
+
+import instance as instance_io
+import utils
+
+
+def verify_solution(inst, open_facilities, assignment, mode, reported_cost=None, tol=1e-6):
+    """
+    Retorna un diccionario con los costos recalculados y las violaciones encontradas
+    ('ok' es True si no hay ninguna). Índices 1-based, como en los archivos de solución.
+    """
+    n_clients, n_locations = inst.n_clients, inst.n_locations
+    open_idx = np.asarray(open_facilities, dtype=np.int64) - 1
+    is_open = np.zeros(n_locations, dtype=bool)
+    is_open[open_idx] = True
+
+    clients = assignment.clients.astype(np.int64) - 1
+    facilities = assignment.facilities.astype(np.int64) - 1
+    values = assignment.values
+    dem = np.asarray(inst.dem, dtype=np.float64)
+    ICap = np.asarray(inst.ICap, dtype=np.float64)
+
+    fixed_cost = float(np.asarray(inst.FC, dtype=np.float64)[open_idx].sum())
+    assignment_cost = float((inst.TC[clients, facilities] * values).sum())
+    total_cost = fixed_cost + assignment_cost
+
+    # Cada cliente debe quedar asignado por completo (suma = 1); en SS, además, a un único centro
+    allocated = np.bincount(clients, weights=values, minlength=n_clients)
+    allocation_error = np.abs(allocated - 1.0)
+    bad_clients = np.nonzero(allocation_error > tol)[0]
+    if mode == "SS":
+        multi = np.nonzero(np.bincount(clients, minlength=n_clients) > 1)[0]
+        fractional = int(np.count_nonzero(np.abs(values - 1.0) > tol))
+    else:
+        multi = np.array([], dtype=np.int64)
+        fractional = 0
+
+    # Capacidad: demanda atendida por centro <= ICap, y nada atendido por centros cerrados
+    usage = np.bincount(facilities, weights=dem[clients] * values, minlength=n_locations)
+    excess = usage - np.where(is_open, ICap, 0.0)
+    over = np.nonzero(is_open & (excess > tol * np.maximum(1.0, ICap)))[0]
+    closed_used = np.nonzero(~is_open & (usage > 0))[0]
+
+    cost_diff = None if reported_cost is None else float(reported_cost) - total_cost
+    cost_ok = cost_diff is None or abs(cost_diff) <= tol * max(1.0, abs(total_cost))
+
+    return {
+        'ok': bool(cost_ok and len(bad_clients) == 0 and len(multi) == 0 and fractional == 0
+                   and len(over) == 0 and len(closed_used) == 0),
+        'fixed_cost': fixed_cost,
+        'assignment_cost': assignment_cost,
+        'total_cost': total_cost,
+        'cost_diff': cost_diff,
+        'unassigned_clients': (bad_clients + 1).tolist(),
+        'max_allocation_error': float(allocation_error.max(initial=0.0)),
+        'multi_source_clients': (multi + 1).tolist(),
+        'fractional_entries': fractional,
+        'over_capacity': (over + 1).tolist(),
+        'max_capacity_excess': float(excess.max(initial=0.0)),
+        'closed_used': (closed_used + 1).tolist(),
+    }
+
+
+def verify_file(dat_file_path, solution_path, tol=1e-6):
+    """Carga la instancia (caché binario si existe) y la solución guardada, y las verifica."""
+    solution = utils.load_solution(solution_path)
+    inst = instance_io.load_instance(dat_file_path)
+    return verify_solution(inst, solution['open_facilities'], solution['assignment'], solution['mode'],
+                           reported_cost=solution['cost'], tol=tol)
+
+
+def print_report(report, max_items=10):
+    status = "OK" if report['ok'] else "FALLA"
+    diff = f" | Diferencia con lo reportado: {report['cost_diff']:,.6f}" if report['cost_diff'] is not None else ""
+    print(f"[Verify] {status} | Costo recalculado: {report['total_cost']:,.2f} "
+          f"(fijo {report['fixed_cost']:,.2f} + asignación {report['assignment_cost']:,.2f}){diff}")
+    checks = [('Clientes sin asignación completa', report['unassigned_clients']),
+              ('Clientes con más de un centro (SS)', report['multi_source_clients']),
+              ('Centros sobre su capacidad', report['over_capacity']),
+              ('Centros cerrados con demanda asignada', report['closed_used'])]
+    for label, items in checks:
+        if items:
+            shown = ", ".join(str(k) for k in items[:max_items]) + (" ..." if len(items) > max_items else "")
+            print(f"[Verify]   {label}: {len(items)} ({shown})")
+    if report['fractional_entries']:
+        print(f"[Verify]   Asignaciones fraccionarias en SS: {report['fractional_entries']}")
@@ -0,0 +1,31 @@
+"""
+Configuración común de las pruebas: los módulos de src/ se importan por nombre (igual que main.py)
+y las instancias se generan pequeñas y con semilla fija en un directorio temporal.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import data_parser
+import generator
+import instance as instance_io
+
+
+def make_instance(tmp_path, name="Synth", n_locations=12, n_clients=40, seed=7, tightness=1.6):
+    """Genera <name>.txt y lo convierte a .dat; retorna (ruta txt, ruta dat)."""
+    txt_path = str(tmp_path / f"{name}.txt")
+    dat_path = str(tmp_path / f"{name}.dat")
+    generator.generate_instance(txt_path, n_locations, n_clients, seed=seed, tightness=tightness)
+    assert data_parser.parse_and_convert(txt_path, dat_path)
+    return txt_path, dat_path
+
+
+@pytest.fixture
+def small_instance(tmp_path):
+    """Instancia 40 clientes x 12 centros con capacidades ajustadas (capacidad total = 1.6 x demanda)."""
+    _, dat_path = make_instance(tmp_path)
+    return instance_io.read_dat_instance(dat_path), dat_path
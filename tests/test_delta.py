@@ -0,0 +1,78 @@
+"""Cotas de la evaluación incremental de SWAP (TransportEvaluator.solve_swap_delta)."""
+
+import numpy as np
+import pytest
+
+import candidates
+import evaluators
+
+
+def _initial_open(inst, slack=1.3):
+    # Centros en orden de índice hasta cubrir 'slack' veces la demanda (1-based)
+    cum = np.cumsum(inst.ICap)
+    k = int(np.searchsorted(cum, slack * inst.total_demand)) + 1
+    return list(range(1, k + 1))
+
+
+def _swaps(evaluator, open_list):
+    closed = [j for j in range(1, evaluator.n_locations + 1) if j not in open_list]
+    return [(a, b) for a in open_list for b in closed]
+
+
+def _exact(evaluator, open_list, move):
+    neighbor = [j for j in open_list if j != move[0]] + [move[1]]
+    return evaluator._solve(np.array(sorted(neighbor)) - 1)[0]
+
+
+@pytest.mark.parametrize("k", [0, 3])
+def test_bounds_enclose_exact_cost(small_instance, k):
+    inst, dat_path = small_instance
+    evaluator = evaluators.TransportEvaluator(inst)
+    if k:
+        evaluator.set_candidates(candidates.build_candidate_lists(inst.TC, k))
+    evaluator.delta_exact_fallback = False
+    open_list = _initial_open(inst)
+    parent_cost = evaluator.set_parent(open_list)
+    assert parent_cost == pytest.approx(evaluator._solve(np.array(open_list) - 1)[0])
+
+    checked = 0
+    for move in _swaps(evaluator, open_list):
+        upper, lower, _ = evaluator.solve_swap_delta(move)
+        exact = _exact(evaluator, open_list, move)
+        if exact == float('inf'):
+            continue
+        tol = 1e-6 * max(1.0, abs(exact))
+        # La cota inferior vale para el LP denso (y por ende para el restringido); la superior usa sólo
+        # arcos permitidos, así que no baja del óptimo del LP que resuelve el respaldo exacto
+        assert lower <= exact + tol
+        assert upper >= exact - tol
+        checked += 1
+    assert checked > 0
+
+
+def test_exact_mode_and_cutoff(small_instance):
+    inst, _ = small_instance
+    evaluator = evaluators.TransportEvaluator(inst)
+    open_list = _initial_open(inst)
+    evaluator.set_parent(open_list)
+
+    for move in _swaps(evaluator, open_list)[:15]:
+        cost, _, exact = evaluator.solve_swap_delta(move)
+        assert exact
+        assert cost == pytest.approx(_exact(evaluator, open_list, move), rel=1e-6)
+
+        # Con un cutoff que la cota inferior alcanza, el vecino se descarta sin resolver
+        # (en modo exacto el segundo valor es el costo; la cota se lee sin respaldo)
+        evaluator.delta_exact_fallback = False
+        _, bound, _ = evaluator.solve_swap_delta(move)
+        evaluator.delta_exact_fallback = True
+        if bound != float('inf'):
+            skipped, _, is_exact = evaluator.solve_swap_delta(move, cutoff=bound)
+            assert skipped == float('inf') and not is_exact
+    assert evaluator.stats['status']['delta_cutoff'] > 0
+
+
+def test_delta_requires_parent(small_instance):
+    evaluator = evaluators.TransportEvaluator(small_instance[0])
+    with pytest.raises(RuntimeError):
+        evaluator.solve_swap_delta((1, 2))
@@ -0,0 +1,76 @@
+"""Formato binario columnar de instance.py y caché binario de load_instance."""
+
+import os
+
+import numpy as np
+import pytest
+
+import instance as instance_io
+
+from conftest import make_instance
+
+
+def _cached_dat(tmp_path):
+    # binary_cache_path espera data/instances_dat/X.dat -> data/instances_bin/X.bin
+    dat_dir = tmp_path / "instances_dat"
+    dat_dir.mkdir()
+    _, dat_path = make_instance(dat_dir)
+    return dat_path, instance_io.binary_cache_path(dat_path)
+
+
+def _is_mapped(arr):
+    # Instance aplica np.asarray: el memmap queda como base de la vista
+    return isinstance(arr, np.memmap) or isinstance(arr.base, np.memmap)
+
+
+def test_roundtrip(small_instance, tmp_path):
+    inst, _ = small_instance
+    bin_path = str(tmp_path / "inst.bin")
+    instance_io.write_binary_instance(inst, bin_path)
+
+    loaded = instance_io.read_binary_instance(bin_path)
+    assert _is_mapped(loaded.TC)
+    assert (loaded.n_clients, loaded.n_locations) == (inst.n_clients, inst.n_locations)
+    for field in ('ICap', 'FC', 'dem', 'TC'):
+        assert np.array_equal(getattr(loaded, field), getattr(inst, field))
+
+    # Arreglos alineados a BIN_ALIGN dentro del archivo
+    _, _, offsets = instance_io.read_binary_header(bin_path)
+    assert all(off % instance_io.BIN_ALIGN == 0 for off in offsets)
+
+
+def test_rejects_bad_magic_and_truncated(small_instance, tmp_path):
+    inst, _ = small_instance
+    bin_path = str(tmp_path / "inst.bin")
+    instance_io.write_binary_instance(inst, bin_path)
+    with open(bin_path, 'rb') as f:
+        raw = f.read()
+
+    bad = str(tmp_path / "bad.bin")
+    with open(bad, 'wb') as f:
+        f.write(b'NOTCFLP!' + raw[8:])
+    with pytest.raises(ValueError):
+        instance_io.read_binary_instance(bad)
+
+    truncated = str(tmp_path / "truncated.bin")
+    with open(truncated, 'wb') as f:
+        f.write(raw[:-8])
+    with pytest.raises(ValueError):
+        instance_io.read_binary_instance(truncated)
+
+
+def test_load_instance_cache(tmp_path):
+    dat_path, bin_path = _cached_dat(tmp_path)
+    assert not os.path.exists(bin_path)
+
+    first = instance_io.load_instance(dat_path)
+    assert os.path.exists(bin_path)
+    assert instance_io.validate_binary_instance(bin_path, dat_path)
+
+    # Caché al día: se mapea el binario; caché más antiguo que el .dat: se regenera
+    assert _is_mapped(instance_io.load_instance(dat_path).TC)
+    old = os.path.getmtime(dat_path) - 10
+    os.utime(bin_path, (old, old))
+    again = instance_io.load_instance(dat_path)
+    assert os.path.getmtime(bin_path) >= os.path.getmtime(dat_path)
+    assert np.array_equal(again.TC, first.TC)
@@ -0,0 +1,64 @@
+"""Conversión .txt -> .dat/.bin en streaming (data_parser.parse_and_convert)."""
+
+import numpy as np
+
+import data_parser
+import generator
+import instance as instance_io
+
+from conftest import make_instance
+
+
+def _read_txt(txt_path):
+    # Lectura de referencia, sin streaming: todos los números del .txt ignorando los separadores '*'
+    with open(txt_path) as f:
+        numbers = np.array([float(t) for t in f.read().split() if t != "*"])
+    n_locations, n_clients = int(numbers[0]), int(numbers[1])
+    rest = numbers[2:]
+    table = rest[:2 * n_locations].reshape(n_locations, 2)
+    dem = rest[2 * n_locations:2 * n_locations + n_clients]
+    TC = rest[2 * n_locations + n_clients:].reshape(n_clients, n_locations)
+    return table[:, 0], table[:, 1], dem, TC
+
+
+def test_dat_matches_txt(tmp_path):
+    txt_path, dat_path = make_instance(tmp_path)
+    inst = instance_io.read_dat_instance(dat_path)
+    ICap, FC, dem, TC = _read_txt(txt_path)
+    assert np.array_equal(inst.ICap, ICap)
+    assert np.array_equal(inst.FC, FC)
+    assert np.array_equal(inst.dem, dem)
+    assert np.array_equal(inst.TC, TC)
+
+
+def test_output_independent_of_chunk_size_and_workers(tmp_path):
+    txt_path, dat_path = make_instance(tmp_path, n_locations=9, n_clients=70)
+    bin_path = str(tmp_path / "ref.bin")
+    assert data_parser.parse_and_convert(txt_path, dat_path, bin_path)
+
+    # Bloques más chicos que una línea: los números partidos entre bloques deben reconstruirse igual
+    for chunk_size, workers in ((7, 1), (64, 1), (1024, 3)):
+        dat_alt = str(tmp_path / f"alt_{chunk_size}_{workers}.dat")
+        bin_alt = str(tmp_path / f"alt_{chunk_size}_{workers}.bin")
+        assert data_parser.parse_and_convert(txt_path, dat_alt, bin_alt, chunk_size=chunk_size, tc_workers=workers)
+        with open(dat_path, 'rb') as a, open(dat_alt, 'rb') as b:
+            assert a.read() == b.read()
+        with open(bin_path, 'rb') as a, open(bin_alt, 'rb') as b:
+            assert a.read() == b.read()
+
+
+def test_binary_from_parser_matches_generator(tmp_path):
+    txt_path = str(tmp_path / "Gen.txt")
+    gen_bin = str(tmp_path / "gen.bin")
+    generator.generate_instance(txt_path, 8, 30, seed=3, bin_path=gen_bin, block_rows=4)
+    parsed_bin = str(tmp_path / "parsed.bin")
+    assert data_parser.parse_and_convert(txt_path, str(tmp_path / "Gen.dat"), parsed_bin)
+
+    a, b = instance_io.read_binary_instance(gen_bin), instance_io.read_binary_instance(parsed_bin)
+    for field in ('ICap', 'FC', 'dem', 'TC'):
+        assert np.array_equal(getattr(a, field), getattr(b, field))
+
+
+def test_missing_input_returns_false(tmp_path):
+    assert not data_parser.parse_and_convert(str(tmp_path / "nope.txt"), str(tmp_path / "nope.dat"))
+    assert not (tmp_path / "nope.dat").exists()
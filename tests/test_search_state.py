@@ -0,0 +1,82 @@
+"""Estado de la Búsqueda Tabú: OpenSet, TabuMemory y SearchCheckpoint."""
+
+import random
+
+import numpy as np
+
+from checkpoint import SearchCheckpoint
+from open_set import OpenSet
+from tabu_memory import TabuMemory
+
+
+def test_open_set_swap_and_neighbor():
+    s = OpenSet(10, {3, 1, 7})
+    assert sorted(s) == [1, 3, 7] and len(s) == 3 and s.n_closed() == 7
+    assert s.is_open(3) and not s.is_open(2)
+
+    # neighbor no modifica el estado; swap aplica el mismo cambio
+    assert sorted(s.neighbor((3, 5))) == [1, 5, 7]
+    assert sorted(s.open_list()) == [1, 3, 7]
+    s.swap((3, 5))
+    assert sorted(s.open_list()) == [1, 5, 7]
+    assert s.is_open(5) and not s.is_open(3)
+    assert sorted(s.open_at(k) for k in range(len(s))) == [1, 5, 7]
+    assert sorted(s.closed_at(k) for k in range(s.n_closed())) == [2, 3, 4, 6, 8, 9, 10]
+
+
+def test_open_set_random_swaps_keep_partition():
+    rng = random.Random(0)
+    s = OpenSet(30, range(1, 11))
+    reference = set(range(1, 11))
+    for _ in range(200):
+        move = (s.open_at(rng.randrange(len(s))), s.closed_at(rng.randrange(s.n_closed())))
+        s.swap(move)
+        reference = (reference - {move[0]}) | {move[1]}
+        assert set(s.open_list()) == reference
+        assert all(s.members[s.pos[j]] == j for j in range(1, 31))
+
+    # Restaurar desde 'members' (checkpoint) reproduce el mismo orden interno
+    restored = OpenSet(30, s.open_list(), members=s.members)
+    assert restored.members == s.members and restored.open_list() == s.open_list()
+
+
+def test_tabu_memory_tenures():
+    tabu = TabuMemory(10, tenure_open=3, tenure_close=5)
+    tabu.record((2, 4), iteration=10) # se cerró 2 y se abrió 4
+
+    # Cerrar 4 es tabú hasta la iteración 13; reabrir 2, hasta la 15 (inclusive)
+    assert tabu.is_tabu((4, 9), 13) and not tabu.is_tabu((4, 9), 14)
+    assert tabu.is_tabu((9, 2), 15) and not tabu.is_tabu((9, 2), 16)
+    assert not tabu.is_tabu((5, 6), 11)
+
+    close = np.array([4, 5])
+    open_ = np.array([2, 6])
+    mask = tabu.tabu_mask(close[:, None], open_[None, :], 14)
+    assert mask.tolist() == [[True, False], [True, False]]
+
+    other = TabuMemory(10, 3, 5)
+    other.restore(tabu.state())
+    assert other.is_tabu((9, 2), 15) and not other.is_tabu((4, 9), 14)
+
+
+def test_checkpoint_roundtrip(tmp_path):
+    path = str(tmp_path / "ckpt" / "search.pkl")
+    random.seed(4)
+    state = {'iteration': 7, 'current_set': [1, 4], 'members': [1, 4, 2, 3], 'best_cost': 12.5,
+             'tabu': TabuMemory(4, 2).state(), 'history': [20.0, 12.5], 'rng': random.getstate()}
+
+    checkpoint = SearchCheckpoint(path, signature=("X", "MS", 2), every=5)
+    assert checkpoint.load() is None
+    checkpoint.save(state)
+    assert checkpoint.due(10) and not checkpoint.due(7)
+
+    loaded = SearchCheckpoint(path, signature=("X", "MS", 2)).load()
+    assert loaded['history'] == state['history'] and loaded['members'] == state['members']
+    assert np.array_equal(loaded['tabu']['closed_until'], state['tabu']['closed_until'])
+    random.setstate(loaded['rng'])
+    first = random.random()
+    random.setstate(state['rng'])
+    assert random.random() == first
+
+    # Otra instancia/modo/tenure: no se retoma
+    assert SearchCheckpoint(path, signature=("X", "SS", 2)).load() is None
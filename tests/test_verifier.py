@@ -0,0 +1,56 @@
+"""Verificación independiente de soluciones (verifier.py) y su formato en disco (utils)."""
+
+import numpy as np
+
+import evaluators
+import utils
+import verifier
+
+
+def _solve(inst, mode):
+    open_list = list(range(1, inst.n_locations + 1))
+    evaluator = evaluators.GAPEvaluator(inst) if mode == "SS" else evaluators.TransportEvaluator(inst)
+    cost, assignment = evaluator.get_final_solution(open_list, mode)
+    return open_list, cost, assignment
+
+
+def test_valid_solutions_pass(small_instance, tmp_path):
+    inst, dat_path = small_instance
+    for mode in ("SS", "MS"):
+        open_list, cost, assignment = _solve(inst, mode)
+        report = verifier.verify_solution(inst, open_list, assignment, mode, reported_cost=cost)
+        assert report['ok'], report
+        assert abs(report['cost_diff']) <= 1e-6 * cost
+
+        # Guardada y leída de disco, la solución sigue verificando
+        utils.save_solution_to_file(str(tmp_path), "Synth", mode, cost, open_list, assignment)
+        txt_path, npz_path = utils.solution_paths(str(tmp_path), "Synth", mode)
+        assert verifier.verify_file(dat_path, npz_path)['ok']
+
+
+def test_detects_violations(small_instance):
+    inst, _ = small_instance
+    open_list, cost, assignment = _solve(inst, "SS")
+    clients, facilities = assignment.clients, assignment.facilities
+
+    report = verifier.verify_solution(inst, open_list, assignment, "SS", reported_cost=cost - 1.0)
+    assert not report['ok'] and report['cost_diff'] < 0
+
+    dropped = utils.Assignment(clients[1:], facilities[1:], None, assignment.n_clients)
+    assert verifier.verify_solution(inst, open_list, dropped, "SS")['unassigned_clients'] == [int(clients[0])]
+
+    # Un cliente repartido entre dos centros no es single source
+    split = utils.Assignment(np.append(clients, clients[0]), np.append(facilities, facilities[0] % inst.n_locations + 1),
+                             np.append(np.ones(len(clients)), 0.5), assignment.n_clients)
+    split.values[0] = 0.5
+    report = verifier.verify_solution(inst, open_list, split, "SS")
+    assert report['multi_source_clients'] == [int(clients[0])] and report['fractional_entries'] == 2
+
+    # Todo a un único centro: excede su capacidad (capacidad total = 1.6 x demanda)
+    single = utils.Assignment(clients, np.ones(len(clients)), None, assignment.n_clients)
+    report = verifier.verify_solution(inst, open_list, single, "SS")
+    assert report['over_capacity'] == [1] and not report['ok']
+
+    # Asignaciones a un centro cerrado
+    report = verifier.verify_solution(inst, [j for j in open_list if j != facilities[0]], assignment, "SS")
+    assert int(facilities[0]) in report['closed_used'] and not report['ok']